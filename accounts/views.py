@@ -8,7 +8,7 @@ from django.urls import reverse_lazy
 
 from .forms import SignUpForm, LoginForm
 from memberships.models import Membership, MembershipRequest, RequestStatus
-from posts.models import Bookmark
+from posts.models import LIST_DEFERRED_FIELDS, Bookmark
 
 
 class SignUpView(CreateView):
@@ -76,6 +76,7 @@ def profile(request):
     bookmarks = (
         Bookmark.objects.filter(user=user)
         .select_related("post", "post__author", "post__club")
+        .defer(*(f"post__{field}" for field in LIST_DEFERRED_FIELDS))
         .order_by("-created_at")[:4]
     )
     bookmarked_posts = [bookmark.post for bookmark in bookmarks]
@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from .models import Club
 
@@ -10,6 +10,7 @@ class ClubAdmin(admin.ModelAdmin):
     search_fields = ("name", "description", "created_by__username")
     prepopulated_fields = {"slug": ("name",)}
     readonly_fields = ("created_at", "color_preview_large")
+    actions = ["load_summarizer_models"]
 
     fieldsets = (
         (None, {"fields": ("name", "slug", "description")}),
@@ -19,6 +20,15 @@ class ClubAdmin(admin.ModelAdmin):
                 "fields": ("color", "color_preview_large", "logo"),
             },
         ),
+        (
+            "AI Summarizer",
+            {
+                "fields": ("summarizer_model",),
+                "description": "Load a new model on the summarizer server with the "
+                "action below (or the switch_summarizer_model command) before "
+                "switching clubs to it.",
+            },
+        ),
         (
             "Metadata",
             {"fields": ("created_by", "created_at"), "classes": ("collapse",)},
@@ -44,3 +54,31 @@ class ClubAdmin(admin.ModelAdmin):
         return "-"
 
     color_preview_large.short_description = "Color Preview"
+
+    @admin.action(description="Load summarizer models of selected clubs on the server")
+    def load_summarizer_models(self, request, queryset):
+        from posts.utils.inference_server import SERVER_ADDRESS
+        from posts.utils.summarizer import DEFAULT_MODEL, load_model_async
+
+        if not SERVER_ADDRESS:
+            # Loading here would only warm the web process handling this request
+            self.message_user(
+                request,
+                "No summarizer server is configured; each web process and worker "
+                "loads a club's model on its first summary for that club.",
+                messages.WARNING,
+            )
+            return
+
+        model_names = {club.summarizer_model or DEFAULT_MODEL for club in queryset}
+        for model_name in sorted(model_names):
+            if load_model_async(model_name):
+                self.message_user(
+                    request, f"Loading {model_name} on the summarizer server"
+                )
+            else:
+                self.message_user(
+                    request,
+                    f"Could not reach the summarizer server to load {model_name}",
+                    messages.ERROR,
+                )
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clubs", "0005_alter_logo_banner_to_filefield"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="club",
+            name="summarizer_model",
+            field=models.CharField(
+                blank=True,
+                help_text="Hugging Face model for this club's AI summaries (blank: site default)",
+                max_length=200,
+            ),
+        ),
+    ]
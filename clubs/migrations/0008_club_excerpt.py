@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clubs", "0007_club_description_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="club",
+            name="excerpt",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Plain-text opening words of the description for club cards",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="club",
+            name="description_html_version",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Markdown renderer version of description_html and excerpt",
+            ),
+        ),
+    ]
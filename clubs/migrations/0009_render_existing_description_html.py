@@ -0,0 +1,39 @@
+from django.db import migrations
+
+from posts.templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    render_markdown,
+)
+
+BATCH_SIZE = 500
+
+
+def render_existing(apps, schema_editor):
+    """Render description_html for clubs saved before it was stored."""
+    Club = apps.get_model("clubs", "Club")
+    queryset = Club.objects.filter(description_html_version=0).order_by("id")
+    last_id = 0
+    while True:
+        batch = list(
+            queryset.filter(id__gt=last_id).only("id", "description")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for club in batch:
+            club.description_html = render_markdown(club.description)
+            club.description_html_version = MARKDOWN_RENDERER_VERSION
+        Club.objects.bulk_update(
+            batch, ["description_html", "description_html_version"]
+        )
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clubs", "0008_club_excerpt"),
+    ]
+
+    operations = [
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from posts.templatetags.markdown_extras import make_excerpt
+
+BATCH_SIZE = 500
+
+
+def fill_existing(apps, schema_editor):
+    """Store the excerpt of clubs saved before it was stored."""
+    Club = apps.get_model("clubs", "Club")
+    queryset = Club.objects.filter(excerpt="").exclude(description="").order_by("id")
+    last_id = 0
+    while True:
+        batch = list(
+            queryset.filter(id__gt=last_id).only("id", "description")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for club in batch:
+            club.excerpt = make_excerpt(club.description)
+        Club.objects.bulk_update(batch, ["excerpt"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clubs", "0009_render_existing_description_html"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_existing, migrations.RunPython.noop),
+    ]
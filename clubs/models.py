@@ -1,7 +1,13 @@
 import random
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.safestring import mark_safe
 from django.utils.text import slugify
+from posts.templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    make_excerpt,
+    render_markdown,
+)
 
 
 # Light pastel colors for club cards (slightly darker for better visibility)
@@ -29,6 +35,21 @@ class Club(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=110, unique=True, blank=True)
     description = models.TextField()
+    description_html = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Description rendered from Markdown on save",
+    )
+    description_html_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Markdown renderer version of description_html and excerpt",
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Plain-text opening words of the description for club cards",
+    )
     color = models.CharField(
         max_length=7, blank=True, help_text="Card background color (auto-generated)"
     )
@@ -42,6 +63,11 @@ class Club(models.Model):
     created_by = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="created_clubs"
     )
+    summarizer_model = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Hugging Face model for this club's AI summaries (blank: site default)",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -64,8 +90,33 @@ class Club(models.Model):
         if not self.color:
             self.color = random.choice(PASTEL_COLORS)
 
+        # Render the description once per edit instead of once per page view
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "description" in update_fields:
+            self.render_description()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "description_html",
+                    "description_html_version",
+                    "excerpt",
+                }
+
         super().save(*args, **kwargs)
 
+    def render_description(self):
+        """Render description_html and excerpt with the current renderer."""
+        self.description_html = render_markdown(self.description)
+        self.excerpt = make_excerpt(self.description)
+        self.description_html_version = MARKDOWN_RENDERER_VERSION
+
+    @property
+    def rendered_description(self):
+        """The description as HTML, from description_html unless it is outdated."""
+        if self.description_html_version != MARKDOWN_RENDERER_VERSION:
+            return mark_safe(render_markdown(self.description))
+        return mark_safe(self.description_html)
+
     def get_absolute_url(self):
         from django.urls import reverse
 
@@ -8,7 +8,7 @@ from .models import Club
 from .forms import ClubForm
 from memberships.models import Membership, MembershipRequest, RequestStatus
 from memberships.helpers import is_club_moderator, is_club_admin
-from posts.models import Post, PostType, Like
+from posts.models import LIST_DEFERRED_FIELDS, Post, PostType, Like
 
 
 class ClubListView(ListView):
@@ -24,7 +24,8 @@ class ClubListView(ListView):
         Support partial-name / description search across ALL clubs.
         Search is applied before pagination so results are global, not page-limited.
         """
-        qs = super().get_queryset()
+        # Cards show the stored excerpt, not the description itself
+        qs = super().get_queryset().defer("description", "description_html")
         q = self.request.GET.get("q", "").strip()
         if q:
             qs = qs.filter(Q(name__icontains=q) | Q(description__icontains=q))
@@ -78,12 +79,18 @@ class ClubDetailView(DetailView):
             ).first()
             context["pending_request"] = pending
 
-        news_qs = Post.objects.filter(
-            club=club, post_type=PostType.NEWS, is_published=True
-        ).order_by("-created_at")
-        blog_qs = Post.objects.filter(
-            club=club, post_type=PostType.BLOG, is_published=True
-        ).order_by("-created_at")
+        news_qs = (
+            Post.objects.filter(club=club, post_type=PostType.NEWS, is_published=True)
+            .defer(*LIST_DEFERRED_FIELDS)
+            .select_related("author")
+            .order_by("-created_at")
+        )
+        blog_qs = (
+            Post.objects.filter(club=club, post_type=PostType.BLOG, is_published=True)
+            .defer(*LIST_DEFERRED_FIELDS)
+            .select_related("author")
+            .order_by("-created_at")
+        )
 
         context["news_total"] = news_qs.count()
         context["blog_total"] = blog_qs.count()
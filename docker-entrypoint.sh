@@ -5,6 +5,10 @@ set -e
 echo "Running database migrations..."
 python manage.py migrate --noinput
 
+# Re-render stored Markdown HTML left over from an older renderer version
+echo "Re-rendering outdated Markdown..."
+python manage.py rerender_markdown
+
 # Install/update Node.js dependencies if node_modules doesn't exist or package.json changed
 if [ ! -d "node_modules" ] || [ ! -f "node_modules/.package-lock.json" ]; then
     echo "Installing Node.js dependencies..."
@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import Post, Like, Comment, Bookmark
+from .models import (
+    Post,
+    Like,
+    Comment,
+    Bookmark,
+    CachedSummary,
+    DiscussionDigest,
+    SummaryJob,
+    SummaryRun,
+)
 
 
 @admin.register(Post)
@@ -64,3 +73,63 @@ class BookmarkAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "post__title")
     raw_id_fields = ("user", "post")
     readonly_fields = ("created_at",)
+
+
+@admin.register(CachedSummary)
+class CachedSummaryAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "model_name", "created_at")
+    list_filter = ("model_name", "created_at")
+    search_fields = ("content_hash", "summary")
+    readonly_fields = ("created_at",)
+
+
+@admin.register(DiscussionDigest)
+class DiscussionDigestAdmin(admin.ModelAdmin):
+    list_display = (
+        "post",
+        "comment_count",
+        "needs_refresh",
+        "model_name",
+        "updated_at",
+    )
+    list_filter = ("needs_refresh", "model_name")
+    search_fields = ("post__title", "summary")
+    raw_id_fields = ("post",)
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(SummaryJob)
+class SummaryJobAdmin(admin.ModelAdmin):
+    list_display = ("post", "status", "attempts", "run_after", "locked_by")
+    list_filter = ("status", "created_at")
+    search_fields = ("post__title", "locked_by", "last_error")
+    raw_id_fields = ("post",)
+    readonly_fields = ("created_at", "updated_at", "locked_at")
+
+
+@admin.register(SummaryRun)
+class SummaryRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "post",
+        "source",
+        "origin",
+        "model_name",
+        "input_chars",
+        "output_tokens",
+        "queue_wait_ms",
+        "generate_ms",
+        "total_ms",
+    )
+    list_filter = ("source", "origin", "model_name", "backend", "created_at")
+    search_fields = ("post__title", "model_name")
+    raw_id_fields = ("post",)
+    list_select_related = ("post",)
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        # Rows are written by the summarizer; see the summarizer_report command
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -12,6 +12,9 @@ class PostsConfig(AppConfig):
 
     def ready(self):
         """Preload summarization models when Django starts (asynchronously to avoid blocking)."""
+        # Import signals to register them
+        import posts.signals  # noqa
+
         logger.info("PostsConfig.ready() called - initializing summarizer preload")
 
         # Skip preloading during migrations and other management commands
@@ -31,6 +34,13 @@ class PostsConfig(AppConfig):
             logger.info("Skipping summarizer preload (SKIP_SUMMARIZER_PRELOAD=true)")
             return
 
+        # Models live in the run_summarizer_server process when it is configured
+        if os.getenv("SUMMARIZER_SERVER_ADDRESS"):
+            logger.info(
+                "Skipping summarizer preload (using SUMMARIZER_SERVER_ADDRESS server)"
+            )
+            return
+
         # Preload models asynchronously in background thread to avoid blocking Django startup
         # This allows the server to start immediately while models load in the background
         def preload_in_background():
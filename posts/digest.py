@@ -0,0 +1,242 @@
+"""
+Discussion digests: AI summaries of a post's comment thread.
+
+Comments are grouped in created_at order into chunks of about
+SUMMARIZER_CHUNK_TOKENS tokens and summarized together through the loaded
+summarizer, so every chunk of every post in a refresh shares the batching
+engine. A digest is refreshed incrementally: only comments newer than
+last_comment_id are summarized, and their partial summaries are merged with
+the previous digest in one more pass.
+
+New comments only flag a digest for refresh once DIGEST_REFRESH_COMMENTS of
+them have accumulated; run_summarizer_worker refreshes flagged digests when
+its job queue is idle, and readers can build a missing digest on demand.
+
+Configuration (environment variables):
+    SUMMARIZER_DIGEST_MIN_COMMENTS      Comments before a post gets a digest (default: 5)
+    SUMMARIZER_DIGEST_REFRESH_COMMENTS  New comments before a refresh (default: 10)
+"""
+
+import os
+import logging
+import time
+
+from django.db import transaction
+
+from .models import Comment, DiscussionDigest, Post, SummaryOrigin, SummarySource
+from .summary_cache import summary_model_for
+from .telemetry import build_run, record_runs
+from .utils.summarizer import CHUNK_TOKENS, summarize_many_by_model
+
+logger = logging.getLogger(__name__)
+
+DIGEST_MIN_COMMENTS = int(os.getenv("SUMMARIZER_DIGEST_MIN_COMMENTS", "5"))
+DIGEST_REFRESH_COMMENTS = int(os.getenv("SUMMARIZER_DIGEST_REFRESH_COMMENTS", "10"))
+
+# Roughly four characters per token, as in the summarizer's queue estimate
+DIGEST_CHUNK_CHARS = CHUNK_TOKENS * 4
+
+
+def get_digest(post):
+    """Return the post's digest if it has a summary, or None."""
+    digest = DiscussionDigest.objects.filter(post=post).first()
+    if digest and digest.summary:
+        return digest
+    return None
+
+
+def new_comment_count(post, digest=None):
+    """Return how many of the post's comments the digest does not cover yet."""
+    last_comment_id = digest.last_comment_id if digest else 0
+    return post.comments.filter(id__gt=last_comment_id).count()
+
+
+def note_new_comment(post):
+    """
+    Flag the post's digest for refresh once enough comments are not covered.
+    Returns True if the digest was flagged.
+    """
+    digest = DiscussionDigest.objects.filter(post=post).first()
+    pending = new_comment_count(post, digest)
+    threshold = DIGEST_REFRESH_COMMENTS if digest else DIGEST_MIN_COMMENTS
+    if pending < threshold or (digest and digest.needs_refresh):
+        return False
+
+    flag_digest(post)
+    logger.info(f"Digest of post {post.id} flagged ({pending} new comments)")
+    return True
+
+
+def flag_digest(post):
+    """Mark the post's digest for run_summarizer_worker to refresh."""
+    DiscussionDigest.objects.update_or_create(
+        post=post, defaults={"needs_refresh": True}
+    )
+
+
+def forget_comment(comment):
+    """
+    Drop the digest of a deleted comment's post if it covered the comment,
+    so removed text does not live on in the summary.
+    """
+    reset = DiscussionDigest.objects.filter(
+        post_id=comment.post_id, last_comment_id__gte=comment.id
+    ).update(summary="", comment_count=0, last_comment_id=0, needs_refresh=True)
+    if reset:
+        logger.info(f"Digest of post {comment.post_id} reset after a comment deletion")
+    return bool(reset)
+
+
+def chunk_comments(comments, max_chars=DIGEST_CHUNK_CHARS):
+    """
+    Group comments, in the given order, into "user: text" chunks of at most
+    max_chars characters. A single comment longer than that is cut.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for comment in comments:
+        line = f"{comment.user.username}: {' '.join(comment.body.split())}"
+        line = line[:max_chars]
+        if current and size + len(line) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current = []
+            size = 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def build_digests(posts, origin=SummaryOrigin.DIGEST):
+    """
+    Refresh the digests of several posts with batched summarization.
+
+    New comments of every post are chunked and summarized together; posts
+    with more than one partial summary (or an earlier digest to merge) are
+    summarized once more. Posts that fail are flagged for the worker to retry.
+    Returns {post id: DiscussionDigest} for the posts whose digest was updated.
+    """
+    started = time.monotonic()
+    previous = {
+        digest.post_id: digest
+        for digest in DiscussionDigest.objects.filter(post__in=posts)
+    }
+
+    plans = []
+    for post in posts:
+        digest = previous.get(post.id)
+        comments = list(
+            Comment.objects.filter(
+                post=post, id__gt=digest.last_comment_id if digest else 0
+            )
+            .select_related("user")
+            .only("id", "body", "created_at", "user__username")
+            .order_by("created_at", "id")
+        )
+        covered = (digest.comment_count if digest else 0) + len(comments)
+        if not comments or covered < DIGEST_MIN_COMMENTS:
+            continue
+        plans.append((post, digest, comments, chunk_comments(comments)))
+
+    if not plans:
+        return {}
+
+    # Map: every chunk of every post in one batched submission
+    texts = [chunk for _, _, _, chunks in plans for chunk in chunks]
+    model_names = [
+        summary_model_for(post) for post, _, _, chunks in plans for _ in chunks
+    ]
+    partials = iter(summarize_many_by_model(texts, model_names))
+
+    # Reduce: merge partials with the previous digest where needed
+    merged = {}
+    reduce_texts = []
+    reduce_posts = []
+    for post, digest, comments, chunks in plans:
+        parts = [next(partials) for _ in chunks]
+        if None in parts:
+            logger.warning(f"Digest of post {post.id} failed to summarize")
+            continue
+        if digest and digest.summary:
+            parts.insert(0, digest.summary)
+        if len(parts) == 1:
+            merged[post.id] = parts[0]
+        else:
+            reduce_texts.append("\n".join(parts))
+            reduce_posts.append(post)
+    if reduce_texts:
+        reduced = summarize_many_by_model(
+            reduce_texts, [summary_model_for(post) for post in reduce_posts]
+        )
+        for post, summary in zip(reduce_posts, reduced):
+            if summary:
+                merged[post.id] = summary
+            else:
+                logger.warning(f"Digest of post {post.id} failed to merge")
+
+    updated = {}
+    runs = []
+    failed = []
+    for post, digest, comments, chunks in plans:
+        summary = merged.get(post.id)
+        if not summary:
+            failed.append(post)
+            continue
+        digest, _ = DiscussionDigest.objects.update_or_create(
+            post=post,
+            defaults={
+                "summary": summary,
+                "comment_count": (digest.comment_count if digest else 0)
+                + len(comments),
+                "last_comment_id": max(comment.id for comment in comments),
+                "model_name": summary_model_for(post),
+                "needs_refresh": False,
+            },
+        )
+        updated[post.id] = digest
+        runs.append(
+            build_run(
+                post,
+                SummarySource.MODEL,
+                origin,
+                started,
+                "\n".join(chunks),
+                digest.model_name,
+            )
+        )
+    for post in failed:
+        flag_digest(post)
+    record_runs(runs)
+    return updated
+
+
+def refresh_digest(post):
+    """Refresh one post's digest now. Returns the digest, or None if it has none."""
+    digest = build_digests([post]).get(post.id)
+    return digest or get_digest(post)
+
+
+def claim_stale_digests(limit):
+    """
+    Claim up to `limit` flagged digests for refreshing by clearing their flag.
+    Returns their posts; build_digests flags them again if the refresh fails.
+    """
+    with transaction.atomic():
+        post_ids = list(
+            DiscussionDigest.objects.select_for_update(skip_locked=True)
+            .filter(needs_refresh=True)
+            .order_by("updated_at")
+            .values_list("post_id", flat=True)[:limit]
+        )
+        if post_ids:
+            DiscussionDigest.objects.filter(post_id__in=post_ids).update(
+                needs_refresh=False
+            )
+    return list(
+        Post.objects.select_related("club")
+        .only("id", "club__summarizer_model")
+        .filter(id__in=post_ids)
+    )
+
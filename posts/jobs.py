@@ -0,0 +1,144 @@
+"""
+Durable summarization job queue for ClubiFy.
+
+Views enqueue a SummaryJob row instead of summarizing in-process; the
+run_summarizer_worker management command claims pending jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can run side by
+side without processing the same job twice.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import JobStatus, Post, SummaryJob
+from .summary_cache import get_cached_summary, store_summary, summary_key_for
+
+logger = logging.getLogger(__name__)
+
+# Retry policy: wait BACKOFF_SECONDS * 2^(attempts - 1), capped at MAX_BACKOFF_SECONDS
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+
+# Running jobs whose worker has been silent this long are reclaimed
+LOCK_TIMEOUT = timedelta(minutes=15)
+
+
+def enqueue_summary_job(post):
+    """
+    Queue summary generation for a post.
+    Returns the existing pending job if one is already queued.
+    """
+    job = SummaryJob.objects.filter(post=post, status=JobStatus.PENDING).first()
+    if job:
+        return job
+    job = SummaryJob.objects.create(post=post)
+    logger.info(f"Enqueued summary job {job.id} for post {post.id}")
+    return job
+
+
+def ensure_summary(post):
+    """
+    Give the post a summary from the shared store, or queue one if none is cached.
+    Returns True if a job was queued.
+    """
+    if get_cached_summary(post):
+        return False
+    enqueue_summary_job(post)
+    return True
+
+
+def refresh_summary_after_edit(post, previous_body):
+    """
+    Invalidate the post's summary if the edit changed its summary key.
+    Title-only and whitespace-only edits keep the existing summary.
+    """
+    if summary_key_for(post, previous_body) == summary_key_for(post):
+        return False
+
+    logger.info(f"Body of post {post.id} changed, invalidating summary")
+    Post.objects.filter(id=post.id).update(summary=None, summary_hash="")
+    post.summary = None
+    post.summary_hash = ""
+    ensure_summary(post)
+    return True
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Claim up to `limit` runnable jobs for a worker.
+    Pending jobs that are due and running jobs with an expired lock are eligible.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            SummaryJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=JobStatus.PENDING, run_after__lte=now)
+                | Q(status=JobStatus.RUNNING, locked_at__lt=now - LOCK_TIMEOUT)
+            )
+            .order_by("run_after", "id")[:limit]
+        )
+        if jobs:
+            SummaryJob.objects.filter(id__in=[job.id for job in jobs]).update(
+                status=JobStatus.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+    for job in jobs:
+        job.status = JobStatus.RUNNING
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.attempts += 1
+    return jobs
+
+
+def complete_job(job, post, key, summary, shared=True):
+    """Store the generated summary on the post and mark the job done."""
+    with transaction.atomic():
+        store_summary(post, key, summary, shared=shared)
+        SummaryJob.objects.filter(id=job.id).update(
+            status=JobStatus.DONE, locked_by="", locked_at=None, last_error=""
+        )
+
+
+def defer_job(job, seconds):
+    """Put a claimed job back in the queue without counting the attempt."""
+    SummaryJob.objects.filter(id=job.id).update(
+        status=JobStatus.PENDING,
+        run_after=timezone.now() + timedelta(seconds=seconds),
+        attempts=F("attempts") - 1,
+        locked_by="",
+        locked_at=None,
+    )
+
+
+def fail_job(job, error, max_attempts=MAX_ATTEMPTS):
+    """Schedule a retry with exponential backoff, or give up after max_attempts."""
+    if job.attempts >= max_attempts:
+        status = JobStatus.FAILED
+        run_after = job.run_after
+        logger.error(
+            f"Summary job {job.id} for post {job.post_id} failed permanently: {error}"
+        )
+    else:
+        status = JobStatus.PENDING
+        delay = min(BACKOFF_SECONDS * 2 ** (job.attempts - 1), MAX_BACKOFF_SECONDS)
+        run_after = timezone.now() + timedelta(seconds=delay)
+        logger.warning(
+            f"Summary job {job.id} for post {job.post_id} failed "
+            f"(attempt {job.attempts}), retrying in {delay}s: {error}"
+        )
+
+    SummaryJob.objects.filter(id=job.id).update(
+        status=status,
+        run_after=run_after,
+        locked_by="",
+        locked_at=None,
+        last_error=str(error)[:2000],
+    )
@@ -0,0 +1,321 @@
+"""
+Generate summaries for posts that are missing one or whose summary is stale.
+
+Usage:
+    python manage.py backfill_summaries --dry-run
+    python manage.py backfill_summaries --club robotics --since 2025-01-01 --workers 4
+    python manage.py backfill_summaries --club robotics --stale
+
+Editing a post clears its summary, so by default only posts without one are
+scanned. A summary also goes stale when its club's model or the generation
+parameters change; --stale re-checks every stored summary's key for that,
+which means reading every matching post.
+
+Progress is checkpointed after every saved batch, so an interrupted run resumes
+where it stopped, never past a post that failed to summarize; the checkpoint is
+removed once a run completes. Use --restart to ignore an existing checkpoint.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from posts.models import (
+    CachedSummary,
+    Post,
+    PostType,
+    SummaryOrigin,
+    SummarySource,
+)
+from posts.summary_cache import is_summary_current, summary_key_for, summary_model_for
+from posts.telemetry import build_run, record_runs
+from posts.utils.batching import BATCH_SIZE
+from posts.utils.summarizer import summarize_with_metrics
+
+DEFAULT_CHECKPOINT = ".backfill_summaries.json"
+
+
+def _parse_date(value):
+    try:
+        return timezone.make_aware(datetime.strptime(value, "%Y-%m-%d"))
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Backfill missing or stale post summaries in resumable batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--club", help="Only posts of the club with this slug")
+        parser.add_argument(
+            "--type", choices=[choice for choice, _ in PostType.choices]
+        )
+        parser.add_argument("--since", help="Only posts created on or after YYYY-MM-DD")
+        parser.add_argument("--until", help="Only posts created before YYYY-MM-DD")
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help="Also re-check stored summaries for a model or parameter change",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Posts summarized per batch (default: {BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Rows fetched per database round trip (default: 500)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Summarizer processes, each with its own model copy (default: 1)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=DEFAULT_CHECKPOINT,
+            help=f"Checkpoint file for resuming (default: {DEFAULT_CHECKPOINT})",
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="Ignore an existing checkpoint"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be summarized without running inference",
+        )
+
+    def handle(self, *args, **options):
+        filters = {
+            key: options[key]
+            for key in ("club", "type", "since", "until", "stale")
+            if options[key]
+        }
+        last_id = 0 if options["restart"] else self.load_checkpoint(options, filters)
+
+        queryset = self.get_queryset(filters).filter(id__gt=last_id)
+        if last_id:
+            self.stdout.write(f"Resuming after post {last_id}")
+
+        self.stats = {"scanned": 0, "cached": 0, "summarized": 0, "failed": 0}
+        # The checkpoint never moves past this, so a resumed run retries it
+        self.first_failed_id = None
+        started = time.monotonic()
+
+        executor = None
+        if options["workers"] > 1 and not options["dry_run"]:
+            # Spawned (not forked) so children start without this process's threads
+            executor = ProcessPoolExecutor(
+                max_workers=options["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        in_flight = deque()
+
+        try:
+            for batch in self.batches(queryset, options):
+                if options["dry_run"]:
+                    continue
+                texts = [post.body for post, _ in batch]
+                model_names = [summary_model_for(post) for post, _ in batch]
+                if executor:
+                    in_flight.append(
+                        (
+                            batch,
+                            executor.submit(summarize_with_metrics, texts, model_names),
+                        )
+                    )
+                    # Save in submission order so the checkpoint never skips a batch
+                    while len(in_flight) > options["workers"] * 2 or (
+                        in_flight and in_flight[0][1].done()
+                    ):
+                        done_batch, future = in_flight.popleft()
+                        self.save_batch(done_batch, future.result(), options, filters)
+                else:
+                    self.save_batch(
+                        batch,
+                        summarize_with_metrics(texts, model_names),
+                        options,
+                        filters,
+                    )
+
+            while in_flight:
+                done_batch, future = in_flight.popleft()
+                self.save_batch(done_batch, future.result(), options, filters)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+        # The run finished, so the next one should scan from the start again
+        if not options["dry_run"] and os.path.exists(options["checkpoint"]):
+            os.remove(options["checkpoint"])
+
+        elapsed = time.monotonic() - started
+        prefix = "[dry run] " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Scanned {self.stats['scanned']} posts in {elapsed:.0f}s: "
+                f"{self.stats['cached']} from cache, "
+                f"{self.stats['summarized']} summarized, "
+                f"{self.stats['failed']} failed"
+            )
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{prefix}{self.stats['pending']} posts need inference")
+
+    def get_queryset(self, filters):
+        """Posts with no summary, and with --stale those with a tracked summary key."""
+        missing = Q(summary__isnull=True) | Q(summary="")
+        if "stale" in filters:
+            missing |= ~Q(summary_hash="")
+        queryset = Post.objects.filter(missing)
+        if "club" in filters:
+            queryset = queryset.filter(club__slug=filters["club"])
+        if "type" in filters:
+            queryset = queryset.filter(post_type=filters["type"])
+        if "since" in filters:
+            queryset = queryset.filter(created_at__gte=_parse_date(filters["since"]))
+        if "until" in filters:
+            queryset = queryset.filter(created_at__lt=_parse_date(filters["until"]))
+        return (
+            queryset.select_related("club")
+            .only("id", "body", "summary", "summary_hash", "club__summarizer_model")
+            .order_by("id")
+        )
+
+    def batches(self, queryset, options):
+        """
+        Yield lists of (post, key) needing inference.
+        Posts whose body is already in the summary store are saved without inference.
+        """
+        self.stats["pending"] = 0
+        batch = []
+        for chunk in self.chunks(queryset, options):
+            for pending in self.save_cached(chunk, options):
+                self.stats["pending"] += 1
+                batch.append(pending)
+                if len(batch) >= options["batch_size"]:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def chunks(self, queryset, options):
+        """Yield lists of up to chunk_size (post, key) whose summary is not current."""
+        chunk = []
+        for post in queryset.iterator(chunk_size=options["chunk_size"]):
+            self.stats["scanned"] += 1
+            key = summary_key_for(post)
+            if is_summary_current(post, key):
+                continue
+            chunk.append((post, key))
+            if len(chunk) >= options["chunk_size"]:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def save_cached(self, chunk, options):
+        """
+        Save the posts of a chunk of (post, key) whose summary is in the store
+        (or who are short enough to be their own) with one lookup and one
+        bulk_update. Returns the rest, which need inference.
+        """
+        cached = dict(
+            CachedSummary.objects.filter(
+                content_hash__in={key for _, key in chunk}
+            ).values_list("content_hash", "summary")
+        )
+        updated = []
+        pending = []
+        for post, key in chunk:
+            if key in cached or len(post.body.strip()) < 50:
+                post.summary = cached.get(key, post.body)
+                post.summary_hash = key
+                updated.append(post)
+            else:
+                pending.append((post, key))
+
+        self.stats["cached"] += len(updated)
+        if updated and not options["dry_run"]:
+            Post.objects.bulk_update(updated, ["summary", "summary_hash"])
+        return pending
+
+    def save_batch(self, batch, result, options, filters):
+        """Write a batch of summaries with bulk_update and advance the checkpoint."""
+        summaries, metrics = result
+        updated = []
+        cache_entries = []
+        runs = []
+        for (post, key), summary, entry in zip(batch, summaries, metrics):
+            if not summary:
+                self.stats["failed"] += 1
+                if self.first_failed_id is None:
+                    self.first_failed_id = post.id
+                continue
+            runs.append(
+                build_run(
+                    post,
+                    SummarySource.MODEL,
+                    SummaryOrigin.BACKFILL,
+                    None,
+                    post.body,
+                    summary_model_for(post),
+                    entry,
+                )
+            )
+            post.summary = summary
+            post.summary_hash = key
+            updated.append(post)
+            cache_entries.append(
+                CachedSummary(
+                    content_hash=key,
+                    model_name=summary_model_for(post),
+                    summary=summary,
+                )
+            )
+
+        Post.objects.bulk_update(updated, ["summary", "summary_hash"])
+        CachedSummary.objects.bulk_create(cache_entries, ignore_conflicts=True)
+        record_runs(runs)
+        self.stats["summarized"] += len(updated)
+
+        last_id = batch[-1][0].id
+        if self.first_failed_id is not None:
+            last_id = min(last_id, self.first_failed_id - 1)
+        self.save_checkpoint(options, filters, last_id)
+        self.stdout.write(
+            f"Saved {len(updated)}/{len(batch)} summaries (through post {batch[-1][0].id})"
+        )
+
+    def load_checkpoint(self, options, filters):
+        """Return the last processed post id from the checkpoint, or 0."""
+        path = options["checkpoint"]
+        if not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("filters") != filters:
+            raise CommandError(
+                f"Checkpoint {path} was written with different filters "
+                f"{checkpoint.get('filters')}; use --restart to start over"
+            )
+        return checkpoint.get("last_id", 0)
+
+    def save_checkpoint(self, options, filters, last_id):
+        path = options["checkpoint"]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"filters": filters, "last_id": last_id}, f)
+        os.replace(tmp_path, path)
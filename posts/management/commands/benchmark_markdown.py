@@ -0,0 +1,240 @@
+"""
+Benchmark Markdown rendering of repeated club descriptions and posts.
+
+Usage:
+    python manage.py benchmark_markdown
+    python manage.py benchmark_markdown --repeat 500 --from-db 20
+    python manage.py benchmark_markdown --pathological --sizes 1000,2000,4000
+    python manage.py benchmark_markdown --suite --repeat 20
+
+Each document is rendered --repeat times four ways: with a new converter per
+render (the old markdown filter), with a pooled converter, through the
+markdown filter's LRU render cache and block by block. Prints microseconds
+per render, the speedup over a new converter and the caches' hit/miss
+counters, then times re-rendering each document after a one-word edit.
+
+--pathological instead times the preprocessing step alone (the streaming
+preprocess() against the regex passes it replaced) on inputs built to trigger
+backtracking, at each of --sizes. Time per step that stays flat as the size
+doubles means linear growth; the regex passes are skipped once a run takes
+longer than --max-seconds.
+
+--suite times the hot helpers (the markdown filter without its cache,
+markdown_to_text and preprocess) on the bundled documents plus large and
+deeply structured ones (big tables, nested lists, long code blocks), and
+reports throughput and the worst time per input.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from clubs.models import Club
+from posts.models import Post
+from posts.templatetags import markdown_extras
+from posts.utils import markdown_reference
+from posts.utils.markdown_corpus import (
+    PATHOLOGICAL_INPUTS,
+    build_adversarial_corpus,
+    build_markdown_corpus,
+)
+from posts.utils.profiling import percentile
+from posts.utils.render_cache import RenderCache
+
+
+# Helpers timed by --suite
+SUITE_FUNCTIONS = (
+    ("markdown", markdown_extras.render_markdown),
+    ("markdown_to_text", markdown_extras.markdown_to_text),
+    ("preprocess", markdown_extras.preprocess),
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark repeated Markdown renders with pooling and caching."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            help="Renders of each document per strategy (default: 200, 10 for --suite)",
+        )
+        parser.add_argument(
+            "--from-db",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Also render the N newest club descriptions and posts",
+        )
+        parser.add_argument(
+            "--suite",
+            action="store_true",
+            help="Time the Markdown helpers on realistic and adversarial bodies",
+        )
+        parser.add_argument(
+            "--pathological",
+            action="store_true",
+            help="Time preprocessing of adversarial inputs instead",
+        )
+        parser.add_argument(
+            "--sizes",
+            default="1000,2000,4000,8000",
+            help="Comma-separated input sizes for --pathological",
+        )
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            default=5.0,
+            help="Stop timing the regex passes after a slower run (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        if options["pathological"]:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+            self.benchmark_pathological(sizes, options["max_seconds"])
+            return
+
+        documents = build_markdown_corpus()
+        if options["from_db"]:
+            documents.update(self.load_documents(options["from_db"]))
+        if options["suite"]:
+            documents.update(build_adversarial_corpus())
+            self.benchmark_suite(documents, options["repeat"] or 10)
+            return
+        options["repeat"] = options["repeat"] or 200
+
+        cache = RenderCache(max_entries=len(documents))
+        strategies = [
+            ("new converter", markdown_reference.render),
+            ("pooled converter", markdown_extras.render_markdown),
+            (
+                "pooled + LRU",
+                lambda text: cache.get_or_render(text, markdown_extras._render),
+            ),
+            ("blocks", markdown_extras.render_markdown_blocks),
+        ]
+
+        for name, text in documents.items():
+            expected = markdown_reference.render(text)
+            self.stdout.write(f"\n{name} ({len(text)} chars)")
+            baseline = None
+            for label, render in strategies:
+                if render(text) != expected:
+                    self.stderr.write(f"  {label}: output differs from baseline")
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    render(text)
+                    timings.append(time.perf_counter() - started)
+                mean_us = sum(timings) / len(timings) * 1e6
+                baseline = baseline or mean_us
+                self.stdout.write(
+                    f"  {label:<17} mean {mean_us:9.1f} us  "
+                    f"p50 {percentile(timings, 50) * 1e6:9.1f} us  "
+                    f"p95 {percentile(timings, 95) * 1e6:9.1f} us  "
+                    f"x{baseline / mean_us:.1f}"
+                )
+
+        self.benchmark_edits(documents, options["repeat"])
+
+        for label, stats in (
+            ("Render cache", cache.stats()),
+            ("Block cache", markdown_extras.block_cache_stats()),
+        ):
+            self.stdout.write(
+                f"\n{label}: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['evictions']} evictions ({stats['hit_rate']:.1%} hit rate)"
+            )
+
+    def benchmark_suite(self, documents, repeat):
+        """Report throughput and worst-case time of each helper per document."""
+        worst = {}  # helper -> (seconds, document)
+        for name, text in documents.items():
+            self.stdout.write(f"\n{name} ({len(text)} chars)")
+            for label, function in SUITE_FUNCTIONS:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    function(text)
+                    timings.append(time.perf_counter() - started)
+                slowest = max(timings)
+                mb_per_s = len(text) * len(timings) / sum(timings) / 1e6
+                self.stdout.write(
+                    f"  {label:<17} {mb_per_s:8.2f} MB/s  "
+                    f"p50 {percentile(timings, 50) * 1e3:8.2f} ms  "
+                    f"max {slowest * 1e3:8.2f} ms"
+                )
+                if slowest > worst.get(label, (0, None))[0]:
+                    worst[label] = (slowest, name)
+
+        self.stdout.write("\nWorst case per helper")
+        for label, (slowest, name) in worst.items():
+            self.stdout.write(f"  {label:<17} {slowest * 1e3:8.2f} ms  ({name})")
+
+    def benchmark_edits(self, documents, repeat):
+        """
+        Time re-rendering each document after a one-word edit at its end, as
+        when an author fixes a typo: a full render against block by block.
+        """
+        self.stdout.write("\nRe-render after a one-word edit")
+        for name, text in documents.items():
+            markdown_extras.render_markdown_blocks(text)
+            results = []
+            for render in (
+                markdown_extras.render_markdown,
+                markdown_extras.render_markdown_blocks,
+            ):
+                timings = []
+                for i in range(repeat):
+                    edited = f"{text} edit{i}"
+                    started = time.perf_counter()
+                    render(edited)
+                    timings.append(time.perf_counter() - started)
+                results.append(sum(timings) / len(timings) * 1e6)
+            if markdown_extras.render_markdown_blocks(
+                edited
+            ) != markdown_extras.render_markdown(edited):
+                self.stderr.write(f"  {name}: block output differs from full render")
+            full_us, blocks_us = results
+            self.stdout.write(
+                f"  {name:<17} full {full_us:9.1f} us  blocks {blocks_us:9.1f} us  "
+                f"x{full_us / blocks_us:.1f}"
+            )
+
+    def benchmark_pathological(self, sizes, max_seconds):
+        """Time both preprocessors on each adversarial input at each size."""
+        for name, build in PATHOLOGICAL_INPUTS.items():
+            self.stdout.write(f"\n{name}")
+            reference_done = False
+            for size in sizes:
+                text = build(size)
+                started = time.perf_counter()
+                output = markdown_extras.preprocess(text)
+                streaming = time.perf_counter() - started
+                line = (
+                    f"  n={size:<7} {len(text):>9} chars  "
+                    f"streaming {streaming * 1e3:9.1f} ms "
+                    f"({streaming / size * 1e6:6.2f} us/n)"
+                )
+
+                if not reference_done:
+                    started = time.perf_counter()
+                    expected = markdown_reference.preprocess(text)
+                    regex = time.perf_counter() - started
+                    reference_done = regex > max_seconds
+                    line += (
+                        f"  regex {regex * 1e3:9.1f} ms "
+                        f"({regex / size * 1e6:8.2f} us/n)"
+                    )
+                    if output != expected:
+                        self.stderr.write(f"  n={size}: output differs from regex")
+                self.stdout.write(line)
+
+    def load_documents(self, limit):
+        """Return {label: Markdown} for the newest club descriptions and posts."""
+        documents = {}
+        for club in Club.objects.only("slug", "description")[:limit]:
+            documents[f"club:{club.slug}"] = club.description
+        for post in Post.objects.only("id", "body")[:limit]:
+            documents[f"post:{post.id}"] = post.body
+        return documents
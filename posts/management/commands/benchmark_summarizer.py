@@ -0,0 +1,190 @@
+"""
+Benchmark summarization latency, throughput and memory.
+
+Usage:
+    python manage.py benchmark_summarizer
+    python manage.py benchmark_summarizer --num-beams 1 4 --batch-size 1 4 8 \
+        --threads 1 2 4 --output bench.json
+
+Runs the configured model over the bundled corpus (posts/utils/benchmark_corpus.py)
+for every combination of the given generation parameters, batch sizes and
+torch thread counts, and writes the results as JSON so runs can be compared.
+"""
+
+import itertools
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from posts.utils.backends import BACKEND, BACKENDS, load_model
+from posts.utils.benchmark_corpus import LENGTHS, build_corpus
+from posts.utils.profiling import current_rss_mb, peak_rss_mb, percentile
+from posts.utils.summarizer import DEFAULT_MODEL, _generation_settings
+
+
+class Command(BaseCommand):
+    help = "Benchmark the summarizer over a bundled corpus and write JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=DEFAULT_MODEL)
+        parser.add_argument("--backend", choices=BACKENDS, default=BACKEND)
+        parser.add_argument("--num-beams", type=int, nargs="+", default=[1, 4])
+        parser.add_argument("--max-length", type=int, nargs="+", default=[142])
+        parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 4, 8])
+        parser.add_argument(
+            "--threads",
+            type=int,
+            nargs="+",
+            default=[os.cpu_count() or 1],
+            help="torch intra-op thread counts to try (default: all cores)",
+        )
+        parser.add_argument(
+            "--lengths",
+            nargs="+",
+            choices=list(LENGTHS),
+            default=list(LENGTHS),
+            help="Corpus length buckets to run",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=1,
+            help="Passes over the corpus per configuration (default: 1)",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="JSON results file (default: summarizer-benchmark-<timestamp>.json)",
+        )
+
+    def handle(self, *args, **options):
+        import torch
+
+        model_name = options["model"]
+        corpus = build_corpus(options["lengths"])
+
+        started = time.perf_counter()
+        tokenizer, model = load_model(model_name, options["backend"])
+        load_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"Loaded {model_name} ({options['backend']}) in {load_seconds:.1f}s"
+        )
+
+        results = []
+        matrix = itertools.product(
+            options["threads"],
+            options["num_beams"],
+            options["max_length"],
+            options["batch_size"],
+            options["lengths"],
+        )
+        for threads, num_beams, max_length, batch_size, length in matrix:
+            torch.set_num_threads(threads)
+            result = self.run_config(
+                tokenizer,
+                model,
+                model_name,
+                corpus[length],
+                num_beams=num_beams,
+                max_length=max_length,
+                batch_size=batch_size,
+                runs=options["runs"],
+            )
+            result.update(
+                {
+                    "threads": threads,
+                    "num_beams": num_beams,
+                    "max_length": max_length,
+                    "batch_size": batch_size,
+                    "length": length,
+                }
+            )
+            results.append(result)
+            self.stdout.write(
+                f"threads={threads} beams={num_beams} max_length={max_length} "
+                f"batch={batch_size} {length:>9}: "
+                f"p50 {result['p50_ms']:.0f}ms p95 {result['p95_ms']:.0f}ms "
+                f"{result['tokens_per_second']:.1f} tok/s "
+                f"rss {result['rss_mb'] or 0:.0f}MB"
+            )
+
+        report = {
+            "model": model_name,
+            "backend": options["backend"],
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "load_seconds": load_seconds,
+            "peak_rss_mb": peak_rss_mb(),
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+            "torch_version": torch.__version__,
+            "results": results,
+        }
+
+        output = options["output"] or (
+            f"summarizer-benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"✓ Results written to {output}"))
+
+    def run_config(
+        self,
+        tokenizer,
+        model,
+        model_name,
+        bodies,
+        num_beams,
+        max_length,
+        batch_size,
+        runs,
+    ):
+        """Time generate over the bodies in batches; latency is per request."""
+        _, params = _generation_settings(model_name, max_length, 50)
+        params["num_beams"] = num_beams
+        if num_beams == 1:
+            # Beam-only options trigger warnings with greedy decoding
+            params.pop("length_penalty")
+            params.pop("early_stopping")
+
+        latencies = []
+        output_tokens = 0
+        total_seconds = 0.0
+        for _ in range(max(1, runs)):
+            for start in range(0, len(bodies), batch_size):
+                batch = bodies[start : start + batch_size]
+                inputs = tokenizer(
+                    batch,
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=1024,
+                )
+                started = time.perf_counter()
+                summary_ids = model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    **params,
+                )
+                elapsed = time.perf_counter() - started
+
+                total_seconds += elapsed
+                # Every request in a batch waits for the whole batch
+                latencies.extend([elapsed] * len(batch))
+                output_tokens += int(
+                    (summary_ids != tokenizer.pad_token_id).sum().item()
+                )
+
+        return {
+            "requests": len(latencies),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "docs_per_second": len(latencies) / total_seconds if total_seconds else 0,
+            "tokens_per_second": (
+                output_tokens / total_seconds if total_seconds else 0
+            ),
+            "rss_mb": current_rss_mb(),
+        }
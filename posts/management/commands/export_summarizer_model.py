@@ -0,0 +1,113 @@
+"""
+Export or quantize the summarization model for a faster CPU backend.
+
+Usage:
+    python manage.py export_summarizer_model --backend torch-int8
+    python manage.py export_summarizer_model --backend onnx --quantize --compare
+
+Then set SUMMARIZER_BACKEND to the same backend and restart.
+"""
+
+import gc
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.utils.backends import BACKENDS, export_model, load_model
+from posts.utils.profiling import current_rss_mb
+from posts.utils.summarizer import DEFAULT_MODEL, _generation_settings
+
+SAMPLE_TEXT = (
+    "The robotics club will hold its annual open house next Friday in the "
+    "engineering building. Members will demonstrate the line-following robots "
+    "built during the autumn workshop series, and the competition team will "
+    "show the drone it is preparing for the regional championship in March. "
+    "New students are welcome to drop in between 4pm and 7pm, try the "
+    "simulators and talk to the project leads about joining a team. Pizza and "
+    "drinks will be provided, and there will be a short talk on getting started "
+    "with embedded programming at 5pm. Please register on the club page so we "
+    "can plan catering, and bring a friend who might be interested."
+)
+
+
+class Command(BaseCommand):
+    help = "Export or quantize HF_SUMMARIZATION_MODEL for a summarizer backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            choices=[backend for backend in BACKENDS if backend != "torch"],
+            required=True,
+            help="Backend to export for",
+        )
+        parser.add_argument(
+            "--model",
+            default=DEFAULT_MODEL,
+            help=f"Model name (default: {DEFAULT_MODEL})",
+        )
+        parser.add_argument(
+            "--quantize",
+            action="store_true",
+            help="Also quantize ONNX graphs to int8 (onnx backend only)",
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Compare load time, latency and memory against the fp32 torch backend",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Generate calls per backend when comparing (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        model_name = options["model"]
+        backend = options["backend"]
+
+        self.stdout.write(f"Exporting {model_name} for {backend}...")
+        try:
+            path = export_model(model_name, backend, quantize=options["quantize"])
+        except ImportError as e:
+            raise CommandError(f"Missing dependency for {backend} backend: {e}")
+        self.stdout.write(self.style.SUCCESS(f"✓ Exported to {path}"))
+
+        if options["compare"]:
+            for name in ("torch", backend):
+                self.compare(model_name, name, options["runs"])
+
+    def compare(self, model_name, backend, runs):
+        """Load the model with a backend and report load time, latency and RSS."""
+        gc.collect()
+        rss_before = current_rss_mb()
+
+        started = time.perf_counter()
+        tokenizer, model = load_model(model_name, backend)
+        load_seconds = time.perf_counter() - started
+        rss_after = current_rss_mb()
+
+        _, params = _generation_settings(model_name, 300, 50)
+        inputs = tokenizer(SAMPLE_TEXT, return_tensors="pt", truncation=True)
+        latencies = []
+        for _ in range(max(1, runs)):
+            started = time.perf_counter()
+            model.generate(
+                inputs["input_ids"], attention_mask=inputs["attention_mask"], **params
+            )
+            latencies.append(time.perf_counter() - started)
+
+        memory = (
+            f"{rss_after - rss_before:.0f} MB"
+            if rss_before is not None and rss_after is not None
+            else "n/a"
+        )
+        self.stdout.write(
+            f"{backend:>10}: load {load_seconds:.1f}s, "
+            f"median latency {statistics.median(latencies):.2f}s, "
+            f"model memory {memory}"
+        )
+
+        del model, tokenizer
+        gc.collect()
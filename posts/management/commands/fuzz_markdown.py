@@ -0,0 +1,136 @@
+"""
+Differential fuzzing of the Markdown helpers against their reference output.
+
+Usage:
+    python manage.py fuzz_markdown
+    python manage.py fuzz_markdown --iterations 20000 --seed 7
+    python manage.py fuzz_markdown --candidate myapp.fast.render --against markdown
+
+Random documents (see posts/utils/markdown_fuzz.py) are run through every
+check: an optimized helper and the reference it must match exactly
+(posts/utils/markdown_reference.py). A candidate given with --candidate is
+checked against the reference named by --against instead, so a faster
+renderer can be validated before it replaces the current one. The first
+mismatch of each check is shrunk to the fewest lines that still differ and
+printed; the command fails if any check found one.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from posts.templatetags import markdown_extras
+from posts.utils import markdown_reference
+from posts.utils.markdown_fuzz import random_document, shrink
+
+REFERENCES = {
+    "preprocess": markdown_reference.preprocess,
+    "markdown": markdown_reference.render,
+    "markdown_to_text": markdown_reference.markdown_to_text,
+}
+
+# (check name, implementation, reference name)
+CHECKS = (
+    ("preprocess", markdown_extras.preprocess, "preprocess"),
+    ("pooled converter", markdown_extras.render_markdown, "markdown"),
+    ("markdown filter", markdown_extras.markdown_filter, "markdown"),
+    (
+        "block renderer",
+        lambda text: markdown_extras.render_markdown_blocks(text, min_chars=0),
+        "markdown",
+    ),
+    ("markdown_to_text", markdown_extras.markdown_to_text, "markdown_to_text"),
+)
+
+
+class Command(BaseCommand):
+    help = "Check the Markdown helpers against their reference on random input."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=2000,
+            help="Random documents to check (default: 2000)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Random seed, to repeat a run (default: random)",
+        )
+        parser.add_argument(
+            "--max-blocks",
+            type=int,
+            default=12,
+            help="Largest number of blocks per document (default: 12)",
+        )
+        parser.add_argument(
+            "--candidate",
+            metavar="DOTTED.PATH",
+            help="Check this function instead of the built-in helpers",
+        )
+        parser.add_argument(
+            "--against",
+            choices=sorted(REFERENCES),
+            default="markdown",
+            help="Reference output for --candidate (default: markdown)",
+        )
+
+    def handle(self, *args, **options):
+        checks = CHECKS
+        if options["candidate"]:
+            try:
+                candidate = import_string(options["candidate"])
+            except ImportError as e:
+                raise CommandError(f"Cannot import {options['candidate']}: {e}")
+            checks = ((options["candidate"], candidate, options["against"]),)
+
+        seed = options["seed"]
+        if seed is None:
+            seed = random.randrange(2**32)
+        rng = random.Random(seed)
+        self.stdout.write(f"Seed {seed}, {options['iterations']} documents")
+
+        failures = {}  # check name -> shrunk document
+        started = time.monotonic()
+        for _ in range(options["iterations"]):
+            text = random_document(rng, options["max_blocks"])
+            for name, function, against in checks:
+                if name in failures:
+                    continue
+                reference = REFERENCES[against]
+                if self.differs(function, reference, text):
+                    failures[name] = shrink(
+                        text, lambda t: self.differs(function, reference, t)
+                    )
+
+        elapsed = time.monotonic() - started
+        for name, function, against in checks:
+            if name not in failures:
+                self.stdout.write(self.style.SUCCESS(f"  {name}: identical"))
+                continue
+            text = failures[name]
+            expected = self.output(REFERENCES[against], text)
+            self.stdout.write(self.style.ERROR(f"  {name}: differs from {against}"))
+            self.stdout.write(f"    input:    {text!r}")
+            self.stdout.write(f"    expected: {expected!r}")
+            self.stdout.write(f"    got:      {self.output(function, text)!r}")
+        self.stdout.write(f"Checked in {elapsed:.1f}s")
+        if failures:
+            raise CommandError(
+                f"{len(failures)} check(s) differ; rerun with --seed {seed}"
+            )
+
+    @staticmethod
+    def output(function, text):
+        """Return function(text) as a string, or the exception it raised."""
+        try:
+            return str(function(text))
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+    def differs(self, function, reference, text):
+        # A crash counts as a difference, so it is shrunk and reported too
+        return self.output(function, text) != self.output(reference, text)
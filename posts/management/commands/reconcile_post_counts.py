@@ -0,0 +1,100 @@
+"""
+Fix drift between the stored post counters and the Like/Comment rows.
+
+Usage:
+    python manage.py reconcile_post_counts
+    python manage.py reconcile_post_counts --batch-size 2000 --dry-run
+
+posts/signals.py moves Post.like_count and Post.comment_count as rows are
+created and deleted, but bulk operations, raw SQL and restores skip signals.
+Posts are checked in batches of ids; only posts whose counters differ from a
+fresh COUNT are written, with the count recomputed in the UPDATE itself so a
+like arriving between the check and the write is not lost. Safe to run while
+the site is up, and to interrupt.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Like, Post
+
+
+def row_count(model):
+    """A subquery expression counting the model's rows for the outer post."""
+    rows = (
+        model.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+class Command(BaseCommand):
+    help = "Recount likes and comments and fix posts whose stored counters drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Posts checked per batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted posts without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        checked = fixed = 0
+        last_id = 0
+        while True:
+            # Keyset pagination over ids keeps every batch an index range scan
+            ids = list(
+                Post.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[: options["batch_size"]]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            drifted = (
+                Post.objects.filter(id__in=ids)
+                .annotate(
+                    actual_likes=row_count(Like), actual_comments=row_count(Comment)
+                )
+                .exclude(
+                    like_count=F("actual_likes"), comment_count=F("actual_comments")
+                )
+            )
+            if options["dry_run"]:
+                for post in drifted.only("id", "like_count", "comment_count"):
+                    self.stdout.write(
+                        f"  post {post.id}: "
+                        f"likes {post.like_count} -> {post.actual_likes}, "
+                        f"comments {post.comment_count} -> {post.actual_comments}"
+                    )
+                    fixed += 1
+                continue
+
+            drifted_ids = list(drifted.values_list("id", flat=True))
+            if drifted_ids:
+                fixed += Post.objects.filter(id__in=drifted_ids).update(
+                    like_count=row_count(Like), comment_count=row_count(Comment)
+                )
+
+        verb = "drifted" if options["dry_run"] else "fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {checked} posts, {fixed} {verb} in "
+                f"{time.monotonic() - started:.1f}s"
+            )
+        )
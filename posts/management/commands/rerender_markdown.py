@@ -0,0 +1,97 @@
+"""
+Re-render the stored HTML and excerpts of post bodies and club descriptions.
+
+Usage:
+    python manage.py rerender_markdown
+    python manage.py rerender_markdown --all --batch-size 200
+
+Only rows rendered with another MARKDOWN_RENDERER_VERSION (or never rendered)
+are processed unless --all is given, so an interrupted run simply continues
+where it stopped when started again. Run it after bumping the renderer version.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from clubs.models import Club
+from posts.models import Post
+from posts.templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    make_excerpt,
+    render_markdown,
+)
+
+# (model, source field, html field, version field)
+TARGETS = (
+    (Post, "body", "body_html", "body_html_version"),
+    (Club, "description", "description_html", "description_html_version"),
+)
+EXCERPT_FIELD = "excerpt"
+
+
+class Command(BaseCommand):
+    help = "Re-render stored Markdown HTML and excerpts for posts and clubs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every row, not only those from another renderer version",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows rendered and saved per batch (default: 500)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many rows are outdated without rendering them",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Markdown renderer version {MARKDOWN_RENDERER_VERSION}")
+        for model, source, html_field, version_field in TARGETS:
+            queryset = model.objects.all()
+            if not options["all"]:
+                queryset = queryset.exclude(
+                    **{version_field: MARKDOWN_RENDERER_VERSION}
+                )
+            label = model._meta.verbose_name_plural
+
+            if options["dry_run"]:
+                self.stdout.write(f"{queryset.count()} {label} to re-render")
+                continue
+
+            started = time.monotonic()
+            rendered = 0
+            last_id = 0
+            while True:
+                # Keyset pagination: rows drop out of the filter once rendered
+                batch = list(
+                    queryset.filter(id__gt=last_id)
+                    .order_by("id")
+                    .only("id", source)[: options["batch_size"]]
+                )
+                if not batch:
+                    break
+                for obj in batch:
+                    text = getattr(obj, source)
+                    setattr(obj, html_field, render_markdown(text))
+                    setattr(obj, EXCERPT_FIELD, make_excerpt(text))
+                    setattr(obj, version_field, MARKDOWN_RENDERER_VERSION)
+                # bulk_update skips save(), so nothing is rendered twice
+                model.objects.bulk_update(
+                    batch, [html_field, EXCERPT_FIELD, version_field]
+                )
+                rendered += len(batch)
+                last_id = batch[-1].id
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Re-rendered {rendered} {label} in "
+                    f"{time.monotonic() - started:.1f}s"
+                )
+            )
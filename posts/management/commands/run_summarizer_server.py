@@ -0,0 +1,57 @@
+"""
+Run the shared summarization server.
+
+Usage:
+    python manage.py run_summarizer_server
+    python manage.py run_summarizer_server --address unix:/run/clubify/summarizer.sock
+
+Web and worker processes started with SUMMARIZER_SERVER_ADDRESS set to the
+same address forward their summarizations here, so only this process holds
+the model in memory.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.utils.inference_server import (
+    DEFAULT_SERVER_ADDRESS,
+    SERVER_ADDRESS,
+    create_server,
+)
+from posts.utils.summarizer import DEFAULT_MODEL, get_hf_summarizer
+
+
+class Command(BaseCommand):
+    help = "Serve summarization requests from a single shared model process."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address",
+            default=SERVER_ADDRESS or DEFAULT_SERVER_ADDRESS,
+            help=(
+                "unix:/path/to/socket or host:port to listen on "
+                f"(default: SUMMARIZER_SERVER_ADDRESS or {DEFAULT_SERVER_ADDRESS})"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        address = options["address"]
+
+        self.stdout.write(f"Loading model {DEFAULT_MODEL}...")
+        summarizer = get_hf_summarizer(DEFAULT_MODEL)
+        if summarizer is False or summarizer is None:
+            raise CommandError(f"Failed to load model {DEFAULT_MODEL}")
+
+        try:
+            server = create_server(address)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot listen on {address}: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Summarizer server listening on {address}")
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping summarizer server")
+        finally:
+            server.server_close()
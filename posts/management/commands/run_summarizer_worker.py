@@ -0,0 +1,207 @@
+"""
+Process queued post summarization jobs.
+
+Usage:
+    python manage.py run_summarizer_worker
+    python manage.py run_summarizer_worker --batch-size 8 --once
+
+Run as many workers as the hardware allows; each claims its own jobs with
+SELECT ... FOR UPDATE SKIP LOCKED. Posts whose summary a web request is
+already generating are deferred and picked up from the cache afterwards.
+When the job queue is empty, discussion digests flagged by new comments are
+refreshed (see posts/digest.py).
+"""
+
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from posts.digest import build_digests, claim_stale_digests
+from posts.jobs import MAX_ATTEMPTS, claim_jobs, complete_job, defer_job, fail_job
+from posts.models import Post, SummaryOrigin, SummarySource
+from posts.single_flight import begin_flight
+from posts.summary_cache import get_cached_summary, summary_key_for, summary_model_for
+from posts.telemetry import build_run, record_runs
+from posts.utils.batching import BATCH_SIZE
+from posts.utils.summarizer import summarize_many_by_model
+
+# Seconds before retrying a job whose summary another process is generating
+DEFER_SECONDS = 5
+
+
+class Command(BaseCommand):
+    help = "Process queued post summarization jobs in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Jobs claimed and summarized together (default: {BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty (default: 2)",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=MAX_ATTEMPTS,
+            help=f"Attempts before a job is marked failed (default: {MAX_ATTEMPTS})",
+        )
+        parser.add_argument(
+            "--worker-id",
+            default=f"{socket.gethostname()}:{os.getpid()}",
+            help="Identifier recorded on claimed jobs (default: host:pid)",
+        )
+        parser.add_argument(
+            "--no-digests",
+            action="store_true",
+            help="Do not refresh discussion digests when the job queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        worker_id = options["worker_id"]
+        self.stdout.write(f"Summarizer worker {worker_id} started")
+
+        try:
+            while True:
+                close_old_connections()
+                processed = self.process_batch(
+                    worker_id, options["batch_size"], options["max_attempts"]
+                )
+                if not processed and not options["no_digests"]:
+                    processed = self.process_digests(options["batch_size"])
+                if processed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping summarizer worker")
+
+    def process_batch(self, worker_id, batch_size, max_attempts):
+        """Claim and process one batch of jobs. Returns the number of jobs claimed."""
+        jobs = claim_jobs(worker_id, batch_size)
+        if not jobs:
+            return 0
+
+        posts = (
+            Post.objects.select_related("club")
+            .only("id", "body", "summary", "summary_hash", "club__summarizer_model")
+            .in_bulk([job.post_id for job in jobs])
+        )
+
+        # Jobs still needing inference, grouped by summary key so identical
+        # bodies (e.g. cross-posted announcements) are summarized once
+        pending = {}
+        flights = []
+        runs = []
+        started = time.monotonic()
+        for job in jobs:
+            post = posts.get(job.post_id)
+            if post is None:
+                continue
+            key = summary_key_for(post)
+            cached = get_cached_summary(post, key)
+            if cached:
+                complete_job(job, post, key, cached, shared=False)
+                runs.append(
+                    build_run(
+                        post,
+                        SummarySource.CACHE,
+                        SummaryOrigin.WORKER,
+                        started,
+                        post.body,
+                    )
+                )
+            elif len(post.body.strip()) < 50:
+                # Short posts are their own summary, same as summarize_text
+                complete_job(job, post, key, post.body, shared=False)
+                runs.append(
+                    build_run(
+                        post,
+                        SummarySource.ORIGINAL,
+                        SummaryOrigin.WORKER,
+                        started,
+                        post.body,
+                    )
+                )
+            else:
+                flight = begin_flight(post, key)
+                if flight is None:
+                    defer_job(job, DEFER_SECONDS)
+                    continue
+                flights.append(flight)
+                pending.setdefault(key, []).append((job, post))
+
+        try:
+            self.summarize_pending(pending, max_attempts, len(jobs), runs)
+        finally:
+            for flight in flights:
+                flight.release()
+        record_runs(runs)
+
+        return len(jobs)
+
+    def process_digests(self, batch_size):
+        """Refresh a batch of flagged discussion digests. Returns the number claimed."""
+        posts = claim_stale_digests(batch_size)
+        if not posts:
+            return 0
+
+        started = time.monotonic()
+        updated = build_digests(posts)
+        self.stdout.write(
+            f"Refreshed {len(updated)} of {len(posts)} discussion digests in "
+            f"{time.monotonic() - started:.1f}s"
+        )
+        return len(posts)
+
+    def summarize_pending(self, pending, max_attempts, job_count, runs):
+        """Summarize each pending key once, complete or fail its jobs and add telemetry to runs."""
+        if not pending:
+            return
+
+        started = time.monotonic()
+        keys = list(pending)
+        posts = [pending[key][0][1] for key in keys]
+        model_names = [summary_model_for(post) for post in posts]
+        metrics = []
+        summaries = summarize_many_by_model(
+            [post.body for post in posts], model_names, metrics=metrics
+        )
+        for key, summary, post, model_name, entry in zip(
+            keys, summaries, posts, model_names, metrics
+        ):
+            if summary:
+                runs.append(
+                    build_run(
+                        post,
+                        SummarySource.MODEL,
+                        SummaryOrigin.WORKER,
+                        started,
+                        post.body,
+                        model_name,
+                        entry,
+                    )
+                )
+            for job, post in pending[key]:
+                if summary:
+                    complete_job(job, post, key, summary)
+                else:
+                    fail_job(job, "Summarization returned empty result", max_attempts)
+        self.stdout.write(
+            f"Processed {len(keys)} summaries for {job_count} jobs in "
+            f"{time.monotonic() - started:.1f}s"
+        )
@@ -0,0 +1,184 @@
+"""
+Report summarization latency percentiles from recorded telemetry.
+
+Usage:
+    python manage.py summarizer_report
+    python manage.py summarizer_report --days 30 --origin view --json
+    python manage.py summarizer_report --prune-days 30
+
+Generated runs (model and streamed) are grouped by model and by input size;
+every run is also counted by source, which gives the cache hit rate.
+Every summary served, cache hits included, adds a run, so schedule
+--prune-days (by default SUMMARIZER_TELEMETRY_RETENTION_DAYS) to keep the
+table bounded.
+"""
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.models import SummaryOrigin, SummaryRun
+from posts.telemetry import GENERATED_SOURCES, RETENTION_DAYS, prune_runs
+from posts.utils.profiling import percentile
+
+# (label, upper bound in input characters)
+SIZE_BUCKETS = [
+    ("<1k chars", 1000),
+    ("1k-4k chars", 4000),
+    ("4k-16k chars", 16000),
+    ("16k+ chars", None),
+]
+
+
+def size_bucket(input_chars):
+    for label, limit in SIZE_BUCKETS:
+        if limit is None or input_chars < limit:
+            return label
+
+
+def summarize_group(runs):
+    """Return run count and latency percentiles (ms) for a list of run dicts."""
+
+    def values(field):
+        return [run[field] for run in runs if run[field] is not None]
+
+    total = values("total_ms")
+    generate = values("generate_ms")
+    wait = values("queue_wait_ms")
+    output_tokens = values("output_tokens")
+    return {
+        "runs": len(runs),
+        "total_ms_p50": percentile(total, 50),
+        "total_ms_p95": percentile(total, 95),
+        "total_ms_p99": percentile(total, 99),
+        "generate_ms_p50": percentile(generate, 50),
+        "generate_ms_p95": percentile(generate, 95),
+        "queue_wait_ms_p95": percentile(wait, 95),
+        "avg_output_tokens": (
+            sum(output_tokens) / len(output_tokens) if output_tokens else None
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "Aggregate summarization telemetry into latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=7,
+            help="Only runs from the last N days (default: 7)",
+        )
+        parser.add_argument("--model", help="Only runs of this model")
+        parser.add_argument(
+            "--origin",
+            choices=SummaryOrigin.values,
+            help="Only runs started from this entry point",
+        )
+        parser.add_argument(
+            "--prune-days",
+            type=int,
+            nargs="?",
+            const=RETENTION_DAYS,
+            help="Delete runs older than N days instead of reporting "
+            f"(default N: {RETENTION_DAYS})",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON"
+        )
+
+    def handle(self, *args, **options):
+        if options["prune_days"] is not None:
+            deleted = prune_runs(options["prune_days"])
+            self.stdout.write(
+                f"Deleted {deleted} runs older than {options['prune_days']} days"
+            )
+            return
+
+        runs = SummaryRun.objects.filter(
+            created_at__gte=timezone.now() - timedelta(days=options["days"])
+        )
+        if options["model"]:
+            runs = runs.filter(model_name=options["model"])
+        if options["origin"]:
+            runs = runs.filter(origin=options["origin"])
+
+        by_source = {}
+        by_model = {}
+        by_size = {}
+        for run in runs.values(
+            "source",
+            "model_name",
+            "input_chars",
+            "total_ms",
+            "generate_ms",
+            "queue_wait_ms",
+            "output_tokens",
+        ).iterator():
+            by_source.setdefault(run["source"], []).append(run)
+            if run["source"] in GENERATED_SOURCES:
+                by_model.setdefault(run["model_name"], []).append(run)
+                by_size.setdefault(size_bucket(run["input_chars"]), []).append(run)
+
+        total_runs = sum(len(group) for group in by_source.values())
+        report = {
+            "days": options["days"],
+            "runs": total_runs,
+            "by_source": {
+                source: {
+                    "runs": len(group),
+                    "share": len(group) / total_runs,
+                    "total_ms_p50": percentile([r["total_ms"] for r in group], 50),
+                    "total_ms_p95": percentile([r["total_ms"] for r in group], 95),
+                }
+                for source, group in sorted(by_source.items())
+            },
+            "by_model": {
+                model: summarize_group(group)
+                for model, group in sorted(by_model.items())
+            },
+            "by_input_size": {
+                label: summarize_group(by_size[label])
+                for label, _ in SIZE_BUCKETS
+                if label in by_size
+            },
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.print_report(report)
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['runs']} summarization runs in the last {report['days']} days"
+        )
+        if not report["runs"]:
+            return
+
+        self.stdout.write("\nBy source:")
+        for source, stats in report["by_source"].items():
+            self.stdout.write(
+                f"  {source:<12} {stats['runs']:>7} runs ({stats['share']:>6.1%})  "
+                f"p50 {stats['total_ms_p50']:>8.0f} ms  p95 {stats['total_ms_p95']:>8.0f} ms"
+            )
+
+        for title, groups in (
+            ("By model", report["by_model"]),
+            ("By input size", report["by_input_size"]),
+        ):
+            self.stdout.write(f"\n{title} (generated runs):")
+            self.stdout.write(
+                f"  {'':<40} {'runs':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+                f"{'gen p95':>8} {'wait p95':>8}"
+            )
+            for name, stats in groups.items():
+                self.stdout.write(
+                    f"  {name[:40]:<40} {stats['runs']:>7} "
+                    f"{stats['total_ms_p50']:>8.0f} {stats['total_ms_p95']:>8.0f} "
+                    f"{stats['total_ms_p99']:>8.0f} {stats['generate_ms_p95']:>8.0f} "
+                    f"{stats['queue_wait_ms_p95']:>8.0f}"
+                )
@@ -0,0 +1,91 @@
+"""
+Switch clubs to a different summarization model without a restart.
+
+Usage:
+    python manage.py switch_summarizer_model facebook/bart-large-cnn --club robotics
+    python manage.py switch_summarizer_model sshleifer/distilbart-cnn-6-6 --all
+    python manage.py switch_summarizer_model --reset --club robotics
+
+The model is loaded first (on the summarizer server when
+SUMMARIZER_SERVER_ADDRESS is set), then the clubs are switched in a single
+update. Web processes without the server load the model in the background on
+their first request for a switched club and serve extractive summaries until
+it is ready.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from clubs.models import Club
+from posts.utils.backends import load_model
+from posts.utils.inference_server import (
+    SERVER_ADDRESS,
+    SummarizerUnavailable,
+    remote_load_model,
+)
+
+
+class Command(BaseCommand):
+    help = "Load a summarization model and switch clubs to it atomically."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", nargs="?", help="Hugging Face model name")
+        parser.add_argument(
+            "--club",
+            action="append",
+            default=[],
+            help="Slug of a club to switch (repeatable)",
+        )
+        parser.add_argument("--all", action="store_true", help="Switch every club")
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Switch the clubs back to the site default model",
+        )
+        parser.add_argument(
+            "--no-preload",
+            action="store_true",
+            help="Switch without loading the model first",
+        )
+
+    def handle(self, *args, **options):
+        model_name = "" if options["reset"] else options["model"]
+        if not options["reset"] and not model_name:
+            raise CommandError("Give a model name, or --reset")
+        if not options["all"] and not options["club"]:
+            raise CommandError("Give at least one --club, or --all")
+
+        clubs = Club.objects.all()
+        if not options["all"]:
+            clubs = clubs.filter(slug__in=options["club"])
+            missing = set(options["club"]) - set(clubs.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Unknown clubs: {', '.join(sorted(missing))}")
+
+        if model_name and not options["no_preload"]:
+            self.preload(model_name)
+
+        with transaction.atomic():
+            switched = clubs.update(summarizer_model=model_name)
+
+        target = model_name or "the site default model"
+        self.stdout.write(self.style.SUCCESS(f"Switched {switched} clubs to {target}"))
+
+    def preload(self, model_name):
+        """Load the model where it will serve traffic, failing before any club is switched."""
+        if SERVER_ADDRESS:
+            self.stdout.write(f"Loading {model_name} on the summarizer server...")
+            try:
+                loaded = remote_load_model(model_name, timeout=600)
+            except SummarizerUnavailable as e:
+                raise CommandError(str(e))
+            if not loaded:
+                raise CommandError(f"Summarizer server failed to load {model_name}")
+            return
+
+        # Each web process loads its own copy; this checks that the model loads
+        self.stdout.write(f"Checking that {model_name} loads...")
+        try:
+            load_model(model_name)
+        except Exception as e:
+            raise CommandError(f"Failed to load {model_name}: {e}")
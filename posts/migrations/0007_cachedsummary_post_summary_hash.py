@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0006_summaryjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=64, unique=True)),
+                ("model_name", models.CharField(max_length=200)),
+                ("summary", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="summary_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="Cache key of the body the summary was generated from",
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0007_cachedsummary_post_summary_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("cache", "Cache"),
+                            ("model", "Model"),
+                            ("stream", "Streamed model"),
+                            ("extractive", "Extractive"),
+                            ("original", "Original text"),
+                            ("fallback", "Fallback"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "origin",
+                    models.CharField(
+                        help_text="Where the run started: view, stream, worker or backfill",
+                        max_length=10,
+                    ),
+                ),
+                ("model_name", models.CharField(blank=True, max_length=200)),
+                ("backend", models.CharField(blank=True, max_length=20)),
+                ("input_chars", models.PositiveIntegerField()),
+                ("input_tokens", models.PositiveIntegerField(blank=True, null=True)),
+                ("output_tokens", models.PositiveIntegerField(blank=True, null=True)),
+                ("chunks", models.PositiveIntegerField(default=0)),
+                ("queue_wait_ms", models.FloatField(blank=True, null=True)),
+                ("generate_ms", models.FloatField(blank=True, null=True)),
+                ("total_ms", models.FloatField()),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="summary_runs",
+                        to="posts.post",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
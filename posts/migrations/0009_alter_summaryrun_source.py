@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0008_summaryrun"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="summaryrun",
+            name="source",
+            field=models.CharField(
+                choices=[
+                    ("cache", "Cache"),
+                    ("model", "Model"),
+                    ("stream", "Streamed model"),
+                    ("extractive", "Extractive"),
+                    ("original", "Original text"),
+                    ("fallback", "Fallback"),
+                    ("shed", "Shed (busy)"),
+                ],
+                max_length=10,
+            ),
+        ),
+    ]
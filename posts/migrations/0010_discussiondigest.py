@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0009_alter_summaryrun_source"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DiscussionDigest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("summary", models.TextField(blank=True)),
+                (
+                    "comment_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of comments the summary covers"
+                    ),
+                ),
+                (
+                    "last_comment_id",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Newest comment included in the summary"
+                    ),
+                ),
+                ("model_name", models.CharField(blank=True, max_length=200)),
+                ("needs_refresh", models.BooleanField(db_index=True, default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="digest",
+                        to="posts.post",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0010_discussiondigest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="body_html",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Body rendered from Markdown on save",
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="body_html_version",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Markdown renderer version body_html was rendered with",
+            ),
+        ),
+    ]
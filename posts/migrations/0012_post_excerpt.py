@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0011_post_body_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Plain-text opening words of the body for lists and meta tags",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="body_html_version",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Markdown renderer version of body_html and excerpt",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing(apps, schema_editor):
+    """Fill the new counters from the existing likes and comments."""
+    Post = apps.get_model("posts", "Post")
+    Like = apps.get_model("posts", "Like")
+    Comment = apps.get_model("posts", "Comment")
+
+    def count(model):
+        rows = (
+            model.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    Post.objects.update(like_count=count(Like), comment_count=count(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0012_post_excerpt"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Number of comments on this post"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="like_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Number of likes on this post"
+            ),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
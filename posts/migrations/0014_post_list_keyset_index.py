@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clubs", "0008_club_excerpt"),
+        ("posts", "0013_post_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["club", "post_type", "is_published", "-created_at", "-id"],
+                name="posts_post_list_keyset_idx",
+            ),
+        ),
+    ]
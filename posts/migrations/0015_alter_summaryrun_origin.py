@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0014_post_list_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="summaryrun",
+            name="origin",
+            field=models.CharField(
+                choices=[
+                    ("view", "View"),
+                    ("stream", "Stream"),
+                    ("worker", "Worker"),
+                    ("backfill", "Backfill"),
+                    ("digest", "Discussion digest"),
+                ],
+                help_text="Where the run started",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+from posts.templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    render_markdown,
+)
+
+BATCH_SIZE = 500
+
+
+def render_existing(apps, schema_editor):
+    """Render body_html for posts saved before it was stored."""
+    Post = apps.get_model("posts", "Post")
+    queryset = Post.objects.filter(body_html_version=0).order_by("id")
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).only("id", "body")[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.body_html = render_markdown(post.body)
+            post.body_html_version = MARKDOWN_RENDERER_VERSION
+        Post.objects.bulk_update(batch, ["body_html", "body_html_version"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0015_alter_summaryrun_origin"),
+    ]
+
+    operations = [
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
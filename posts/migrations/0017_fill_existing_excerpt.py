@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from posts.templatetags.markdown_extras import make_excerpt
+
+BATCH_SIZE = 500
+
+
+def fill_existing(apps, schema_editor):
+    """Store the excerpt of posts saved before it was stored."""
+    Post = apps.get_model("posts", "Post")
+    queryset = Post.objects.filter(excerpt="").exclude(body="").order_by("id")
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).only("id", "body")[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = make_excerpt(post.body)
+        Post.objects.bulk_update(batch, ["excerpt"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0016_render_existing_body_html"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_existing, migrations.RunPython.noop),
+    ]
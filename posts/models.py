@@ -1,6 +1,21 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 from clubs.models import Club
+from .templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    make_excerpt,
+    render_markdown,
+    render_markdown_blocks,
+)
+
+
+# Large text columns list pages never show; they use the stored excerpt instead
+LIST_DEFERRED_FIELDS = ("body", "body_html", "summary")
+
+# Maintained with F() updates only, never written by Post.save()
+COUNTER_FIELDS = ("like_count", "comment_count")
 
 
 class PostType(models.TextChoices):
@@ -26,15 +41,93 @@ class Post(models.Model):
     summary = models.TextField(
         blank=True, null=True, help_text="AI-generated summary of the post"
     )
+    summary_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Cache key of the body the summary was generated from",
+    )
+    body_html = models.TextField(
+        blank=True, editable=False, help_text="Body rendered from Markdown on save"
+    )
+    body_html_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Markdown renderer version of body_html and excerpt",
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Plain-text opening words of the body for lists and meta tags",
+    )
+    # Kept in step by posts/signals.py; see the reconcile_post_counts command
+    like_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of likes on this post"
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of comments on this post"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pages of news_list/blog_list (see posts/pagination.py)
+            models.Index(
+                fields=["club", "post_type", "is_published", "-created_at", "-id"],
+                name="posts_post_list_keyset_idx",
+            )
+        ]
 
     def __str__(self):
         return f"[{self.get_post_type_display()}] {self.title}"
 
+    def save(self, *args, **kwargs):
+        # The counters are moved in the database by posts/signals.py; writing
+        # this instance's (possibly stale) copies would undo those updates
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+
+        # Render the body once per edit instead of once per page view
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "body" in update_fields:
+            self.render_body()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "body_html",
+                    "body_html_version",
+                    "excerpt",
+                }
+        super().save(*args, **kwargs)
+
+    def render_body(self):
+        """
+        Render body_html and excerpt from the body with the current renderer.
+        Blocks unchanged since an earlier render in this process are reused.
+        """
+        self.body_html = render_markdown_blocks(self.body)
+        self.excerpt = make_excerpt(self.body)
+        self.body_html_version = MARKDOWN_RENDERER_VERSION
+
+    @property
+    def rendered_body(self):
+        """The body as HTML, from body_html unless it is missing or outdated."""
+        if self.body_html_version != MARKDOWN_RENDERER_VERSION:
+            return mark_safe(render_markdown(self.body))
+        return mark_safe(self.body_html)
+
     @property
     def is_news(self):
         return self.post_type == PostType.NEWS
@@ -43,16 +136,6 @@ class Post(models.Model):
     def is_blog(self):
         return self.post_type == PostType.BLOG
 
-    @property
-    def like_count(self):
-        """Returns the total number of likes on this post."""
-        return self.likes.count()
-
-    @property
-    def comment_count(self):
-        """Returns the total number of comments on this post."""
-        return self.comments.count()
-
     def is_liked_by(self, user):
         """Check if a specific user has liked this post."""
         if not user.is_authenticated:
@@ -117,3 +200,135 @@ class Bookmark(models.Model):
 
     def __str__(self):
         return f"{self.user.username} bookmarked {self.post.title}"
+
+
+class CachedSummary(models.Model):
+    """
+    A generated summary shared by every post with the same body.
+    Keyed by a hash of the normalized body, model name and generation parameters.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=200)
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.model_name}: {self.content_hash[:12]}"
+
+
+class DiscussionDigest(models.Model):
+    """
+    AI summary of a post's comment thread.
+    Covers comments up to last_comment_id and is refreshed incrementally once
+    enough new comments arrive (see posts/digest.py).
+    """
+
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name="digest")
+    summary = models.TextField(blank=True)
+    comment_count = models.PositiveIntegerField(
+        default=0, help_text="Number of comments the summary covers"
+    )
+    last_comment_id = models.PositiveIntegerField(
+        default=0, help_text="Newest comment included in the summary"
+    )
+    model_name = models.CharField(max_length=200, blank=True)
+    needs_refresh = models.BooleanField(default=False, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Digest of {self.comment_count} comments on post {self.post_id}"
+
+
+class JobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class SummaryJob(models.Model):
+    """
+    Represents a queued request to generate a post's AI summary.
+    Jobs are claimed and processed by the run_summarizer_worker command.
+    """
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="summary_jobs"
+    )
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["run_after"]
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"Summary job for post {self.post_id} ({self.status})"
+
+
+class SummarySource(models.TextChoices):
+    CACHE = "cache", "Cache"
+    MODEL = "model", "Model"
+    STREAM = "stream", "Streamed model"
+    EXTRACTIVE = "extractive", "Extractive"
+    ORIGINAL = "original", "Original text"
+    FALLBACK = "fallback", "Fallback"
+    SHED = "shed", "Shed (busy)"
+
+
+class SummaryOrigin(models.TextChoices):
+    VIEW = "view", "View"
+    STREAM = "stream", "Stream"
+    WORKER = "worker", "Worker"
+    BACKFILL = "backfill", "Backfill"
+    DIGEST = "digest", "Discussion digest"
+
+
+class SummaryRun(models.Model):
+    """
+    Telemetry for one summarization: where the summary came from and what it cost.
+    Aggregated by the summarizer_report command.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="summary_runs",
+    )
+    source = models.CharField(max_length=10, choices=SummarySource.choices)
+    origin = models.CharField(
+        max_length=10,
+        choices=SummaryOrigin.choices,
+        help_text="Where the run started",
+    )
+    model_name = models.CharField(max_length=200, blank=True)
+    backend = models.CharField(max_length=20, blank=True)
+    input_chars = models.PositiveIntegerField()
+    input_tokens = models.PositiveIntegerField(null=True, blank=True)
+    output_tokens = models.PositiveIntegerField(null=True, blank=True)
+    chunks = models.PositiveIntegerField(default=0)
+    queue_wait_ms = models.FloatField(null=True, blank=True)
+    generate_ms = models.FloatField(null=True, blank=True)
+    total_ms = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.source} summary of post {self.post_id} in {self.total_ms:.0f} ms"
@@ -0,0 +1,63 @@
+"""
+Keyset (cursor) pagination of posts, newest first.
+
+A page is the `size` posts that sort after the cursor on (created_at, id),
+so every page is one index range scan however deep the reader scrolls,
+unlike OFFSET, which reads and discards every row before the page. The
+cursor is the (created_at, id) of the last post shown, encoded into an
+opaque URL-safe string; id breaks ties between posts created in the same
+microsecond.
+"""
+
+import base64
+import binascii
+from datetime import datetime, timezone
+
+from django.db.models import Q
+
+# Largest value of Post.id, a BigAutoField
+MAX_POST_ID = 2**63 - 1
+
+
+def encode_cursor(post):
+    """Return the cursor for the page after post."""
+    raw = f"{post.created_at.isoformat()}~{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Return (created_at, id) from a cursor, or None if it is malformed or its id
+    cannot be a post's. A created_at without an offset is taken as UTC.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, post_id = raw.rsplit("~", 1)
+        created_at, post_id = datetime.fromisoformat(created_at), int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not 1 <= post_id <= MAX_POST_ID:
+        return None
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at, post_id
+
+
+def keyset_page(queryset, position, size):
+    """
+    Return (posts, next cursor) for the page of queryset after position, a
+    decoded cursor or None for the first page. The next cursor is None on
+    the last page.
+    """
+    queryset = queryset.order_by("-created_at", "-id")
+    if position is not None:
+        created_at, post_id = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id)
+        )
+    # One extra row tells whether another page follows
+    posts = list(queryset[: size + 1])
+    if len(posts) <= size:
+        return posts, None
+    posts = posts[:size]
+    return posts, encode_cursor(posts[-1])
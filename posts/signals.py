@@ -0,0 +1,41 @@
+"""
+Keep Post.like_count and Post.comment_count in step with their rows.
+
+Each Like or Comment created or deleted (including cascades and admin
+actions) moves its post's counter with a single UPDATE ... SET n = n +/- 1,
+so concurrent likes never overwrite each other. Drift from bulk operations
+that skip signals is fixed by `python manage.py reconcile_post_counts`.
+"""
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Comment, Like, Post
+
+
+def _adjust(post_id, field, delta):
+    Post.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+@receiver(post_save, sender=Like)
+def count_new_like(sender, instance, created, **kwargs):
+    if created:
+        _adjust(instance.post_id, "like_count", 1)
+
+
+@receiver(post_delete, sender=Like)
+def count_deleted_like(sender, instance, **kwargs):
+    _adjust(instance.post_id, "like_count", -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        _adjust(instance.post_id, "comment_count", 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    _adjust(instance.post_id, "comment_count", -1)
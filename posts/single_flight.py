@@ -0,0 +1,128 @@
+"""
+Single-flight coordination for summary generation.
+
+At most one summarization runs per (post, summary key) at a time. Threads in
+a process share an in-memory registry of running generations; processes
+coordinate through a PostgreSQL session advisory lock on the same key (other
+databases fall back to in-process coordination only). Callers that lose the
+race wait briefly for the leader's result, then show a polling "generating"
+partial.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+
+from django.db import DatabaseError, connection
+
+from .summary_cache import get_cached_summary
+
+logger = logging.getLogger(__name__)
+
+# How long a request waits for a generation running in the same process
+FLIGHT_WAIT_SECONDS = float(os.getenv("SUMMARIZER_FLIGHT_WAIT_SECONDS", "10"))
+
+# (post id, summary key) -> Event set when that generation finishes
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _lock_id(post_id, key):
+    """Map a flight to a signed 64-bit advisory lock id."""
+    digest = hashlib.sha256(f"summary:{post_id}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _try_advisory_lock(lock_id):
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [lock_id])
+        return cursor.fetchone()[0]
+
+
+def _advisory_unlock(lock_id):
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+
+
+class Flight:
+    """A claimed summary generation. Call release() (or use as a context manager) when done."""
+
+    def __init__(self, flight_key, lock_id, event):
+        self.flight_key = flight_key
+        self.lock_id = lock_id
+        self.event = event
+        self.released = False
+
+    def release(self):
+        """Release the advisory lock and wake any waiting threads."""
+        if self.released:
+            return
+        self.released = True
+        try:
+            _advisory_unlock(self.lock_id)
+        except DatabaseError as e:
+            # The lock is released with the session if this fails
+            logger.warning(f"Failed to release summary lock {self.lock_id}: {e}")
+        finally:
+            with _flights_lock:
+                _flights.pop(self.flight_key, None)
+            self.event.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def begin_flight(post, key):
+    """
+    Claim generation of the post's summary for key.
+    Returns a Flight, or None if another thread or process is already generating it.
+    """
+    flight_key = (post.id, key)
+    with _flights_lock:
+        if flight_key in _flights:
+            return None
+        event = _flights[flight_key] = threading.Event()
+
+    lock_id = _lock_id(post.id, key)
+    try:
+        acquired = _try_advisory_lock(lock_id)
+    except DatabaseError as e:
+        logger.warning(f"Summary lock unavailable, coordinating in-process only: {e}")
+        acquired = True
+
+    if not acquired:
+        with _flights_lock:
+            _flights.pop(flight_key, None)
+        event.set()
+        return None
+    return Flight(flight_key, lock_id, event)
+
+
+def is_in_flight(post, key):
+    """Return True if another thread or process is generating the post's summary."""
+    flight = begin_flight(post, key)
+    if flight is None:
+        return True
+    flight.release()
+    return False
+
+
+def wait_for_flight(post, key, timeout=FLIGHT_WAIT_SECONDS):
+    """
+    Wait for a generation of the post's summary running in this process,
+    then return the summary it stored, or None if it is not ready yet.
+    Generations in other processes are not waited for.
+    """
+    with _flights_lock:
+        event = _flights.get((post.id, key))
+    if event is not None:
+        event.wait(timeout)
+    return get_cached_summary(post, key, degraded=True)
@@ -0,0 +1,84 @@
+"""
+Content-hash keyed summary store.
+
+Summaries are stored once per (normalized body, model, generation parameters)
+in CachedSummary and copied onto each Post along with the key they were
+generated from, so stale summaries can be detected after an edit. The key
+includes the model of the post's club, so switching a club to another model
+makes its posts pick up summaries from that model.
+
+Greedy summaries (streamed, or generated under load) are stored under their
+own key. Readers are served one with degraded=True while the worker, queued
+when it was stored, replaces it with the beam-search summary.
+"""
+
+import logging
+
+from .models import CachedSummary, Post
+from .utils.summarizer import DEFAULT_MODEL, summary_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def summary_model_for(post):
+    """Return the summarization model configured for the post's club."""
+    return post.club.summarizer_model or DEFAULT_MODEL
+
+
+def summary_key_for(post, body=None, num_beams=None):
+    """Return the summary key for the post's body (or another body) with its club's model."""
+    return summary_cache_key(
+        post.body if body is None else body,
+        model_name=summary_model_for(post),
+        num_beams=num_beams,
+    )
+
+
+def is_summary_current(post, key=None):
+    """Check whether the post's stored summary was generated from its current body."""
+    if not post.summary:
+        return False
+    # Summaries written before keys were tracked are treated as current
+    if not post.summary_hash:
+        return True
+    return post.summary_hash == (key or summary_key_for(post))
+
+
+def get_cached_summary(post, key=None, degraded=False):
+    """
+    Return a current summary for the post, or None.
+    Checks the post itself first, then the shared store (copying any hit onto the post).
+    With degraded, a greedy summary of the current body is returned if there
+    is no beam-search one.
+    """
+    key = key or summary_key_for(post)
+    keys = [key]
+    if degraded:
+        keys.append(summary_key_for(post, num_beams=1))
+
+    for key in keys:
+        if is_summary_current(post, key):
+            return post.summary
+
+        cached = CachedSummary.objects.filter(content_hash=key).first()
+        if cached:
+            logger.info(f"Summary cache hit for post {post.id}")
+            store_summary(post, key, cached.summary, shared=False)
+            return cached.summary
+
+    return None
+
+
+def store_summary(post, key, summary, model_name=None, shared=True):
+    """Save a generated summary on the post and, if shared, in the summary store."""
+    if shared:
+        CachedSummary.objects.update_or_create(
+            content_hash=key,
+            defaults={
+                "summary": summary,
+                "model_name": model_name or summary_model_for(post),
+            },
+        )
+    Post.objects.filter(id=post.id).update(summary=summary, summary_hash=key)
+    post.summary = summary
+    post.summary_hash = key
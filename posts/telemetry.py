@@ -0,0 +1,94 @@
+"""
+Per-run summarization telemetry.
+
+Every summarization served to a reader or produced by a worker is recorded as
+a SummaryRun row: where the summary came from (cache, model, extractive
+fallback, ...), the model and backend, input and output size, queue wait and
+generation time. The summarizer_report command turns these rows into latency
+percentiles by model and by input size, and deletes rows older than
+SUMMARIZER_TELEMETRY_RETENTION_DAYS (default: 30) when run with --prune-days.
+
+Set SUMMARIZER_TELEMETRY=false to stop recording.
+"""
+
+import os
+import logging
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .models import SummaryRun, SummarySource
+from .utils.backends import BACKEND
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY = os.getenv("SUMMARIZER_TELEMETRY", "true").lower() == "true"
+RETENTION_DAYS = int(os.getenv("SUMMARIZER_TELEMETRY_RETENTION_DAYS", "30"))
+
+# Sources whose cost is model inference
+GENERATED_SOURCES = (SummarySource.MODEL, SummarySource.STREAM)
+
+
+def build_run(post, source, origin, started, text, model_name="", metrics=None):
+    """
+    Return an unsaved SummaryRun.
+
+    Args:
+        post: The summarized post (or None)
+        source: A SummarySource value
+        origin: A SummaryOrigin value
+        started: time.monotonic() when the run started, or None to use the
+            queue wait plus generation time from metrics (runs timed in
+            another process)
+        text: The summarized text
+        model_name: Model that generated the summary, if any
+        metrics: Per-text metrics dict from the summarizer (see new_metrics)
+    """
+    metrics = metrics or {}
+    if started is None:
+        total_ms = (metrics.get("queue_wait_ms") or 0.0) + (
+            metrics.get("generate_ms") or 0.0
+        )
+    else:
+        total_ms = (time.monotonic() - started) * 1000
+    return SummaryRun(
+        post=post,
+        source=source,
+        origin=origin,
+        model_name=model_name or "",
+        backend=BACKEND if source in GENERATED_SOURCES else "",
+        input_chars=len(text or ""),
+        input_tokens=metrics.get("input_tokens"),
+        output_tokens=metrics.get("output_tokens"),
+        chunks=metrics.get("chunks") or 0,
+        queue_wait_ms=metrics.get("queue_wait_ms"),
+        generate_ms=metrics.get("generate_ms"),
+        total_ms=total_ms,
+    )
+
+
+def record_run(post, source, origin, started, text, model_name="", metrics=None):
+    """Save one SummaryRun. Telemetry failures are logged, never raised."""
+    if TELEMETRY:
+        record_runs(
+            [build_run(post, source, origin, started, text, model_name, metrics)]
+        )
+
+
+def record_runs(runs):
+    """Save several SummaryRuns in one query."""
+    if not TELEMETRY or not runs:
+        return
+    try:
+        SummaryRun.objects.bulk_create(runs)
+    except DatabaseError as e:
+        logger.warning(f"Failed to record summarization telemetry: {e}")
+
+
+def prune_runs(days=RETENTION_DAYS):
+    """Delete SummaryRuns older than days. Returns the number deleted."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = SummaryRun.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
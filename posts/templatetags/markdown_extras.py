@@ -1,163 +1,488 @@
 """
 Custom template filters for Markdown rendering.
+
+render_markdown and make_excerpt are also used to pre-render Post.body and
+Club.description on save. Bump MARKDOWN_RENDERER_VERSION whenever a change
+here alters the HTML or excerpt produced for the same text, then run
+``python manage.py rerender_markdown``.
+
+Editor input goes through preprocess() first: one streaming, line-oriented
+pass that converts pasted HTML tables and normalizes pipe tables and lists in
+time linear in the input (the regex passes it replaced are kept in
+posts/utils/markdown_reference.py for comparison).
+
+Configured converters are reused from a per-thread pool (and reset between
+uses) instead of being built for every render; the markdown filter also keeps
+recent output in a process-local LRU (see posts/utils/render_cache.py), and
+render_markdown_blocks converts long texts one top-level block at a time so
+that blocks unchanged since the last render are served from block_cache.
 """
 
+import contextlib
 import markdown
 import re
+import threading
 from django import template
 from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+
+from ..utils.render_cache import BLOCK_CACHE_SIZE, RenderCache
 
 register = template.Library()
 
-_LIST_LINE_RE = re.compile(r"^\s*([\*\+-]\s|\d+\.\s)")
+# Stamped on stored HTML and excerpts; rows from another version are re-rendered
+MARKDOWN_RENDERER_VERSION = 2
 
+# Texts shorter than this are converted whole by render_markdown_blocks()
+BLOCK_RENDER_MIN_CHARS = 2000
 
-def _ensure_blank_before_lists(text):
-    """Insert a blank line before lists when needed for proper markdown parsing."""
-    if not text:
-        return text
-    lines = text.split("\n")
-    result = []
-    for i, line in enumerate(lines):
-        if i > 0 and _LIST_LINE_RE.match(line):
-            prev = lines[i - 1]
-            if prev.strip() and not _LIST_LINE_RE.match(prev):
-                result.append("")
-        result.append(line)
-    return "\n".join(result)
-
-
-def _convert_html_tables_to_markdown(text):
-    """Convert HTML tables to markdown table syntax."""
-
-    def convert_table(match):
-        table_html = match.group(1)
-        markdown_rows = []
-
-        # Extract header row
-        header_match = re.search(
-            r"<thead[^>]*>.*?<tr[^>]*>(.*?)</tr>", table_html, re.DOTALL
-        )
-        if not header_match:
-            header_match = re.search(r"<tr[^>]*>(.*?)</tr>", table_html, re.DOTALL)
-            if not (header_match and "<th" in header_match.group(1)):
-                header_match = None
-
-        if header_match:
-            header_cells = re.findall(
-                r"<t[dh][^>]*>(.*?)</t[dh]>", header_match.group(1), re.DOTALL
-            )
-            headers = [re.sub(r"<[^>]+>", "", cell).strip() for cell in header_cells]
-            if headers:
-                markdown_rows.append("| " + " | ".join(headers) + " |")
-                markdown_rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
-
-        # Extract body rows
-        body_match = re.search(r"<tbody[^>]*>(.*?)</tbody>", table_html, re.DOTALL)
-        body_content = body_match.group(1) if body_match else table_html
-
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", body_content, re.DOTALL)
-        for row in rows:
-            if "<th" in row and header_match:
-                continue
-            cells = re.findall(r"<t[dh][^>]*>(.*?)</t[dh]>", row, re.DOTALL)
-            cell_texts = [re.sub(r"<[^>]+>", "", cell).strip() for cell in cells]
-            if cell_texts:
-                markdown_rows.append("| " + " | ".join(cell_texts) + " |")
-
-        return (
-            "\n" + "\n".join(markdown_rows) + "\n" if markdown_rows else match.group(0)
-        )
+# Words kept in stored excerpts; templates truncate further (e.g. truncatewords:30)
+EXCERPT_WORDS = 60
+
+# Idle converters of each thread, see _converter()
+_pool = threading.local()
+
+# Output of the markdown filter, keyed by a hash of the text
+render_cache = RenderCache()
 
-    return re.sub(
-        r"<table[^>]*>(.*?)</table>",
-        convert_table,
-        text,
-        flags=re.DOTALL | re.IGNORECASE,
+# HTML of single top-level blocks, see render_markdown_blocks()
+block_cache = RenderCache(max_entries=BLOCK_CACHE_SIZE)
+
+_LIST_LINE_RE = re.compile(r"^\s*([\*\+-]\s|\d+\.\s)")
+_TABLE_OPEN_RE = re.compile(r"<table", re.IGNORECASE)
+_TABLE_CLOSE_RE = re.compile(r"</table>", re.IGNORECASE)
+_NOT_SEARCHED = (-1, float("inf"))
+
+# Markdown list items as the converter recognizes them at the start of a line
+_LIST_ITEM_RE = re.compile(r"([*+-]|\d+\.)[ \t]")
+# Constructs that make a document unsafe to convert block by block
+_WHOLE_DOCUMENT_RE = re.compile(
+    r"<[A-Za-z!?/]"  # raw HTML
+    r"|^[ ]{0,3}\[[^\]\n]*\]:"  # reference and footnote definitions
+    r"|^\*\["  # abbreviations
+    r"|^[ ]{0,3}:[ \t]",  # definition lists, which take terms from blocks before
+    re.MULTILINE,
+)
+_FENCED_BLOCK_RE = FencedBlockPreprocessor.FENCED_BLOCK_RE
+# Paragraph appended to each block by _convert_block()
+_BLOCK_END = "blockend"
+_BLOCK_END_HTML = f"<p>{_BLOCK_END}</p>"
+
+
+class _Scanner:
+    """
+    str.find over one text that remembers each needle's last hit, so a run of
+    searches with non-decreasing start positions reads the text at most once
+    per needle.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._hits = {}  # needle -> (hit, searched from)
+
+    def find(self, needle, start, end):
+        """Return the first index of needle in text[start:end], or -1."""
+        hit, since = self._hits.get(needle, _NOT_SEARCHED)
+        if since > start or -1 < hit < start:
+            hit = self.text.find(needle, start)
+            self._hits[needle] = (hit, start)
+        if hit == -1 or hit + len(needle) > end:
+            return -1
+        return hit
+
+    def find_first(self, needles, start, end):
+        """Return (index, needle) of the earliest of needles, or (-1, None)."""
+        first, first_needle = -1, None
+        for needle in needles:
+            hit = self.find(needle, start, end)
+            if hit != -1 and (first == -1 or hit < first):
+                first, first_needle = hit, needle
+        return first, first_needle
+
+
+def _find_element(scan, openings, closings, start, end):
+    """
+    Find the first tag starting with one of openings in text[start:end] and
+    the first of closings after it. Returns (content start, content end,
+    end of closing tag) or None.
+    """
+    opening, _ = scan.find_first(openings, start, end)
+    if opening == -1:
+        return None
+    gt = scan.find(">", opening, end)
+    if gt == -1:
+        return None
+    closing, needle = scan.find_first(closings, gt + 1, end)
+    if closing == -1:
+        return None
+    return gt + 1, closing, closing + len(needle)
+
+
+def _strip_tags(html):
+    """Remove <...> tags from html in one pass (same result as <[^>]+> -> "")."""
+    parts = []
+    pos = 0
+    gt = -1  # first ">" after the current "<", reused while still ahead
+    while True:
+        lt = html.find("<", pos)
+        if lt == -1:
+            break
+        if gt <= lt:
+            gt = html.find(">", lt + 1)
+            if gt == -1:
+                break
+        if gt == lt + 1:  # "<>" is not a tag
+            parts.append(html[pos : lt + 1])
+            pos = lt + 1
+            continue
+        parts.append(html[pos:lt])
+        pos = gt + 1
+    parts.append(html[pos:])
+    return "".join(parts)
+
+
+def _table_cells(scan, html, start, end):
+    """Return the tag-stripped text of the <td>/<th> cells in html[start:end]."""
+    cells = []
+    while True:
+        cell = _find_element(scan, ("<td", "<th"), ("</td>", "</th>"), start, end)
+        if cell is None:
+            return cells
+        cells.append(_strip_tags(html[cell[0] : cell[1]]).strip())
+        start = cell[2]
+
+
+def _html_table_to_markdown(html):
+    """
+    Return the Markdown rows for the inner HTML of a <table>, or None if it
+    has no cells. The header is the first row of <thead>, or the first row
+    if it has <th> cells; body rows come from <tbody> if there is one.
+    """
+    size = len(html)
+    scan = _Scanner(html)
+    header = None
+    thead = scan.find("<thead", 0, size)
+    if thead != -1:
+        gt = scan.find(">", thead, size)
+        if gt != -1:
+            header = _find_element(scan, ("<tr",), ("</tr>",), gt + 1, size)
+    if header is None:
+        header = _find_element(_Scanner(html), ("<tr",), ("</tr>",), 0, size)
+        if header and "<th" not in html[header[0] : header[1]]:
+            header = None
+
+    markdown_rows = []
+    if header:
+        headers = _table_cells(_Scanner(html), html, header[0], header[1])
+        if headers:
+            markdown_rows.append("| " + " | ".join(headers) + " |")
+            markdown_rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
+
+    scan = _Scanner(html)
+    body = _find_element(scan, ("<tbody",), ("</tbody>",), 0, size)
+    start, end = body[:2] if body else (0, size)
+    while True:
+        row = _find_element(scan, ("<tr",), ("</tr>",), start, end)
+        if row is None:
+            break
+        start = row[2]
+        if header and "<th" in html[row[0] : row[1]]:
+            continue
+        cells = _table_cells(scan, html, row[0], row[1])
+        if cells:
+            markdown_rows.append("| " + " | ".join(cells) + " |")
+
+    return markdown_rows or None
+
+
+def _convert_html_tables(text):
+    """
+    Yield text in pieces, with each <table>...</table> replaced by Markdown
+    table rows. Every search starts where the previous one stopped (or reuses
+    its result), so the scan is linear in the length of text.
+    """
+    pos = 0
+    gt = close = close_end = -1
+    while True:
+        opening = _TABLE_OPEN_RE.search(text, pos)
+        if not opening:
+            break
+        if gt < opening.end():
+            gt = text.find(">", opening.end())
+            if gt == -1:
+                break
+        if close <= gt:
+            match = _TABLE_CLOSE_RE.search(text, gt + 1)
+            if not match:
+                break
+            close, close_end = match.span()
+        rows = _html_table_to_markdown(text[gt + 1 : close])
+        yield text[pos : opening.start()]
+        if rows:
+            yield "\n" + "\n".join(rows) + "\n"
+        else:
+            yield text[opening.start() : close_end]
+        pos = close_end
+    yield text[pos:]
+
+
+def _split_lines(pieces):
+    """Yield the "\n"-separated lines of the concatenated pieces."""
+    partial = []
+    for piece in pieces:
+        lines = piece.split("\n")
+        if len(lines) > 1:
+            partial.append(lines[0])
+            yield "".join(partial)
+            yield from lines[1:-1]
+            partial = [lines[-1]]
+        else:
+            partial.append(piece)
+    yield "".join(partial)
+
+
+def _is_table_row(line):
+    stripped = line.strip()
+    return "|" in line and stripped.startswith("|") and stripped.endswith("|")
+
+
+def _is_table_separator(line):
+    return "|" in line and (
+        "---" in line
+        or "===" in line
+        or all(c in "-=|: " for c in line.strip().replace("|", ""))
     )
 
 
-def _normalize_tables(text):
-    """Normalize table markdown to ensure proper PHP Markdown Extra format."""
+def _normalize_table_lines(lines):
+    """
+    Yield lines with a separator row inserted into pipe tables that lack one
+    and a blank line after each table, so PHP Markdown Extra parses them.
+    """
+    lines = iter(lines)
+    line = next(lines, None)
+    while line is not None:
+        if not _is_table_row(line):
+            yield line
+            line = next(lines, None)
+            continue
+
+        rows = [line]
+        has_separator = False
+        following = next(lines, None)
+        if following is not None and _is_table_separator(following):
+            rows.append(following)
+            has_separator = True
+            following = next(lines, None)
+        while following is not None and _is_table_row(following):
+            rows.append(following)
+            following = next(lines, None)
+
+        if len(rows) >= 2 and not has_separator:
+            col_count = rows[0].count("|") - 1
+            if col_count > 0:
+                rows.insert(1, "|" + "|".join(["---"] * col_count) + "|")
+
+        if len(rows) >= 3:
+            yield from rows
+            if following is not None and following.strip():
+                yield ""
+            line = following
+        else:
+            # Shorter runs keep only their first line and drop the line after
+            # them, as the regex passes did; changing it would alter stored HTML
+            yield line
+            line = next(lines, None) if following is not None else None
+
+
+def _blank_line_before_lists(lines):
+    """Yield lines with a blank line before a list that follows a paragraph."""
+    previous = None
+    for line in lines:
+        if (
+            previous is not None
+            and _LIST_LINE_RE.match(line)
+            and previous.strip()
+            and not _LIST_LINE_RE.match(previous)
+        ):
+            yield ""
+        yield line
+        previous = line
+
+
+def preprocess(text):
+    """
+    Prepare editor Markdown for the converter in one streaming pass: convert
+    pasted HTML tables, normalize pipe tables and separate lists from the
+    preceding paragraph. Linear in the length of text.
+    """
+    lines = _split_lines(_convert_html_tables(text))
+    return "\n".join(_blank_line_before_lists(_normalize_table_lines(lines)))
+
+
+def _new_converter():
+    return markdown.Markdown(
+        extensions=["extra", "codehilite", "nl2br", "sane_lists"],
+        extension_configs={
+            "codehilite": {"css_class": "highlight", "use_pygments": False}
+        },
+    )
+
+
+@contextlib.contextmanager
+def _converter():
+    """Borrow a configured converter from this thread's pool, reset on return."""
+    idle = getattr(_pool, "idle", None)
+    if idle is None:
+        idle = _pool.idle = []
+    # A nested render (e.g. from an extension) gets its own converter
+    md = idle.pop() if idle else _new_converter()
+    try:
+        yield md
+    finally:
+        md.reset()
+        idle.append(md)
+
+
+def _convert(text):
+    with _converter() as md:
+        return md.convert(text)
+
+
+def _render(text):
+    return _convert(preprocess(text))
+
+
+def _is_blank(line):
+    # The converter empties lines of spaces (tabs are expanded first)
+    return not line.strip(" \t")
+
+
+def _continues_block(chunk):
+    """
+    True if a chunk of lines after blank lines may belong to the element
+    before it: indented content, lists and blockquotes.
+    """
+    return chunk[0] in " \t>" or _LIST_ITEM_RE.match(chunk) is not None
+
+
+def split_blocks(text):
+    """
+    Split preprocessed Markdown into top-level blocks that convert to the same
+    HTML one at a time as together. Returns None if the text has to be
+    converted whole: raw HTML, reference and footnote definitions,
+    abbreviations and definition lists reach across blocks.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    fences = [match.span() for match in _FENCED_BLOCK_RE.finditer(text)]
+    outside = 0
+    for start, end in fences + [(len(text), len(text))]:
+        if _WHOLE_DOCUMENT_RE.search(text, outside, start):
+            return None
+        outside = end
+
+    # Chunks are runs of lines between blank lines, never split inside a fence
+    chunks = []  # (blank lines before, lines)
+    blank_lines = []
+    lines = []
+    blank_run = 0  # blank lines at the end of lines
+    offset = 0
+    fence = iter(fences)
+    span = next(fence, None)
+    for line in text.split("\n"):
+        while span and span[1] <= offset:
+            span = next(fence, None)
+        if _is_blank(line):
+            blank_run += 1
+        else:
+            in_fence = span is not None and span[0] < offset < span[1]
+            if len(lines) > blank_run > 0 and not in_fence:
+                chunks.append((blank_lines, lines[: len(lines) - blank_run]))
+                blank_lines = lines[len(lines) - blank_run :]
+                lines = []
+            blank_run = 0
+        lines.append(line)
+        offset += len(line) + 1
+    if len(lines) > blank_run:
+        chunks.append((blank_lines, lines[: len(lines) - blank_run]))
+
+    blocks = []
+    for blank_lines, chunk in chunks:
+        text = "\n".join(chunk)
+        if not blocks:
+            blocks.append("\n".join(blank_lines + chunk))
+        elif _continues_block(text):
+            blocks[-1] = "\n".join([blocks[-1], *blank_lines, text])
+        else:
+            blocks.append(text)
+    return blocks
+
+
+def _convert_block(block):
+    """
+    Convert one top-level block, keeping the whitespace the converter puts
+    between it and the next element (e.g. after highlighted code), which
+    convert() would otherwise strip from the end of the block.
+    """
+    html = _convert(f"{block}\n\n{_BLOCK_END}")
+    if not html.endswith(_BLOCK_END_HTML):
+        raise ValueError(f"Block end marker not found after {block[:40]!r}")
+    return html[: -len(_BLOCK_END_HTML)]
+
+
+def render_markdown_blocks(text, min_chars=BLOCK_RENDER_MIN_CHARS):
+    """
+    Convert Markdown text to HTML block by block, reusing the HTML of blocks
+    already in block_cache, so editing one part of a long post converts only
+    that part again. Produces the same HTML as render_markdown; texts shorter
+    than min_chars are converted whole, which is faster for them.
+    """
     if not text:
-        return text
-
-    lines = text.split("\n")
-    result = []
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        if "|" in line and stripped.startswith("|") and stripped.endswith("|"):
-            table_rows = [line]
-            i += 1
-            has_separator = False
-
-            # Check for separator row
-            if i < len(lines):
-                next_line = lines[i]
-                if "|" in next_line and (
-                    "---" in next_line
-                    or "===" in next_line
-                    or all(c in "-=|: " for c in next_line.strip().replace("|", ""))
-                ):
-                    table_rows.append(next_line)
-                    has_separator = True
-                    i += 1
-
-            # Collect remaining table rows
-            while i < len(lines):
-                next_line = lines[i]
-                if (
-                    "|" in next_line
-                    and next_line.strip().startswith("|")
-                    and next_line.strip().endswith("|")
-                ):
-                    table_rows.append(next_line)
-                    i += 1
-                else:
-                    break
-
-            # Insert separator if missing
-            if len(table_rows) >= 2 and not has_separator:
-                col_count = table_rows[0].count("|") - 1
-                if col_count > 0:
-                    separator = "|" + "|".join(["---"] * col_count) + "|"
-                    table_rows.insert(1, separator)
-
-            if len(table_rows) >= 3:
-                result.extend(table_rows)
-                if i < len(lines) and lines[i].strip():
-                    result.append("")
-                continue
-
-        result.append(line)
-        i += 1
-
-    return "\n".join(result)
+        return ""
 
+    text = preprocess(str(text))
+    blocks = split_blocks(text) if len(text) >= min_chars else None
+    if blocks is None:
+        return _convert(text)
 
-@register.filter(name="markdown")
-def markdown_filter(text):
-    """Convert Markdown text to HTML with table support."""
+    namespace = str(MARKDOWN_RENDERER_VERSION)
+    return "".join(
+        block_cache.get_or_render(block, _convert_block, namespace=namespace)
+        for block in blocks
+    ).strip()
+
+
+def render_markdown(text, cache=False):
+    """
+    Convert Markdown text to an HTML string with table support.
+    With cache=True the result is looked up in and stored to render_cache.
+    """
     if not text:
         return ""
 
     text = str(text)
-    text = _convert_html_tables_to_markdown(text)
-    text = _normalize_tables(text)
-    text = _ensure_blank_before_lists(text)
+    if cache:
+        return render_cache.get_or_render(
+            text, _render, namespace=str(MARKDOWN_RENDERER_VERSION)
+        )
+    return _render(text)
 
-    md = markdown.Markdown(
-        extensions=["extra", "codehilite", "nl2br", "sane_lists"],
-        extension_configs={
-            "codehilite": {"css_class": "highlight", "use_pygments": False}
-        },
-    )
 
-    return mark_safe(md.convert(text))
+def render_cache_stats():
+    """Return hit/miss counters of the markdown filter's render cache."""
+    return render_cache.stats()
+
+
+def block_cache_stats():
+    """Return hit/miss counters of render_markdown_blocks' block cache."""
+    return block_cache.stats()
+
+
+@register.filter(name="markdown")
+def markdown_filter(text):
+    """Convert Markdown text to HTML with table support."""
+    return mark_safe(render_markdown(text, cache=True))
 
 
 @register.filter(name="markdown_to_text")
@@ -186,6 +511,11 @@ def markdown_to_text(text):
     return text
 
 
+def make_excerpt(text, words=EXCERPT_WORDS):
+    """Return the first `words` words of Markdown text as plain text."""
+    return Truncator(markdown_to_text(text)).words(words)
+
+
 @register.filter(name="in_set")
 def in_set(value, collection):
     """Check if a value is in a collection (list, set, tuple)."""
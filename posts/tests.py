@@ -0,0 +1,863 @@
+import base64
+import importlib
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.conf import settings
+from django.test import Client, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clubs.models import Club
+from . import views
+from .digest import (
+    DIGEST_MIN_COMMENTS,
+    DIGEST_REFRESH_COMMENTS,
+    forget_comment,
+    note_new_comment,
+)
+from .jobs import (
+    BACKOFF_SECONDS,
+    LOCK_TIMEOUT,
+    claim_jobs,
+    enqueue_summary_job,
+    fail_job,
+    refresh_summary_after_edit,
+)
+from .models import (
+    CachedSummary,
+    Comment,
+    DiscussionDigest,
+    JobStatus,
+    Like,
+    Post,
+    SummaryOrigin,
+    SummaryRun,
+    SummaryJob,
+    SummarySource,
+)
+from .summary_cache import get_cached_summary, store_summary, summary_key_for
+from .utils.load_shedding import LEVEL_GREEDY
+from .pagination import decode_cursor
+from .single_flight import begin_flight, is_in_flight, wait_for_flight
+from .templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    render_markdown_blocks,
+)
+from .utils import inference_server, markdown_reference
+from .utils.batching import BatchingEngine, BatchQueueFull
+from .utils.load_shedding import LoadShedder
+from .utils.markdown_fuzz import random_document
+from .utils.model_registry import ModelRegistry, model_memory_mb
+from .utils.rate_limit import RateLimiter
+from .utils import summarizer
+from .utils.summarizer import _map_reduce
+
+
+class FakeTokenizer:
+    """Word-level stand-in for a Hugging Face tokenizer."""
+
+    model_max_length = 18
+    pad_token_id = None
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def encode(self, text, add_special_tokens=True):
+        return list(range(len(text.split())))
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join("word" for _ in ids)
+
+    def __call__(self, texts, **kwargs):
+        rows = [[1] * max(1, len(text.split())) for text in texts]
+        return {"input_ids": rows, "attention_mask": rows}
+
+    def batch_decode(self, rows, skip_special_tokens=True):
+        return ["summary" for _ in rows]
+
+
+class FakeModel:
+    """Counts generated rows; generate blocks while `gate` is cleared."""
+
+    def __init__(self):
+        self.generated = 0
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def generate(self, input_ids, attention_mask=None, **params):
+        self.started.set()
+        self.gate.wait()
+        self.generated += len(input_ids)
+        return [[7, 7] for _ in input_ids]
+
+
+def create_post(body="Minutes of the kickoff: we planned the season and budget."):
+    """Create a post, with its author and club, for tests needing just one."""
+    author = User.objects.create_user("author", password="pw")
+    club = Club.objects.create(
+        name="Robotics", slug="robotics", description="Robots.", created_by=author
+    )
+    return Post.objects.create(club=club, author=author, title="Kickoff", body=body)
+
+
+class SummaryStoreTests(TestCase):
+    def setUp(self):
+        self.post = create_post()
+        store_summary(self.post, summary_key_for(self.post), "Season plans.")
+
+    def edit(self, body):
+        previous_body = self.post.body
+        self.post.body = body
+        self.post.save()
+        return refresh_summary_after_edit(self.post, previous_body)
+
+    def test_edit_invalidates_the_summary(self):
+        old_key = self.post.summary_hash
+
+        self.assertTrue(self.edit("Minutes of the kickoff: the budget was cut."))
+
+        self.assertNotEqual(summary_key_for(self.post), old_key)
+        self.post.refresh_from_db()
+        self.assertIsNone(self.post.summary)
+        self.assertIsNone(get_cached_summary(self.post))
+        self.assertTrue(SummaryJob.objects.filter(post=self.post).exists())
+
+    def test_whitespace_edit_keeps_the_summary(self):
+        self.assertFalse(self.edit(self.post.body.replace(" ", "  ")))
+
+        self.assertEqual(get_cached_summary(self.post), "Season plans.")
+
+    def test_identical_body_hits_the_store(self):
+        other = Post.objects.create(
+            club=self.post.club,
+            author=self.post.author,
+            title="Kickoff (copy)",
+            body=self.post.body,
+        )
+
+        self.assertEqual(get_cached_summary(other), "Season plans.")
+        other.refresh_from_db()
+        self.assertEqual(other.summary_hash, self.post.summary_hash)
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        self.post = create_post()
+        self.key = summary_key_for(self.post)
+
+    def test_only_one_generation_per_key(self):
+        flight = begin_flight(self.post, self.key)
+        self.addCleanup(flight.release)
+
+        self.assertIsNone(begin_flight(self.post, self.key))
+        self.assertTrue(is_in_flight(self.post, self.key))
+        flight.release()
+        self.assertFalse(is_in_flight(self.post, self.key))
+
+    def test_waiter_gets_the_leaders_summary(self):
+        flight = begin_flight(self.post, self.key)
+        self.addCleanup(flight.release)
+        store_summary(self.post, self.key, "Season plans.")
+        leader = threading.Timer(0.1, flight.release)
+        leader.start()
+
+        started = time.monotonic()
+        summary = wait_for_flight(self.post, self.key, timeout=5)
+
+        self.assertEqual(summary, "Season plans.")
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        leader.join()
+
+    def test_waiter_gives_up_after_the_timeout(self):
+        flight = begin_flight(self.post, self.key)
+        self.addCleanup(flight.release)
+
+        self.assertIsNone(wait_for_flight(self.post, self.key, timeout=0.05))
+
+
+class DigestInvalidationTests(TestCase):
+    def setUp(self):
+        self.post = create_post()
+
+    def comment(self, count):
+        comments = [
+            Comment.objects.create(post=self.post, user=self.post.author, body="Agreed")
+            for _ in range(count)
+        ]
+        return comments[-1]
+
+    def digest(self):
+        return DiscussionDigest.objects.filter(post=self.post).first()
+
+    def test_first_digest_waits_for_enough_comments(self):
+        self.comment(DIGEST_MIN_COMMENTS - 1)
+        self.assertFalse(note_new_comment(self.post))
+        self.assertIsNone(self.digest())
+
+        self.comment(1)
+        self.assertTrue(note_new_comment(self.post))
+        self.assertTrue(self.digest().needs_refresh)
+
+    def test_digest_is_refreshed_after_enough_new_comments(self):
+        last = self.comment(DIGEST_MIN_COMMENTS)
+        DiscussionDigest.objects.create(
+            post=self.post,
+            summary="Everyone agreed.",
+            comment_count=DIGEST_MIN_COMMENTS,
+            last_comment_id=last.id,
+        )
+
+        self.comment(DIGEST_REFRESH_COMMENTS - 1)
+        self.assertFalse(note_new_comment(self.post))
+        self.comment(1)
+        self.assertTrue(note_new_comment(self.post))
+        self.assertEqual(self.digest().summary, "Everyone agreed.")
+        self.assertTrue(self.digest().needs_refresh)
+
+    def test_deleting_a_covered_comment_drops_the_digest(self):
+        covered = self.comment(DIGEST_MIN_COMMENTS)
+        DiscussionDigest.objects.create(
+            post=self.post,
+            summary="Everyone agreed.",
+            comment_count=DIGEST_MIN_COMMENTS,
+            last_comment_id=covered.id,
+        )
+        newer = self.comment(1)
+
+        self.assertFalse(forget_comment(newer))
+        self.assertEqual(self.digest().summary, "Everyone agreed.")
+        self.assertTrue(forget_comment(covered))
+        self.assertEqual(self.digest().summary, "")
+        self.assertTrue(self.digest().needs_refresh)
+
+
+class PreviewTests(TestCase):
+    def setUp(self):
+        self.post = create_post()
+        self.url = reverse("posts:preview_post", kwargs={"slug": self.post.club.slug})
+        limiter = mock.patch.object(views, "preview_limiter", RateLimiter(2, 60))
+        limiter.start()
+        self.addCleanup(limiter.stop)
+
+    def test_preview_renders_markdown(self):
+        self.client.login(username="author", password="pw")
+
+        response = self.client.post(self.url, {"body": "Hello **club**"})
+
+        self.assertContains(response, "<strong>club</strong>")
+
+    def test_previews_over_the_limit_are_refused(self):
+        self.client.login(username="author", password="pw")
+        for _ in range(2):
+            self.assertEqual(
+                self.client.post(self.url, {"body": "Hi"}).status_code, 200
+            )
+
+        response = self.client.post(self.url, {"body": "Hi"})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    def test_preview_needs_the_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.login(username="author", password="pw")
+        token = "a" * 32
+        client.cookies[settings.CSRF_COOKIE_NAME] = token
+
+        self.assertEqual(client.post(self.url, {"body": "Hi"}).status_code, 403)
+        response = client.post(self.url, {"body": "Hi"}, headers={"X-CSRFToken": token})
+        self.assertEqual(response.status_code, 200)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def test_limit_is_per_key(self):
+        limiter = RateLimiter(2, 60)
+
+        self.assertEqual(limiter.hit("a"), 0)
+        self.assertEqual(limiter.hit("a"), 0)
+        self.assertEqual(limiter.hit("a"), 60)
+        self.assertEqual(limiter.hit("b"), 0)
+
+    def test_hits_expire_with_the_window(self):
+        limiter = RateLimiter(1, 0.05)
+        limiter.hit("a")
+        time.sleep(0.06)
+
+        self.assertEqual(limiter.hit("a"), 0)
+
+
+class SummaryJobTests(TestCase):
+    def setUp(self):
+        self.post = create_post()
+        self.job = enqueue_summary_job(self.post)
+
+    def test_due_jobs_are_claimed_once(self):
+        self.assertEqual(enqueue_summary_job(self.post), self.job)
+
+        jobs = claim_jobs("worker-1", 10)
+
+        self.assertEqual(jobs, [self.job])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, JobStatus.RUNNING)
+        self.assertEqual(self.job.locked_by, "worker-1")
+        self.assertEqual(self.job.attempts, 1)
+        self.assertEqual(claim_jobs("worker-2", 10), [])
+
+    def test_failed_job_backs_off_exponentially(self):
+        for attempt in (1, 2):
+            SummaryJob.objects.update(run_after=timezone.now())
+            job = claim_jobs("worker-1", 1)[0]
+            before = timezone.now()
+            fail_job(job, "model crashed")
+
+            job.refresh_from_db()
+            self.assertEqual(job.status, JobStatus.PENDING)
+            self.assertEqual(job.last_error, "model crashed")
+            delay = (job.run_after - before).total_seconds()
+            self.assertAlmostEqual(delay, BACKOFF_SECONDS * 2 ** (attempt - 1), 0)
+            # Not claimable until the backoff has passed
+            self.assertEqual(claim_jobs("worker-1", 1), [])
+
+    def test_job_fails_after_max_attempts(self):
+        job = claim_jobs("worker-1", 1)[0]
+        fail_job(job, "model crashed", max_attempts=1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FAILED)
+        SummaryJob.objects.update(run_after=timezone.now())
+        self.assertEqual(claim_jobs("worker-1", 1), [])
+
+    def test_job_of_a_silent_worker_is_reclaimed(self):
+        claim_jobs("worker-1", 1)
+        SummaryJob.objects.update(
+            locked_at=timezone.now() - LOCK_TIMEOUT - timedelta(minutes=1)
+        )
+
+        jobs = claim_jobs("worker-2", 1)
+
+        self.assertEqual(jobs, [self.job])
+        self.assertEqual(jobs[0].attempts, 2)
+
+
+class PostCounterTests(TestCase):
+    """Stored like/comment counters survive saves of the post itself."""
+
+    def setUp(self):
+        self.author = User.objects.create_user("author", password="pw")
+        self.reader = User.objects.create_user("reader", password="pw")
+        self.club = Club.objects.create(
+            name="Robotics",
+            slug="robotics",
+            description="We build robots.",
+            created_by=self.author,
+        )
+        self.post = Post.objects.create(
+            club=self.club, author=self.author, title="Kickoff", body="Welcome!"
+        )
+
+    def test_stale_instance_save_keeps_counters(self):
+        stale = Post.objects.get(pk=self.post.pk)
+        Like.objects.create(post=self.post, user=self.reader)
+        Comment.objects.create(post=self.post, user=self.reader, body="Nice")
+
+        stale.title = "Kickoff meeting"
+        stale.save()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.title, "Kickoff meeting")
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_edit_after_like_and_comment_keeps_counters(self):
+        Like.objects.create(post=self.post, user=self.reader)
+        Comment.objects.create(post=self.post, user=self.reader, body="Nice")
+        self.client.login(username="author", password="pw")
+
+        response = self.client.post(
+            reverse(
+                "posts:edit_post",
+                kwargs={"slug": self.club.slug, "post_id": self.post.id},
+            ),
+            {"post_type": "blog", "title": "Kickoff", "body": "Welcome, everyone!"},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.body, "Welcome, everyone!")
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(self.post.comment_count, 1)
+
+
+def raw_cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+class CursorTests(TestCase):
+    def test_out_of_range_id_is_rejected(self):
+        for post_id in ("0", "-1", str(2**63), "9" * 30):
+            cursor = raw_cursor(f"2026-01-01T00:00:00+00:00~{post_id}")
+            self.assertIsNone(decode_cursor(cursor))
+
+    def test_big_ids_are_accepted(self):
+        for post_id in (2**31, 2**63 - 1):
+            cursor = raw_cursor(f"2026-01-01T00:00:00+00:00~{post_id}")
+            self.assertEqual(decode_cursor(cursor)[1], post_id)
+
+    def test_naive_time_is_utc(self):
+        created_at, post_id = decode_cursor(raw_cursor("2026-01-01T00:00:00~5"))
+        self.assertEqual(created_at, datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(post_id, 5)
+
+    def get_list(self, cursor, headers=None):
+        reader = User.objects.create_user("reader", password="pw")
+        club = Club.objects.create(
+            name="Robotics", slug="robotics", description="Robots.", created_by=reader
+        )
+        Post.objects.create(club=club, author=reader, title="Kickoff", body="Hi!")
+        self.client.login(username="reader", password="pw")
+        return self.client.get(
+            reverse("posts:blog_list", kwargs={"slug": club.slug}),
+            {"cursor": cursor},
+            headers=headers,
+        )
+
+    def test_bad_cursor_shows_first_page(self):
+        response = self.get_list(raw_cursor(f"2026-01-01T00:00:00~{2**63}"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Kickoff")
+
+    def test_bad_cursor_appends_nothing(self):
+        response = self.get_list(
+            raw_cursor(f"2026-01-01T00:00:00~{2**63}"), {"HX-Request": "true"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+
+
+class GreedySummaryTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user("author", password="pw")
+        self.club = Club.objects.create(
+            name="Robotics", slug="robotics", description="Robots.", created_by=author
+        )
+        self.post = Post.objects.create(
+            club=self.club,
+            author=author,
+            title="Kickoff",
+            body="Minutes of the kickoff: we planned the season and the budget.",
+        )
+
+    def test_greedy_summary_is_only_served_as_degraded(self):
+        greedy_key = summary_key_for(self.post, num_beams=1)
+        self.assertNotEqual(greedy_key, summary_key_for(self.post))
+        store_summary(self.post, greedy_key, "Greedy summary")
+
+        self.assertIsNone(get_cached_summary(self.post))
+        self.assertEqual(get_cached_summary(self.post, degraded=True), "Greedy summary")
+
+    def test_summary_under_load_is_queued_for_an_upgrade(self):
+        url = reverse(
+            "posts:summarize_post",
+            kwargs={"slug": self.club.slug, "post_id": self.post.id},
+        )
+        with mock.patch.object(
+            views.shedder, "level", return_value=LEVEL_GREEDY
+        ), mock.patch.object(
+            views, "choose_tier", return_value=views.TIER_ABSTRACTIVE
+        ), mock.patch.object(
+            views, "STREAMING", False
+        ), mock.patch.object(
+            views, "summarize_with_hf", return_value="Greedy summary"
+        ):
+            response = self.client.post(url)
+
+        self.assertContains(response, "Greedy summary")
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.summary_hash, summary_key_for(self.post, num_beams=1)
+        )
+        self.assertIsNone(get_cached_summary(self.post))
+        self.assertTrue(SummaryJob.objects.filter(post=self.post).exists())
+
+
+class SummaryStreamTests(TestCase):
+    def test_stream_must_be_posted(self):
+        author = User.objects.create_user("author", password="pw")
+        club = Club.objects.create(
+            name="Robotics", slug="robotics", description="Robots.", created_by=author
+        )
+        post = Post.objects.create(
+            club=club, author=author, title="Kickoff", body="Welcome!"
+        )
+        url = reverse(
+            "posts:summarize_post_stream",
+            kwargs={"slug": club.slug, "post_id": post.id},
+        )
+
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+
+class MarkdownBlockRendererTests(SimpleTestCase):
+    def test_matches_reference_on_fixed_seed(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            text = random_document(rng)
+            self.assertEqual(
+                render_markdown_blocks(text, min_chars=0),
+                markdown_reference.render(text),
+                text,
+            )
+
+
+class RenderExistingMigrationTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user("author", password="pw")
+        self.club = Club.objects.create(
+            name="Robotics",
+            slug="robotics",
+            description="We *build* robots.",
+            created_by=author,
+        )
+        self.post = Post.objects.create(
+            club=self.club, author=author, title="Kickoff", body="Welcome **all**!"
+        )
+        # As saved before the rendered columns existed
+        Post.objects.update(body_html="", body_html_version=0, excerpt="")
+        Club.objects.update(description_html="", description_html_version=0, excerpt="")
+
+    def migrate(self, name, function):
+        app, module = name.split(".", 1)
+        migration = importlib.import_module(f"{app}.migrations.{module}")
+        getattr(migration, function)(apps, None)
+
+    def test_body_and_description_html_are_rendered(self):
+        self.migrate("posts.0016_render_existing_body_html", "render_existing")
+        self.migrate("clubs.0009_render_existing_description_html", "render_existing")
+
+        self.post.refresh_from_db()
+        self.club.refresh_from_db()
+        self.assertIn("<strong>all</strong>", self.post.body_html)
+        self.assertEqual(self.post.body_html_version, MARKDOWN_RENDERER_VERSION)
+        self.assertIn("<em>build</em>", self.club.description_html)
+
+    def test_excerpts_are_filled(self):
+        self.migrate("posts.0017_fill_existing_excerpt", "fill_existing")
+        self.migrate("clubs.0010_fill_existing_excerpt", "fill_existing")
+
+        self.post.refresh_from_db()
+        self.club.refresh_from_db()
+        self.assertEqual(self.post.excerpt, "Welcome all!")
+        self.assertEqual(self.club.excerpt, "We build robots.")
+
+
+class SummarizerReportTests(TestCase):
+    def add_run(self, origin, days_ago=0):
+        run = SummaryRun.objects.create(
+            source=SummarySource.MODEL, origin=origin, input_chars=100, total_ms=50
+        )
+        SummaryRun.objects.filter(pk=run.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_digest_runs_can_be_filtered(self):
+        self.add_run(SummaryOrigin.DIGEST)
+        self.add_run(SummaryOrigin.VIEW)
+        out = StringIO()
+
+        call_command("summarizer_report", "--origin", "digest", "--json", stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue())["runs"], 1)
+
+    def test_prune_deletes_old_runs(self):
+        self.add_run(SummaryOrigin.VIEW, days_ago=40)
+        self.add_run(SummaryOrigin.VIEW, days_ago=1)
+
+        call_command("summarizer_report", "--prune-days", "30", stdout=StringIO())
+
+        self.assertEqual(SummaryRun.objects.count(), 1)
+
+
+class BackfillSummariesTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user("author", password="pw")
+        club = Club.objects.create(
+            name="Robotics", slug="robotics", description="Robots.", created_by=author
+        )
+        self.posts = [
+            Post.objects.create(
+                club=club,
+                author=author,
+                title=f"Meeting {i}",
+                body=f"Minutes of meeting {i}: we planned the season and the budget.",
+            )
+            for i in range(3)
+        ]
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+
+    def backfill(self, *args):
+        call_command(
+            "backfill_summaries",
+            "--checkpoint",
+            self.checkpoint,
+            "--batch-size",
+            "1",
+            *args,
+            stdout=StringIO(),
+        )
+
+    def test_cached_summaries_are_looked_up_together(self):
+        for post in self.posts:
+            CachedSummary.objects.create(
+                content_hash=summary_key_for(post),
+                model_name="test",
+                summary=f"Cached {post.id}",
+            )
+
+        with mock.patch(
+            "posts.management.commands.backfill_summaries.summarize_with_metrics"
+        ) as summarize, CaptureQueriesContext(connection) as queries:
+            self.backfill()
+
+        summarize.assert_not_called()
+        lookups = [q for q in queries if "posts_cachedsummary" in q["sql"]]
+        self.assertEqual(len(lookups), 1)
+        for post in self.posts:
+            post.refresh_from_db()
+            self.assertEqual(post.summary, f"Cached {post.id}")
+
+    def test_resume_retries_a_failed_post(self):
+        first, second, third = self.posts
+
+        def summarize(texts, model_names):
+            if texts == [third.body]:
+                raise KeyboardInterrupt  # the run is interrupted
+            summaries = ["" if text == first.body else "Summary" for text in texts]
+            return summaries, [{} for _ in texts]
+
+        with mock.patch(
+            "posts.management.commands.backfill_summaries.summarize_with_metrics",
+            side_effect=summarize,
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.backfill()
+
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)["last_id"], first.id - 1)
+
+        with mock.patch(
+            "posts.management.commands.backfill_summaries.summarize_with_metrics",
+            side_effect=lambda texts, names: (
+                ["Summary"] * len(texts),
+                [{}] * len(texts),
+            ),
+        ):
+            self.backfill()
+
+        first.refresh_from_db()
+        self.assertEqual(first.summary, "Summary")
+
+
+class BatchingEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.model = FakeModel()
+        self.engine = BatchingEngine(
+            FakeTokenizer(), self.model, batch_size=1, window_ms=0, queue_depth=4
+        )
+
+    def tearDown(self):
+        self.model.gate.set()
+        self.engine.close()
+
+    def test_submission_over_capacity_is_rejected_whole(self):
+        self.model.gate.clear()
+        busy = threading.Thread(target=self.engine.submit, args=("first",))
+        busy.start()
+        self.model.started.wait(5)
+        waiting = threading.Thread(
+            target=self.engine.submit_many, args=(["a", "b", "c"],)
+        )
+        waiting.start()
+        while self.engine.queue_depth() < 3:
+            pass
+
+        with self.assertRaises(BatchQueueFull):
+            self.engine.submit_many(["d", "e"])
+        self.assertEqual(self.engine.queue_depth(), 3)
+
+        self.model.gate.set()
+        busy.join(5)
+        waiting.join(5)
+        self.assertEqual(self.model.generated, 4)
+        self.assertEqual(self.engine.stats()["rejected"], 2)
+
+    def test_timed_out_requests_are_not_generated(self):
+        self.model.gate.clear()
+        busy = threading.Thread(target=self.engine.submit, args=("first",))
+        busy.start()
+        self.model.started.wait(5)
+
+        with self.assertRaises(TimeoutError):
+            self.engine.submit_many(["a", "b"], timeout=0.05)
+        self.model.gate.set()
+        busy.join(5)
+        self.assertEqual(self.engine.submit("after"), "summary")
+        self.assertEqual(self.model.generated, 2)
+        self.assertEqual(self.engine.queue_depth(), 0)
+
+
+class MapReduceTests(SimpleTestCase):
+    def test_text_with_more_chunks_than_the_queue_holds(self):
+        model = FakeModel()
+        engine = BatchingEngine(FakeTokenizer(), model, window_ms=0, queue_depth=64)
+        self.addCleanup(engine.close)
+        # 100 paragraphs of 15 words; each is one 16-token chunk
+        text = "\n\n".join(" ".join(["word"] * 15) for _ in range(100))
+
+        summaries = _map_reduce(engine, [text], {})
+
+        self.assertEqual(summaries, ["summary"])
+        self.assertGreater(model.generated, 64)
+
+
+class ChooseTierTests(SimpleTestCase):
+    long_post = "The club met to plan the season. " * 2000  # about 66 KB
+
+    def choose(self, queued):
+        engine = SimpleNamespace(queue_depth=lambda: queued, batch_size=8)
+        with mock.patch.object(summarizer, "is_model_ready", return_value=True):
+            with mock.patch.object(
+                summarizer.registry,
+                "peek",
+                return_value=SimpleNamespace(engine=engine),
+            ):
+                return summarizer.choose_tier(self.long_post)
+
+    def test_long_post_on_idle_engine_stays_abstractive(self):
+        self.assertEqual(self.choose(queued=0), summarizer.TIER_ABSTRACTIVE)
+
+    def test_long_post_behind_a_backlog_is_extractive(self):
+        self.assertEqual(self.choose(queued=12), summarizer.TIER_EXTRACTIVE)
+
+
+class FakeTensor:
+    def __init__(self, ptr, numel, element_size):
+        self.ptr = ptr
+        self.size = numel
+        self.bytes_per_element = element_size
+
+    def data_ptr(self):
+        return self.ptr
+
+    def numel(self):
+        return self.size
+
+    def element_size(self):
+        return self.bytes_per_element
+
+
+class ModelMemoryTests(SimpleTestCase):
+    def test_quantized_packed_weights_are_counted_once(self):
+        embedding = FakeTensor(1, 1024 * 1024, 4)
+        state_dict = {
+            "shared.weight": embedding,
+            "lm_head.weight": embedding,  # tied to shared.weight
+            # int8 Linear: packed (weight, bias), absent from parameters()
+            "fc._packed_params._packed_params": (
+                FakeTensor(2, 2 * 1024 * 1024, 1),
+                None,
+            ),
+        }
+        model = SimpleNamespace(state_dict=lambda: state_dict)
+
+        self.assertEqual(model_memory_mb(model, rss_delta_mb=100), 6)
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.loaded_while = {}  # model name -> models resident when it loaded
+        self.registry = ModelRegistry(
+            self.load,
+            lambda name, tokenizer, model: SimpleNamespace(close=lambda: None),
+            max_memory_mb=1000,
+            model_memory_mb=600,
+        )
+
+    def load(self, name):
+        self.loaded_while[name] = sorted(self.registry.engines())
+        state_dict = {"weight": FakeTensor(id(name), 600 * 1024 * 1024, 1)}
+        return FakeTokenizer(), SimpleNamespace(state_dict=lambda: state_dict)
+
+    def test_old_model_is_evicted_before_the_new_one_loads(self):
+        self.registry.get("small")
+        self.registry.get("large")
+
+        self.assertEqual(self.loaded_while["large"], [])
+        self.assertEqual(sorted(self.registry.engines()), ["large"])
+
+    def test_model_over_the_budget_is_not_loaded(self):
+        self.registry.get("small")
+        self.registry.model_memory_mb = 1200
+
+        self.assertIsNone(self.registry.get("huge"))
+        self.assertNotIn("huge", self.loaded_while)
+        self.assertTrue(self.registry.has_failed("huge"))
+
+
+class LoadShedderTests(SimpleTestCase):
+    def test_stream_latency_stops_at_first_token(self):
+        shedder = LoadShedder(enabled=True)
+        with shedder.track() as record_latency:
+            record_latency()
+            time.sleep(0.2)  # the client reading the rest of the stream
+            self.assertEqual(shedder.stats()["in_flight"], 1)
+
+        stats = shedder.stats()
+        self.assertEqual(stats["samples"], 1)
+        self.assertLess(stats["latency_ms_p90"], 100)
+        self.assertEqual(stats["in_flight"], 0)
+
+
+class InferenceClientTests(SimpleTestCase):
+    def setUp(self):
+        inference_server._unavailable_until = 0.0
+        self.addCleanup(setattr, inference_server, "_unavailable_until", 0.0)
+
+    def test_refused_connection_marks_server_down(self):
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            address = "127.0.0.1:%d" % unused.getsockname()[1]
+        with self.assertRaises(inference_server.SummarizerUnavailable):
+            inference_server._request({"op": "ping"}, address)
+        self.assertFalse(inference_server.is_server_available())
+
+    def test_slow_server_is_not_marked_down(self):
+        with socket.socket() as busy:
+            busy.bind(("127.0.0.1", 0))
+            busy.listen()  # accepts connections but never answers
+            address = "127.0.0.1:%d" % busy.getsockname()[1]
+            with self.assertRaises(inference_server.SummarizerUnavailable):
+                inference_server._request({"op": "ping"}, address, timeout=0.1)
+        self.assertTrue(inference_server.is_server_available())
+
+    def test_client_waits_at_least_the_request_timeout(self):
+        self.assertGreaterEqual(
+            inference_server.SERVER_TIMEOUT, inference_server.REQUEST_TIMEOUT
+        )
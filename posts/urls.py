@@ -5,6 +5,9 @@ app_name = "posts"
 
 urlpatterns = [
     path("clubs/<slug:slug>/posts/new/", views.create_post, name="create_post"),
+    path(
+        "clubs/<slug:slug>/posts/preview/", views.preview_post, name="preview_post"
+    ),
     path(
         "clubs/<slug:slug>/posts/<int:post_id>/", views.post_detail, name="post_detail"
     ),
@@ -21,6 +24,16 @@ urlpatterns = [
         views.summarize_post,
         name="summarize_post",
     ),
+    path(
+        "clubs/<slug:slug>/posts/<int:post_id>/summarize/stream/",
+        views.summarize_post_stream,
+        name="summarize_post_stream",
+    ),
+    path(
+        "clubs/<slug:slug>/posts/<int:post_id>/discussion-digest/",
+        views.summarize_discussion,
+        name="summarize_discussion",
+    ),
     path(
         "clubs/<slug:slug>/posts/<int:post_id>/delete/",
         views.delete_post,
@@ -0,0 +1,123 @@
+"""
+Inference backends for the Hugging Face summarizer.
+
+SUMMARIZER_BACKEND selects how the seq2seq model is loaded:
+    torch       Full fp32 PyTorch model (default)
+    torch-int8  PyTorch model with Linear layers dynamically quantized to int8
+    onnx        ONNX Runtime model exported with optimum (requires the
+                optimum[onnxruntime] package)
+
+Every backend returns a tokenizer and a model with the same ``generate``
+interface, so the batching engine and callers are unchanged. Exported and
+quantized models are stored under HF_HOME by the export_summarizer_model
+management command.
+"""
+
+import os
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+BACKEND = os.getenv("SUMMARIZER_BACKEND", "torch")
+
+
+def export_dir(model_name, backend):
+    """Return the directory holding the exported model for a backend."""
+    hf_home = os.getenv("HF_HOME", "/app/.cache/huggingface")
+    return Path(hf_home) / "clubify" / f"{model_name.replace('/', '--')}-{backend}"
+
+
+def quantize_dynamic(model):
+    """Quantize a PyTorch model's Linear layers to int8 for CPU inference."""
+    import torch
+
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_model(model_name, backend=None):
+    """
+    Load (tokenizer, model) for a model name with the given backend.
+    Raises ValueError for an unknown backend and OSError if an exported model is missing.
+    """
+    backend = backend or BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown SUMMARIZER_BACKEND {backend!r}; expected one of {BACKENDS}"
+        )
+
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == "torch":
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model.eval()
+    elif backend == "torch-int8":
+        import torch
+
+        path = export_dir(model_name, backend) / "model.pt"
+        if path.exists():
+            model = torch.load(path, weights_only=False)
+        else:
+            # Quantizing at load time takes a few seconds; export to skip it
+            logger.info(f"No exported int8 model at {path}, quantizing at load time")
+            model = quantize_dynamic(AutoModelForSeq2SeqLM.from_pretrained(model_name))
+        model.eval()
+    else:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        path = export_dir(model_name, backend)
+        if not path.exists():
+            raise OSError(
+                f"No ONNX export at {path}. Run: "
+                f"python manage.py export_summarizer_model --backend onnx"
+            )
+        model = ORTModelForSeq2SeqLM.from_pretrained(path)
+
+    return tokenizer, model
+
+
+def export_model(model_name, backend, quantize=False):
+    """
+    Export or quantize a model for a backend and return the output directory.
+    For onnx, quantize=True also applies dynamic int8 quantization to the graphs.
+    """
+    if backend == "torch":
+        raise ValueError(
+            "The torch backend loads the model directly; nothing to export"
+        )
+
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    path = export_dir(model_name, backend)
+    path.mkdir(parents=True, exist_ok=True)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(path)
+
+    if backend == "torch-int8":
+        import torch
+
+        model = quantize_dynamic(AutoModelForSeq2SeqLM.from_pretrained(model_name))
+        torch.save(model, path / "model.pt")
+    elif backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True).save_pretrained(
+            path
+        )
+        if quantize:
+            from onnxruntime.quantization import QuantType
+            from onnxruntime.quantization import quantize_dynamic as ort_quantize
+
+            for onnx_file in path.glob("*.onnx"):
+                quantized = onnx_file.with_suffix(".int8.onnx")
+                ort_quantize(onnx_file, quantized, weight_type=QuantType.QInt8)
+                quantized.replace(onnx_file)
+    else:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+
+    logger.info(f"Exported {model_name} for {backend} to {path}")
+    return path
@@ -0,0 +1,354 @@
+"""
+Micro-batching layer for the Hugging Face summarizer.
+
+Concurrent callers submit texts to a per-model BatchingEngine. A single
+worker thread gathers the requests that arrive within a short window into
+one padded batch, runs a single ``model.generate`` call over it and hands
+each decoded summary back to the caller that submitted it.
+
+Configuration (environment variables):
+    SUMMARIZER_BATCH_SIZE       Maximum posts per generate call (default: 8)
+    SUMMARIZER_BATCH_WINDOW_MS  How long to wait for a batch to fill (default: 50)
+    SUMMARIZER_QUEUE_DEPTH      Maximum queued requests per model (default: 64)
+    SUMMARIZER_REQUEST_TIMEOUT  Seconds a caller waits for its result (default: 120)
+"""
+
+import os
+import contextlib
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from .governor import lower_thread_priority
+from .profiling import percentile
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv("SUMMARIZER_BATCH_SIZE", "8"))
+BATCH_WINDOW_MS = float(os.getenv("SUMMARIZER_BATCH_WINDOW_MS", "50"))
+QUEUE_DEPTH = int(os.getenv("SUMMARIZER_QUEUE_DEPTH", "64"))
+REQUEST_TIMEOUT = float(os.getenv("SUMMARIZER_REQUEST_TIMEOUT", "120"))
+
+# Number of recent wait times kept for percentile stats
+_WAIT_SAMPLES = 1000
+
+
+class BatchQueueFull(Exception):
+    """Raised when a request is submitted while the queue is at capacity."""
+
+
+# Queued by close() to stop the worker thread
+_STOP = object()
+
+
+class _BatchRequest:
+    """A single text waiting to be summarized as part of a batch."""
+
+    __slots__ = (
+        "text",
+        "params",
+        "enqueued_at",
+        "done",
+        "cancelled",
+        "result",
+        "error",
+        "wait_seconds",
+        "generate_seconds",
+        "input_tokens",
+        "output_tokens",
+    )
+
+    def __init__(self, text, params):
+        self.text = text
+        self.params = params
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        # Set when the caller stops waiting; the worker then skips the request
+        self.cancelled = False
+        self.result = None
+        self.error = None
+        self.wait_seconds = None
+        self.generate_seconds = None
+        self.input_tokens = None
+        self.output_tokens = None
+
+    def metrics(self):
+        """Return the queue wait, generate time and token counts for this request."""
+        return {
+            "wait_seconds": self.wait_seconds,
+            "generate_seconds": self.generate_seconds,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+def _count_tokens(rows, index, pad_token_id=None):
+    """Count the non-padding tokens in one row of a batch, or None if unknown."""
+    try:
+        row = rows[index]
+        if pad_token_id is None:
+            return len(row)
+        return int((row != pad_token_id).sum())
+    except Exception:
+        return None
+
+
+class BatchingEngine:
+    """
+    Gather summarization requests into padded batches for one model.
+
+    Only requests with identical generation parameters are batched together,
+    since a single generate call takes one set of parameters. Requests with
+    different parameters are deferred to the next batch.
+
+    At most ``queue_depth`` requests wait at a time, queued or deferred; a
+    submit_many() that does not fit is rejected as a whole.
+
+    ``slot(timeout)``, if given, returns a context manager held around each
+    generate call (see governor.inference_slot).
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        model,
+        name="summarizer",
+        batch_size=BATCH_SIZE,
+        window_ms=BATCH_WINDOW_MS,
+        queue_depth=QUEUE_DEPTH,
+        max_input_tokens=1024,
+        slot=None,
+    ):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.name = name
+        self.batch_size = max(1, batch_size)
+        self.window = max(0.0, window_ms) / 1000
+        self.max_input_tokens = max_input_tokens
+        self.slot = slot or (lambda timeout: contextlib.nullcontext())
+
+        self.capacity = max(1, queue_depth)
+        # Capacity is enforced by _pending, so a submission is admitted whole
+        self._queue = queue.Queue()
+        self._deferred = deque()
+        self._pending = 0  # requests queued or deferred, not yet in a batch
+        self._admit_lock = threading.Lock()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._rejected = 0
+        self._errors = 0
+        self._batch_sizes = {}
+        self._waits = deque(maxlen=_WAIT_SAMPLES)
+        self._generate_seconds = 0.0
+
+        self._worker = threading.Thread(
+            target=self._run, name=f"batching-{name}", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, text, timeout=REQUEST_TIMEOUT, **params):
+        """Summarize a single text. Blocks until its batch has been generated."""
+        return self.submit_many([text], timeout=timeout, **params)[0]
+
+    def submit_many(self, texts, timeout=REQUEST_TIMEOUT, metrics=None, **params):
+        """
+        Summarize several texts with the same generation parameters.
+
+        Returns the decoded summaries in input order. Raises BatchQueueFull if
+        the queue cannot take the requests, TimeoutError if they are not
+        processed within ``timeout`` seconds, or the exception raised by
+        generate if the batch failed. If ``metrics`` is a list, one dict of
+        queue wait, generate time and token counts per text is appended to it.
+        """
+        if self._closed:
+            raise RuntimeError(f"Summarizer engine for {self.name} has been closed")
+
+        requests = [_BatchRequest(text, params) for text in texts]
+        with self._admit_lock:
+            if self._pending + len(requests) > self.capacity:
+                with self._stats_lock:
+                    self._rejected += len(requests)
+                raise BatchQueueFull(
+                    f"Summarizer queue for {self.name} is full "
+                    f"({self._pending} of {self.capacity} requests waiting, "
+                    f"{len(requests)} submitted)"
+                )
+            self._pending += len(requests)
+            for request in requests:
+                self._queue.put_nowait(request)
+
+        deadline = time.monotonic() + timeout
+        for request in requests:
+            if not request.done.wait(max(0.0, deadline - time.monotonic())):
+                # Nobody will read the rest; let the worker skip them
+                for pending in requests:
+                    pending.cancelled = True
+                raise TimeoutError(
+                    f"Summarization did not finish within {timeout} seconds"
+                )
+            if request.error is not None:
+                for pending in requests:
+                    pending.cancelled = True
+                raise request.error
+
+        if metrics is not None:
+            metrics.extend(request.metrics() for request in requests)
+        return [request.result for request in requests]
+
+    def close(self):
+        """Stop the worker once the requests already queued have been processed."""
+        self._closed = True
+        self._queue.put(_STOP)
+
+    def queue_depth(self):
+        """Return the number of requests waiting to be batched."""
+        return self._pending
+
+    def _take(self, request):
+        """
+        Remove a request from the waiting count as it leaves the queue.
+        Returns False for a cancelled request, which is dropped instead.
+        """
+        with self._admit_lock:
+            self._pending -= 1
+        if request.cancelled:
+            request.done.set()
+            return False
+        return True
+
+    def stats(self):
+        """Return wait-time and batch-size statistics for this engine."""
+        with self._stats_lock:
+            waits = list(self._waits)
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "rejected": self._rejected,
+                "errors": self._errors,
+                "queue_depth": self.queue_depth(),
+                "avg_batch_size": (
+                    self._requests / self._batches if self._batches else 0.0
+                ),
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+                "wait_ms_p50": percentile(waits, 50) * 1000,
+                "wait_ms_p95": percentile(waits, 95) * 1000,
+                "wait_ms_max": max(waits, default=0.0) * 1000,
+                "generate_seconds_total": self._generate_seconds,
+            }
+
+    def _run(self):
+        """Worker loop: collect a batch, generate, repeat until closed."""
+        lower_thread_priority()
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+            try:
+                self._process(batch)
+            except Exception as e:  # pragma: no cover - _process reports errors
+                logger.error(f"Batching worker {self.name} failed: {e}", exc_info=True)
+
+    def _collect_batch(self):
+        """
+        Block for the first request, then gather more until full or timed out.
+        Returns None once close() has been called and nothing is left to process.
+        """
+        while True:
+            first = self._deferred.popleft() if self._deferred else self._queue.get()
+            if first is _STOP:
+                if not self._deferred:
+                    return None
+                # Finish the deferred requests before stopping
+                self._deferred.append(_STOP)
+                continue
+            if self._take(first):
+                break
+        batch = [first]
+
+        for request in list(self._deferred):
+            if len(batch) >= self.batch_size:
+                break
+            if request is _STOP:
+                continue
+            if request.cancelled or request.params == first.params:
+                self._deferred.remove(request)
+                if self._take(request):
+                    batch.append(request)
+
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                # Process this batch first; stop on the next collection
+                self._deferred.append(request)
+                break
+            if request.cancelled or request.params == first.params:
+                if self._take(request):
+                    batch.append(request)
+            else:
+                self._deferred.append(request)
+
+        return batch
+
+    def _process(self, batch):
+        """Run one padded generate call over the batch and route the results."""
+        started = time.monotonic()
+        failed = False
+        try:
+            inputs = self.tokenizer(
+                [request.text for request in batch],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=self.max_input_tokens,
+            )
+            with self.slot(REQUEST_TIMEOUT):
+                summary_ids = self.model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    **batch[0].params,
+                )
+            summaries = self.tokenizer.batch_decode(
+                summary_ids, skip_special_tokens=True
+            )
+            pad_token_id = getattr(self.tokenizer, "pad_token_id", None)
+            for i, (request, summary) in enumerate(zip(batch, summaries)):
+                request.result = summary
+                # Padding positions are 0 in the attention mask
+                request.input_tokens = _count_tokens(inputs["attention_mask"], i, 0)
+                request.output_tokens = _count_tokens(summary_ids, i, pad_token_id)
+        except Exception as e:
+            failed = True
+            logger.error(
+                f"Batch of {len(batch)} failed on {self.name}: {e}", exc_info=True
+            )
+            for request in batch:
+                request.error = e
+        finally:
+            elapsed = time.monotonic() - started
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._errors += len(batch) if failed else 0
+                self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+                self._waits.extend(started - request.enqueued_at for request in batch)
+                self._generate_seconds += elapsed
+            for request in batch:
+                request.wait_seconds = started - request.enqueued_at
+                request.generate_seconds = elapsed
+                request.done.set()
+
+        logger.debug(
+            f"Generated batch of {len(batch)} on {self.name} in {elapsed:.2f}s"
+        )
@@ -0,0 +1,89 @@
+"""
+Bundled corpus of club post bodies for the summarizer benchmark.
+
+Bodies are assembled from realistic club announcement paragraphs at several
+lengths, so runs on different machines summarize exactly the same input.
+"""
+
+PARAGRAPHS = [
+    "The robotics club will hold its annual open house next Friday in the "
+    "engineering building. Members will demonstrate the line-following robots "
+    "built during the autumn workshop series, and the competition team will "
+    "show the drone it is preparing for the regional championship in March.",
+    "New students are welcome to drop in between 4pm and 7pm, try the "
+    "simulators and talk to the project leads about joining a team. Pizza and "
+    "drinks will be provided, and there will be a short talk on getting started "
+    "with embedded programming at 5pm.",
+    "Our hiking group completed the three-day ridge traverse last weekend. "
+    "Twelve members covered forty-two kilometres with more than two thousand "
+    "metres of climbing, camping at the lake shelter on both nights. The "
+    "weather held until the final descent, when a storm rolled in over the pass.",
+    "Thanks to everyone who volunteered for the campus clean-up day. We "
+    "collected over three hundred kilograms of litter from the river path and "
+    "sorted most of it for recycling. The city council has asked us to make it "
+    "a twice-yearly event, and the next one is planned for early spring.",
+    "The debate society is looking for judges for the inter-university "
+    "tournament on the 14th. No experience is needed; we will run a one-hour "
+    "briefing on the motion format and scoring rubric the evening before. "
+    "Judges receive lunch and a certificate of participation.",
+    "Membership fees for the new academic year are now due. The fee covers "
+    "equipment maintenance, insurance for outdoor activities and the room "
+    "booking for weekly meetings. Members facing financial difficulty can "
+    "contact the treasurer privately to arrange a reduced rate.",
+    "The photography club's winter exhibition opens in the library foyer on "
+    "Monday. Forty prints from twenty-three members are on display, covering "
+    "street, landscape and portrait work. Visitors can vote for the people's "
+    "choice award until the end of the month.",
+    "We are changing the meeting schedule for the rest of term. Beginner "
+    "sessions move to Tuesday evenings and advanced sessions to Thursday, "
+    "because the sports hall is being resurfaced on Wednesdays. The shared "
+    "calendar has been updated with the new rooms and times.",
+    "The coding club hackathon produced eleven projects this year, from a "
+    "study-room booking bot to a tool that maps accessible routes around "
+    "campus. The winning team will present their work at the department "
+    "showcase, and several projects are looking for contributors to keep going.",
+    "Elections for next year's committee will take place at the general "
+    "meeting on the 28th. Nominations for president, secretary, treasurer and "
+    "events officer close a week before. Candidates should submit a short "
+    "statement that will be shared with all members ahead of the vote.",
+]
+
+HEADINGS = [
+    "## Upcoming Events",
+    "## Recap",
+    "## Volunteering",
+    "## Club Business",
+    "## Highlights",
+]
+
+# Number of paragraphs per body for each length bucket
+LENGTHS = {
+    "short": 1,
+    "medium": 4,
+    "long": 12,
+    "very_long": 30,
+}
+
+DOCUMENTS_PER_LENGTH = 8
+
+
+def build_body(paragraph_count, offset=0):
+    """Assemble a markdown post body from paragraph_count paragraphs."""
+    parts = []
+    for i in range(paragraph_count):
+        # Long posts get a section heading every four paragraphs
+        if paragraph_count > 4 and i % 4 == 0:
+            parts.append(HEADINGS[(offset + i // 4) % len(HEADINGS)])
+        parts.append(PARAGRAPHS[(offset + i) % len(PARAGRAPHS)])
+    return "\n\n".join(parts)
+
+
+def build_corpus(lengths=None):
+    """Return {length name: [post bodies]} for the requested length buckets."""
+    lengths = lengths or list(LENGTHS)
+    return {
+        name: [
+            build_body(LENGTHS[name], offset) for offset in range(DOCUMENTS_PER_LENGTH)
+        ]
+        for name in lengths
+    }
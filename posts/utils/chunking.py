@@ -0,0 +1,96 @@
+"""
+Token-budgeted chunking of long posts for map-reduce summarization.
+
+Posts are split on markdown section headings first, then on paragraphs and
+sentences, and the pieces are packed into chunks that each fit within a
+token budget measured with the model's own tokenizer.
+"""
+
+import re
+
+_SECTION_RE = re.compile(r"(?m)^(?=#{1,6}\s)")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=\S)")
+
+
+def token_budget(tokenizer, chunk_tokens):
+    """Return the usable input tokens per chunk for a tokenizer."""
+    model_max = getattr(tokenizer, "model_max_length", None) or 1024
+    # Tokenizers without a configured limit report a huge sentinel value
+    model_max = min(model_max, 1024)
+    usable = model_max - tokenizer.num_special_tokens_to_add()
+    return max(16, min(chunk_tokens, usable))
+
+
+def count_tokens(tokenizer, text):
+    """Return the number of tokens in text, excluding special tokens."""
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _split_by_tokens(tokenizer, text, budget):
+    """Hard-split a piece with no usable boundaries into budget-sized windows."""
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    return [
+        tokenizer.decode(ids[start : start + budget], skip_special_tokens=True)
+        for start in range(0, len(ids), budget)
+    ]
+
+
+def _units(tokenizer, text, budget):
+    """
+    Yield (piece, token_count) units that each fit within the budget.
+    Whole sections are kept together when they fit; otherwise they are broken
+    into paragraphs, then sentences, then raw token windows.
+    """
+    for section in _SECTION_RE.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        tokens = count_tokens(tokenizer, section)
+        if tokens <= budget:
+            yield section, tokens
+            continue
+
+        for paragraph in _PARAGRAPH_RE.split(section):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = count_tokens(tokenizer, paragraph)
+            if tokens <= budget:
+                yield paragraph, tokens
+                continue
+
+            for sentence in _SENTENCE_RE.split(paragraph):
+                tokens = count_tokens(tokenizer, sentence)
+                if tokens <= budget:
+                    yield sentence, tokens
+                else:
+                    for window in _split_by_tokens(tokenizer, sentence, budget):
+                        yield window, count_tokens(tokenizer, window)
+
+
+def split_into_chunks(tokenizer, text, budget):
+    """
+    Split text into chunks of at most `budget` tokens.
+
+    Returns a list with a single element when the text already fits.
+    """
+    text = (text or "").strip()
+    if count_tokens(tokenizer, text) <= budget:
+        return [text]
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece, tokens in _units(tokenizer, text, budget):
+        # The joining blank line costs roughly one token
+        if current and current_tokens + tokens + 1 > budget:
+            chunks.append("\n\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(piece)
+        current_tokens += tokens + (1 if current_tokens else 0)
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,168 @@
+"""
+Extractive summarizer: TextRank over sentence TF-IDF vectors.
+
+Runs in milliseconds without a model, so it serves as the fast tier while the
+abstractive model is loading, failing or overloaded. Uses NumPy when it is
+installed (it ships with torch) and falls back to pure Python otherwise.
+"""
+
+import math
+import re
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with torch
+    np = None
+
+# Longer posts are ranked over their first MAX_SENTENCES sentences
+MAX_SENTENCES = 200
+
+# Sentences this similar to one already in the summary are left out
+REDUNDANCY_THRESHOLD = 0.8
+
+_CODE_BLOCK_RE = re.compile(r"```[\s\S]*?```")
+_HEADING_RE = re.compile(r"(?m)^\s*#{1,6}\s.*$")
+_MARKUP_RE = re.compile(r"(?m)^\s*([-*+]\s+|\d+\.\s+|>\s*)")
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_EMPHASIS_RE = re.compile(r"[*_`]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+STOP_WORDS = frozenset("""
+    a about after all also an and any are as at be because been but by can
+    could did do does for from had has have he her his how i if in into is it
+    its just me more most my no not of on or our out over she so some than
+    that the their them then there these they this to up us was we were what
+    when which who will with would you your
+    """.split())
+
+
+def split_sentences(text):
+    """Strip markdown and split text into sentences, keeping their order."""
+    text = _CODE_BLOCK_RE.sub(" ", text or "")
+    # Headings label sections rather than summarize them
+    text = _HEADING_RE.sub("", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _MARKUP_RE.sub("", text)
+    text = _EMPHASIS_RE.sub("", text)
+
+    sentences = []
+    for block in re.split(r"\n\s*\n", text):
+        block = " ".join(block.split())
+        sentences.extend(s for s in _SENTENCE_RE.split(block) if len(s) > 1)
+    return sentences
+
+
+def _tfidf(sentences):
+    """Return one {term: weight} vector per sentence, L2-normalized."""
+    tokenized = [
+        [word for word in _WORD_RE.findall(s.lower()) if word not in STOP_WORDS]
+        for s in sentences
+    ]
+    document_frequency = Counter(word for words in tokenized for word in set(words))
+    count = len(sentences)
+
+    vectors = []
+    for words in tokenized:
+        weights = {
+            word: tf * (math.log((1 + count) / (1 + document_frequency[word])) + 1)
+            for word, tf in Counter(words).items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        vectors.append({word: w / norm for word, w in weights.items()})
+    return vectors
+
+
+def _similarity_matrix(vectors):
+    """Return the pairwise cosine similarities of normalized sparse vectors."""
+    if np is not None:
+        vocabulary = {word: i for i, word in enumerate({w for v in vectors for w in v})}
+        matrix = np.zeros((len(vectors), len(vocabulary)), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            for word, weight in vector.items():
+                matrix[row, vocabulary[word]] = weight
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+        return similarity
+
+    size = len(vectors)
+    similarity = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            small, large = sorted((vectors[i], vectors[j]), key=len)
+            score = sum(w * large.get(word, 0.0) for word, w in small.items())
+            similarity[i][j] = similarity[j][i] = score
+    return similarity
+
+
+def _textrank(similarity, damping=0.85, iterations=30, tolerance=1e-4):
+    """Score sentences with PageRank over the similarity graph."""
+    size = len(similarity)
+    if np is not None:
+        matrix = np.asarray(similarity, dtype=np.float64)
+        out_weight = matrix.sum(axis=1)
+        out_weight[out_weight == 0] = 1.0
+        transition = (matrix / out_weight[:, None]).T
+        scores = np.full(size, 1.0 / size)
+        for _ in range(iterations):
+            updated = (1 - damping) / size + damping * (transition @ scores)
+            delta = np.abs(updated - scores).sum()
+            scores = updated
+            if delta < tolerance:
+                break
+        return scores.tolist()
+
+    out_weight = [sum(row) or 1.0 for row in similarity]
+    # Column i holds the share of each sentence's weight that flows to i
+    columns = [
+        [similarity[j][i] / out_weight[j] for j in range(size)] for i in range(size)
+    ]
+    scores = [1.0 / size] * size
+    for _ in range(iterations):
+        updated = [
+            (1 - damping) / size
+            + damping * sum(w * score for w, score in zip(column, scores))
+            for column in columns
+        ]
+        delta = sum(abs(a - b) for a, b in zip(updated, scores))
+        scores = updated
+        if delta < tolerance:
+            break
+    return scores
+
+
+def extractive_summary(text, max_sentences=3, max_chars=600):
+    """
+    Return the highest-ranked sentences of text in their original order.
+
+    Args:
+        text: The text to summarize
+        max_sentences: Maximum sentences in the summary (default: 3)
+        max_chars: Stop adding sentences past this length (default: 600)
+
+    Returns:
+        str: The extracted summary, or "" if text has no sentences
+    """
+    sentences = split_sentences(text)[:MAX_SENTENCES]
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    similarity = _similarity_matrix(_tfidf(sentences))
+    scores = _textrank(similarity)
+    ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+
+    chosen = []
+    length = 0
+    for index in ranked:
+        if len(chosen) >= max_sentences:
+            break
+        if chosen and length + len(sentences[index]) > max_chars:
+            continue
+        # Skip near-duplicates of sentences already chosen
+        if any(similarity[index][i] > REDUNDANCY_THRESHOLD for i in chosen):
+            continue
+        chosen.append(index)
+        length += len(sentences[index]) + 1
+
+    return " ".join(sentences[i] for i in sorted(chosen))
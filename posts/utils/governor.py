@@ -0,0 +1,134 @@
+"""
+CPU governor for in-process inference.
+
+Keeps summarization from starving ordinary page requests of CPU:
+    - torch intra-/inter-op thread counts are set once, before the first model loads
+    - a per-process semaphore caps concurrent generate calls
+    - a host-wide pool of file-lock tokens caps generations across all
+      processes on the machine (gunicorn workers, summarizer workers, servers)
+    - inference threads run at a lower scheduling priority (Linux)
+
+Configuration (environment variables):
+    SUMMARIZER_TORCH_THREADS          Intra-op threads per generation (default: 2)
+    SUMMARIZER_TORCH_INTEROP_THREADS  Inter-op threads (default: 1)
+    SUMMARIZER_PROCESS_CONCURRENCY    Concurrent generations per process (default: 1)
+    SUMMARIZER_HOST_SLOTS             Concurrent generations per host (default:
+                                      CPU cores // SUMMARIZER_TORCH_THREADS, minus one
+                                      generation's worth of cores for page requests);
+                                      0 disables the host pool
+    SUMMARIZER_LOCK_DIR               Directory for the host token files
+    SUMMARIZER_NICE                   Niceness added to inference threads (default: 10)
+"""
+
+import os
+import contextlib
+import logging
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CPU_COUNT = os.cpu_count() or 1
+TORCH_THREADS = int(os.getenv("SUMMARIZER_TORCH_THREADS", "2"))
+TORCH_INTEROP_THREADS = int(os.getenv("SUMMARIZER_TORCH_INTEROP_THREADS", "1"))
+PROCESS_CONCURRENCY = int(os.getenv("SUMMARIZER_PROCESS_CONCURRENCY", "1"))
+HOST_SLOTS = int(
+    os.getenv(
+        "SUMMARIZER_HOST_SLOTS",
+        str(max(1, CPU_COUNT // max(1, TORCH_THREADS) - 1)),
+    )
+)
+LOCK_DIR = os.getenv(
+    "SUMMARIZER_LOCK_DIR", os.path.join(tempfile.gettempdir(), "clubify-inference")
+)
+NICE = int(os.getenv("SUMMARIZER_NICE", "10"))
+
+# How often a caller waiting for a host token retries
+_POLL_SECONDS = 0.02
+
+_process_slots = threading.BoundedSemaphore(max(1, PROCESS_CONCURRENCY))
+_torch_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_torch_threads():
+    """Apply the torch thread settings once per process. Safe to call repeatedly."""
+    global _torch_configured
+    with _configure_lock:
+        if _torch_configured:
+            return
+        _torch_configured = True
+        try:
+            import torch
+        except ImportError:
+            return
+
+        torch.set_num_threads(max(1, TORCH_THREADS))
+        try:
+            torch.set_num_interop_threads(max(1, TORCH_INTEROP_THREADS))
+        except RuntimeError as e:
+            # Only allowed before any inter-op work has run in this process
+            logger.warning(f"Could not set torch inter-op threads: {e}")
+        logger.info(
+            f"Torch using {TORCH_THREADS} intra-op and "
+            f"{TORCH_INTEROP_THREADS} inter-op threads"
+        )
+
+
+def lower_thread_priority():
+    """Raise the calling thread's niceness so page requests are scheduled first."""
+    if NICE <= 0 or not hasattr(os, "setpriority"):
+        return
+    try:
+        # On Linux, PRIO_PROCESS with a thread id applies to that thread only;
+        # threads it starts (e.g. torch's pool) inherit the value
+        thread_id = threading.get_native_id()
+        current = os.getpriority(os.PRIO_PROCESS, thread_id)
+        os.setpriority(os.PRIO_PROCESS, thread_id, min(19, current + NICE))
+    except OSError as e:
+        logger.debug(f"Could not lower inference thread priority: {e}")
+
+
+def _acquire_host_token(deadline):
+    """Lock one of the host token files, returning its open file, or None on timeout."""
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    while True:
+        for slot in range(HOST_SLOTS):
+            token = open(os.path.join(LOCK_DIR, f"slot-{slot}.lock"), "a")
+            try:
+                fcntl.flock(token, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return token
+            except OSError:
+                token.close()
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(_POLL_SECONDS)
+
+
+@contextlib.contextmanager
+def inference_slot(timeout):
+    """
+    Hold a process slot and a host token for one generate call.
+    Raises TimeoutError if both cannot be acquired within timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    if not _process_slots.acquire(timeout=timeout):
+        raise TimeoutError(f"No inference slot in this process within {timeout}s")
+    token = None
+    try:
+        if HOST_SLOTS > 0 and fcntl is not None:
+            token = _acquire_host_token(deadline)
+            if token is None:
+                raise TimeoutError(f"No host inference token within {timeout}s")
+        yield
+    finally:
+        if token is not None:
+            # Closing the file releases its lock
+            token.close()
+        _process_slots.release()
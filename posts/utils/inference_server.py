@@ -0,0 +1,307 @@
+"""
+Out-of-process summarization server and client.
+
+The run_summarizer_server management command owns the only copy of the model
+and serves requests over a Unix socket or localhost TCP port. Web and worker
+processes with SUMMARIZER_SERVER_ADDRESS set forward summarizations to it
+instead of loading the model themselves.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "summarize", "texts": [...], "max_length": 300, "min_length": 50,
+     "model_name": null, "num_beams": null}
+        -> {"summaries": [...], "metrics": [{"input_tokens": ..., ...}, ...]}
+    {"op": "stream", "text": "...", "max_length": 300, "min_length": 50,
+     "model_name": null}
+        -> {"text": "..."} per generated piece, then {"done": true}
+    {"op": "load", "model_name": "...", "wait": true}
+        -> {"loaded": true}; with "wait": false the load runs in the background
+    {"op": "stats"} -> {"stats": {...}}
+    {"op": "ping"}  -> {"ok": true}
+Errors are returned as {"error": "..."}.
+
+Addresses are either "unix:/path/to/socket" or "host:port".
+"""
+
+import os
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+
+from .batching import REQUEST_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+SERVER_ADDRESS = os.getenv("SUMMARIZER_SERVER_ADDRESS", "")
+DEFAULT_SERVER_ADDRESS = "127.0.0.1:8765"
+# Never shorter than the server's own wait for a batch, so a busy server
+# answers (or times out itself) before the client gives up on it
+SERVER_TIMEOUT = max(
+    float(os.getenv("SUMMARIZER_SERVER_TIMEOUT", str(REQUEST_TIMEOUT + 30))),
+    REQUEST_TIMEOUT,
+)
+CONNECT_TIMEOUT = 2.0
+
+# After a refused or failed connection, skip the server for this long and
+# fall back at once; a slow response only fails that request
+RETRY_AFTER_SECONDS = 5.0
+
+# Largest request or response line accepted (bytes)
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+class SummarizerUnavailable(Exception):
+    """Raised when the summarization server cannot be reached or fails."""
+
+
+def parse_address(address):
+    """Return (socket family, address) for "unix:/path" or "host:port"."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:") :]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid summarizer server address: {address!r}")
+    return socket.AF_INET, (host, int(port))
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+_unavailable_until = 0.0
+_state_lock = threading.Lock()
+
+
+def _mark_unavailable():
+    global _unavailable_until
+    with _state_lock:
+        _unavailable_until = time.monotonic() + RETRY_AFTER_SECONDS
+
+
+def is_server_available():
+    """Return False while the server is in its post-failure back-off window."""
+    return time.monotonic() >= _unavailable_until
+
+
+def _decode(line):
+    """Decode one response line, raising SummarizerUnavailable on errors."""
+    if not line:
+        raise SummarizerUnavailable("Summarizer server closed the connection")
+    try:
+        response = json.loads(line)
+    except ValueError as e:
+        raise SummarizerUnavailable(f"Invalid response from summarizer server: {e}")
+    if "error" in response:
+        raise SummarizerUnavailable(f"Summarizer server error: {response['error']}")
+    return response
+
+
+def _responses(payload, address=None, timeout=None):
+    """Send one request to the server and yield each decoded response line."""
+    address = address or SERVER_ADDRESS
+    if time.monotonic() < _unavailable_until:
+        raise SummarizerUnavailable("Summarizer server recently unreachable")
+
+    family, target = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(target)
+        except OSError as e:
+            # Refused, missing socket file or no answer: the server is down
+            _mark_unavailable()
+            raise SummarizerUnavailable(f"Summarizer server {address} unavailable: {e}")
+
+        try:
+            sock.settimeout(timeout or SERVER_TIMEOUT)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                while True:
+                    yield _decode(stream.readline(MAX_MESSAGE_BYTES))
+        except OSError as e:
+            # Connected but slow or dropped: busy, not down; keep using it
+            raise SummarizerUnavailable(f"Summarizer server {address} failed: {e}")
+    finally:
+        sock.close()
+
+
+def _request(payload, address=None, timeout=None):
+    """Send one request to the server and return its decoded response."""
+    responses = _responses(payload, address, timeout)
+    try:
+        return next(responses)
+    finally:
+        responses.close()
+
+
+def remote_summarize_many(
+    texts,
+    max_length=300,
+    min_length=50,
+    model_name=None,
+    timeout=None,
+    metrics=None,
+    num_beams=None,
+):
+    """
+    Summarize texts on the server. Returns one summary (or None) per text.
+    If metrics is a list, the server's per-text metrics are appended to it.
+    """
+    response = _request(
+        {
+            "op": "summarize",
+            "texts": list(texts),
+            "max_length": max_length,
+            "min_length": min_length,
+            "model_name": model_name,
+            "num_beams": num_beams,
+        },
+        timeout=timeout,
+    )
+    if metrics is not None:
+        metrics.extend(response.get("metrics") or [{} for _ in texts])
+    return response["summaries"]
+
+
+def remote_stream_summary(
+    text, max_length=300, min_length=50, model_name=None, timeout=None
+):
+    """Yield summary pieces from the server as they are generated."""
+    responses = _responses(
+        {
+            "op": "stream",
+            "text": text,
+            "max_length": max_length,
+            "min_length": min_length,
+            "model_name": model_name,
+        },
+        timeout=timeout,
+    )
+    try:
+        for response in responses:
+            if response.get("done"):
+                return
+            yield response["text"]
+    finally:
+        responses.close()
+
+
+def remote_load_model(model_name, wait=True, address=None, timeout=None):
+    """
+    Ask the server to load a model and return whether it is loaded.
+    With wait=False the server loads it in the background and replies at once.
+    """
+    response = _request(
+        {"op": "load", "model_name": model_name, "wait": wait},
+        address=address,
+        timeout=timeout,
+    )
+    return response["loaded"]
+
+
+def remote_stats(address=None):
+    """Return the server's batching statistics."""
+    return _request({"op": "stats"}, address=address)["stats"]
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serve newline-delimited JSON requests on one connection."""
+
+    def handle(self):
+        from .summarizer import get_batching_stats, registry, summarize_many_locally
+
+        while True:
+            line = self.rfile.readline(MAX_MESSAGE_BYTES)
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                if op == "stream":
+                    self.handle_stream(request)
+                    continue
+                if op == "summarize":
+                    metrics = []
+                    summaries = summarize_many_locally(
+                        request["texts"],
+                        request.get("max_length", 300),
+                        request.get("min_length", 50),
+                        request.get("model_name"),
+                        metrics=metrics,
+                        num_beams=request.get("num_beams"),
+                    )
+                    response = {"summaries": summaries, "metrics": metrics}
+                elif op == "load":
+                    if request.get("wait", True):
+                        loaded = registry.get(request["model_name"]) is not None
+                    else:
+                        registry.load_async(request["model_name"])
+                        loaded = registry.is_loaded(request["model_name"])
+                    response = {"loaded": loaded}
+                elif op == "stats":
+                    response = {"stats": get_batching_stats()}
+                elif op == "ping":
+                    response = {"ok": True}
+                else:
+                    response = {"error": f"Unknown op: {op!r}"}
+            except Exception as e:
+                logger.error(f"Summarizer server request failed: {e}", exc_info=True)
+                response = {"error": str(e)}
+            self.send(response)
+
+    def handle_stream(self, request):
+        """Send each generated piece as its own line, then a done marker."""
+        from .summarizer import stream_summary_locally
+
+        pieces = stream_summary_locally(
+            request["text"],
+            request.get("max_length", 300),
+            request.get("min_length", 50),
+            request.get("model_name"),
+        )
+        try:
+            for piece in pieces:
+                self.send({"text": piece})
+            self.send({"done": True})
+        except OSError:
+            # The client went away; closing pieces stops generation
+            logger.info("Summarizer server stream client disconnected")
+        except Exception as e:
+            logger.error(f"Summarizer server stream failed: {e}", exc_info=True)
+            self.send({"error": str(e)})
+        finally:
+            pieces.close()
+
+    def send(self, response):
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_server(address):
+    """Create (but do not start) a threaded server bound to address."""
+    family, target = parse_address(address)
+    if family == socket.AF_UNIX:
+        # Remove a stale socket left behind by a previous run
+        if os.path.exists(target):
+            os.unlink(target)
+        server = _ThreadingUnixServer(target, _RequestHandler)
+        os.chmod(target, 0o660)
+        return server
+    return _ThreadingTCPServer(target, _RequestHandler)
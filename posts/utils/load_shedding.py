@@ -0,0 +1,173 @@
+"""
+Adaptive load shedding for on-demand summarization.
+
+The summarize endpoint tracks how many summarizations this process is running
+and how long recent ones took. As either grows, new requests step down to
+cheaper work:
+
+    beam      4-beam search (the normal path)
+    greedy    greedy decoding (num_beams=1)
+    fallback  extractive / truncated summary, model run queued for the worker
+    shed      a fast "try again shortly" response
+
+Latency samples expire after the window, so the level recovers on its own
+once the spike is over.
+
+Configuration (environment variables):
+    SUMMARIZER_LOAD_SHEDDING             Enable the policy (default: true)
+    SUMMARIZER_SHED_WINDOW_SECONDS       Age of latency samples considered (default: 30)
+    SUMMARIZER_SHED_GREEDY_IN_FLIGHT     Running summarizations before greedy (default: 2)
+    SUMMARIZER_SHED_FALLBACK_IN_FLIGHT   ... before the fallback summary (default: 4)
+    SUMMARIZER_SHED_REJECT_IN_FLIGHT     ... before "try again shortly" (default: 8)
+    SUMMARIZER_SHED_GREEDY_LATENCY_MS    p90 latency before greedy (default: 5000)
+    SUMMARIZER_SHED_FALLBACK_LATENCY_MS  ... before the fallback summary (default: 15000)
+    SUMMARIZER_SHED_REJECT_LATENCY_MS    ... before "try again shortly" (default: 30000)
+"""
+
+import os
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+
+from .profiling import percentile
+
+logger = logging.getLogger(__name__)
+
+LOAD_SHEDDING = os.getenv("SUMMARIZER_LOAD_SHEDDING", "true").lower() == "true"
+WINDOW_SECONDS = float(os.getenv("SUMMARIZER_SHED_WINDOW_SECONDS", "30"))
+
+# Levels, cheapest last
+LEVEL_BEAM = "beam"
+LEVEL_GREEDY = "greedy"
+LEVEL_FALLBACK = "fallback"
+LEVEL_SHED = "shed"
+LEVELS = (LEVEL_BEAM, LEVEL_GREEDY, LEVEL_FALLBACK, LEVEL_SHED)
+
+# Thresholds for greedy, fallback and shed, in that order
+IN_FLIGHT_THRESHOLDS = (
+    int(os.getenv("SUMMARIZER_SHED_GREEDY_IN_FLIGHT", "2")),
+    int(os.getenv("SUMMARIZER_SHED_FALLBACK_IN_FLIGHT", "4")),
+    int(os.getenv("SUMMARIZER_SHED_REJECT_IN_FLIGHT", "8")),
+)
+LATENCY_THRESHOLDS_MS = (
+    float(os.getenv("SUMMARIZER_SHED_GREEDY_LATENCY_MS", "5000")),
+    float(os.getenv("SUMMARIZER_SHED_FALLBACK_LATENCY_MS", "15000")),
+    float(os.getenv("SUMMARIZER_SHED_REJECT_LATENCY_MS", "30000")),
+)
+
+# A single slow post should not degrade everyone; wait for a few samples
+MIN_LATENCY_SAMPLES = 3
+
+# Suggested wait before retrying a shed request
+RETRY_AFTER_SECONDS = 10
+
+
+def _step(value, thresholds):
+    """Return the index in LEVELS reached by value against ascending thresholds."""
+    index = 0
+    for i, threshold in enumerate(thresholds):
+        if threshold > 0 and value >= threshold:
+            index = i + 1
+    return index
+
+
+class LoadShedder:
+    """Tracks in-flight summarizations and recent latency for one process."""
+
+    def __init__(
+        self,
+        window_seconds=WINDOW_SECONDS,
+        in_flight_thresholds=IN_FLIGHT_THRESHOLDS,
+        latency_thresholds_ms=LATENCY_THRESHOLDS_MS,
+        enabled=LOAD_SHEDDING,
+    ):
+        self.window_seconds = window_seconds
+        self.in_flight_thresholds = in_flight_thresholds
+        self.latency_thresholds_ms = latency_thresholds_ms
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # (finished at, seconds) for recent summarizations
+        self._samples = deque()
+        self._last_level = LEVEL_BEAM
+
+    @contextlib.contextmanager
+    def track(self):
+        """
+        Count a summarization as in flight and record its latency when it ends.
+
+        Yields a function that records the latency early instead: a stream
+        calls it at its first token, so the time the reader takes to consume
+        the rest does not count as latency.
+        """
+        started = time.monotonic()
+        recorded = False
+
+        def record_latency():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            finished = time.monotonic()
+            with self._lock:
+                self._samples.append((finished, finished - started))
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield record_latency
+        finally:
+            record_latency()
+            with self._lock:
+                self._in_flight -= 1
+
+    def _prune(self, now):
+        """Drop samples older than the window. Call with the lock held."""
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def level(self):
+        """Return the decoding level a new request should use right now."""
+        if not self.enabled:
+            return LEVEL_BEAM
+
+        with self._lock:
+            self._prune(time.monotonic())
+            in_flight = self._in_flight
+            latencies = [seconds for _, seconds in self._samples]
+
+        index = _step(in_flight, self.in_flight_thresholds)
+        if len(latencies) >= MIN_LATENCY_SAMPLES:
+            latency_ms = percentile(latencies, 90) * 1000
+            index = max(index, _step(latency_ms, self.latency_thresholds_ms))
+        level = LEVELS[index]
+
+        if level != self._last_level:
+            recovering = index < LEVELS.index(self._last_level)
+            log = logger.info if recovering else logger.warning
+            log(
+                f"Summarizer load level {self._last_level} -> {level} "
+                f"({in_flight} in flight)"
+            )
+            self._last_level = level
+        return level
+
+    def stats(self):
+        """Return the in-flight count, recent latency and current level."""
+        with self._lock:
+            self._prune(time.monotonic())
+            in_flight = self._in_flight
+            latencies = [seconds for _, seconds in self._samples]
+        return {
+            "in_flight": in_flight,
+            "samples": len(latencies),
+            "latency_ms_p50": percentile(latencies, 50) * 1000,
+            "latency_ms_p90": percentile(latencies, 90) * 1000,
+            "level": self._last_level,
+        }
+
+
+# Shared by the summarize views in this process
+shedder = LoadShedder()
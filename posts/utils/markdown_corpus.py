@@ -0,0 +1,129 @@
+"""
+Bundled Markdown documents for the rendering benchmarks.
+
+Built from the summarizer benchmark paragraphs plus the constructs the Toast UI
+editor produces (lists, Markdown and pasted HTML tables, fenced code), so runs
+on different machines render exactly the same input.
+"""
+
+from .benchmark_corpus import HEADINGS, PARAGRAPHS, build_body
+
+SCHEDULE_ROWS = [
+    ("Monday", "Beginner workshop", "Lab 2"),
+    ("Tuesday", "Project night", "Makerspace"),
+    ("Thursday", "Advanced session", "Lab 4"),
+    ("Saturday", "Field trip", "Main gate"),
+]
+
+
+def markdown_table(rows):
+    """Return a Markdown table with a header row."""
+    lines = ["| Day | Activity | Room |", "| --- | --- | --- |"]
+    lines += [f"| {day} | {activity} | {room} |" for day, activity, room in rows]
+    return "\n".join(lines)
+
+
+def html_table(rows):
+    """Return an HTML table as pasted into the editor."""
+    body = "".join(
+        f"<tr><td>{day}</td><td>{activity}</td><td>{room}</td></tr>"
+        for day, activity, room in rows
+    )
+    return (
+        "<table><thead><tr><th>Day</th><th>Activity</th><th>Room</th></tr></thead>"
+        f"<tbody>{body}</tbody></table>"
+    )
+
+
+def club_description():
+    """A short club description with a bullet list."""
+    return "\n".join(
+        [
+            PARAGRAPHS[0],
+            "What we do:",
+            "- Weekly build sessions",
+            "- Regional competitions",
+            "- Workshops for beginners",
+        ]
+    )
+
+
+def post_with_tables(offset=0):
+    """A medium post with a Markdown table, a pasted HTML table and code."""
+    return "\n\n".join(
+        [
+            build_body(4, offset),
+            markdown_table(SCHEDULE_ROWS),
+            html_table(SCHEDULE_ROWS),
+            "```python\nfor member in club.members:\n    greet(member)\n```",
+            "1. Sign up\n2. Pay the fee\n3. Join a team",
+        ]
+    )
+
+
+def handbook(sections=12):
+    """A long handbook-style post: many headed sections with lists and tables."""
+    parts = []
+    for i in range(sections):
+        parts.append(HEADINGS[i % len(HEADINGS)] + f" {i + 1}")
+        parts.append(PARAGRAPHS[i % len(PARAGRAPHS)])
+        parts.append("Checklist:\n- Read the rules\n- Bring equipment\n- Sign in")
+        parts.append(markdown_table(SCHEDULE_ROWS[: 2 + i % 3]))
+    return "\n\n".join(parts)
+
+
+def nested_list(depth, items=3):
+    """A bullet list nested `depth` levels deep, `items` items per level."""
+    lines = []
+    for level in range(depth):
+        indent = "    " * level
+        lines += [f"{indent}- Level {level + 1} item {i + 1}" for i in range(items)]
+    return "\n".join(lines)
+
+
+def long_code_block(lines):
+    """A fenced code block of `lines` lines."""
+    code = [f"    total += weights[{i}] * values[{i}]" for i in range(lines)]
+    return "\n".join(["```python", "def score(weights, values):", *code, "```"])
+
+
+def build_markdown_corpus():
+    """Return {document name: Markdown text}."""
+    return {
+        "club_description": club_description(),
+        "post_short": build_body(1),
+        "post_medium": build_body(4, 3),
+        "post_tables": post_with_tables(),
+        "handbook": handbook(),
+    }
+
+
+def build_adversarial_corpus():
+    """
+    Return {document name: Markdown text} of bodies that are large or deeply
+    structured but still plausible editor output.
+    """
+    return {
+        "pasted_table_500_rows": html_table(SCHEDULE_ROWS * 125),
+        "pipe_table_2000_rows": markdown_table(SCHEDULE_ROWS * 500),
+        "table_without_separator": "\n".join(
+            f"| {day} | {activity} | {room} |"
+            for day, activity, room in SCHEDULE_ROWS * 250
+        ),
+        "nested_list_12_levels": nested_list(12),
+        "list_after_every_line": "Step:\n- do it\n" * 500,
+        "code_block_2000_lines": long_code_block(2000),
+        "handbook_100_sections": handbook(100),
+    }
+
+
+# Inputs that are slow for backtracking regexes, by name -> builder(n)
+PATHOLOGICAL_INPUTS = {
+    "unclosed tables": lambda n: "<table>" * n,
+    "unclosed rows": lambda n: "<table>" + "<tr>" * n + "</table>",
+    "unclosed cells": lambda n: "<table><tr>" + "<td>x" * n + "</tr></table>",
+    "angle brackets": lambda n: "<table><tr><td>" + "<" * n + "</td></tr></table>",
+    "large pasted table": lambda n: html_table(SCHEDULE_ROWS * (n // 4)),
+    "long pipe table": lambda n: markdown_table(SCHEDULE_ROWS * (n // 4)),
+    "list after every line": lambda n: "text\n- item\n" * n,
+}
@@ -0,0 +1,179 @@
+"""
+Random Markdown documents for differential testing of the renderers.
+
+random_document() strings together the constructs the Toast UI editor (and
+users pasting into it) produce: paragraphs with inline markup, nested lists,
+pipe and HTML tables (well-formed and broken), fenced and indented code,
+blockquotes, headings, references and raw HTML, with irregular blank lines,
+tabs and CRLF line endings. shrink() reduces a failing document to the lines
+that still make two implementations disagree.
+"""
+
+WORDS = ["club", "meeting", "robot", "a_b", "x < y", "&amp;", "2024", "|", "*"]
+INLINE = [
+    "*em*",
+    "**strong**",
+    "`code`",
+    "[link](https://example.com)",
+    "![img](a.png)",
+    "\\*escaped",
+    "trailing  ",
+    "`open tick",
+    "<b>bold</b>",
+]
+
+
+def _paragraph(rng):
+    lines = []
+    for _ in range(rng.randint(1, 3)):
+        words = rng.choices(WORDS + INLINE, k=rng.randint(1, 6))
+        lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+def _heading(rng):
+    if rng.random() < 0.5:
+        return "#" * rng.randint(1, 6) + " " + _paragraph(rng).split("\n")[0]
+    return "Title\n" + rng.choice(["===", "---", "==="])
+
+
+def _list(rng, depth=0):
+    lines = []
+    ordered = rng.random() < 0.4
+    for i in range(rng.randint(1, 4)):
+        marker = f"{i + 1}." if ordered else rng.choice("-*+")
+        text = _paragraph(rng).split("\n")[0]
+        lines.append("    " * depth + f"{marker} {text}")
+        if depth < 4 and rng.random() < 0.3:
+            lines.append(_list(rng, depth + 1))
+        if rng.random() < 0.2:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def _pipe_table(rng):
+    columns = rng.randint(1, 4)
+    rows = ["| " + " | ".join(f"h{c}" for c in range(columns)) + " |"]
+    if rng.random() < 0.6:
+        separators = rng.choices(["---", ":--", "==="], k=columns)
+        rows.append("|" + "|".join(separators) + "|")
+    for _ in range(rng.randint(0, 4)):
+        rows.append("| " + " | ".join(rng.choice(WORDS) for _ in range(columns)) + " |")
+    return "\n".join(rows)
+
+
+def _html_row(rng, tag, columns):
+    cells = "".join(
+        f"<{tag}>{rng.choice(WORDS + INLINE)}</{tag}>" for _ in range(columns)
+    )
+    return f"<tr>{cells}</tr>"
+
+
+def _html_table(rng):
+    columns = rng.randint(1, 3)
+    newline = rng.choice(["", "\n"])
+    parts = [rng.choice(["<table>", "<TABLE class='t'>", "<table border=1>"])]
+    if rng.random() < 0.5:
+        parts.append(f"<thead>{_html_row(rng, 'th', columns)}</thead>")
+    rows = "".join(
+        _html_row(rng, "td", columns) + newline for _ in range(rng.randint(0, 3))
+    )
+    parts.append(f"<tbody>{rows}</tbody>" if rng.random() < 0.5 else rows)
+    if rng.random() < 0.9:
+        parts.append(rng.choice(["</table>", "</TABLE>"]))
+    html = newline.join(parts)
+    if rng.random() < 0.2:  # broken markup: drop a random closing tag
+        html = html.replace(rng.choice(["</td>", "</tr>", "</th>", "</tbody>"]), "", 1)
+    return html
+
+
+def _fenced_code(rng):
+    fence = rng.choice(["```", "~~~", "````"])
+    info = rng.choice(["", "python", " js", "{.py}"])
+    body = rng.choices(
+        ["x = 1", "", "    indented", "<div>", "- not a list"], k=rng.randint(0, 4)
+    )
+    closing = [fence] if rng.random() < 0.85 else []
+    return "\n".join([fence + info, *body, *closing])
+
+
+def _indented_code(rng):
+    return "\n".join(
+        rng.choice(["    code line", "\tcode tab", "    ", "    x < y"])
+        for _ in range(rng.randint(1, 3))
+    )
+
+
+def _blockquote(rng):
+    return "\n".join(
+        rng.choice(["> ", ">", "  > "]) + _paragraph(rng).split("\n")[0]
+        for _ in range(rng.randint(1, 3))
+    )
+
+
+def _special(rng):
+    return rng.choice(
+        [
+            "---",
+            "***",
+            "[ref]: https://example.com",
+            "See [the site][ref].",
+            "Note[^1]\n\n[^1]: The footnote.",
+            "*[HTML]: Hyper Text Markup Language",
+            "Term\n:   Definition",
+            "<div>\nraw *html*\n</div>",
+            "<!-- comment -->",
+            "{: .note }",
+            "1986. A great year",
+        ]
+    )
+
+
+BLOCK_BUILDERS = [
+    (_paragraph, 6),
+    (_heading, 2),
+    (_list, 4),
+    (_pipe_table, 2),
+    (_html_table, 2),
+    (_fenced_code, 2),
+    (_indented_code, 1),
+    (_blockquote, 2),
+    (_special, 1),
+]
+SEPARATORS = ["\n", "\n\n", "\n\n", "\n\n\n", "\n  \n", "\n\t\n"]
+
+
+def random_document(rng, max_blocks=12):
+    """Return a random Markdown document built with the random.Random rng."""
+    builders, weights = zip(*BLOCK_BUILDERS)
+    blocks = [
+        rng.choices(builders, weights)[0](rng)
+        for _ in range(rng.randint(0, max_blocks))
+    ]
+    text = ""
+    for block in blocks:
+        text += block + rng.choice(SEPARATORS)
+    if rng.random() < 0.3:
+        text = text.replace("\n", "\r\n")
+    if rng.random() < 0.5:
+        text = text.rstrip()
+    return text
+
+
+def shrink(text, fails):
+    """
+    Return a shorter version of text for which fails(text) is still true,
+    by removing runs of lines, then single lines, while the failure remains.
+    """
+    lines = text.split("\n")
+    size = max(1, len(lines) // 2)
+    while size >= 1:
+        i = 0
+        while i < len(lines):
+            candidate = lines[:i] + lines[i + size :]
+            if candidate and fails("\n".join(candidate)):
+                lines = candidate
+            else:
+                i += size
+        size //= 2
+    return "\n".join(lines)
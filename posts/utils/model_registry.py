@@ -0,0 +1,297 @@
+"""
+Bounded registry of loaded summarization models.
+
+Each loaded model is kept with its tokenizer, its batching engine and an
+estimate of the memory it uses. Before a model loads, the least recently
+used models are evicted (their engines drain queued requests first) until
+its expected size fits within SUMMARIZER_MAX_MODEL_MEMORY_MB, so the old
+and new models are never resident together over the budget. The expected
+size is the model's size when it was last loaded, or
+SUMMARIZER_MODEL_MEMORY_MB for a model not loaded before. Models can be
+loaded in the background, so traffic moves to a newly selected model only
+once it is ready.
+
+Configuration (environment variables):
+    SUMMARIZER_MAX_MODEL_MEMORY_MB  Memory budget for loaded models (default: 4096)
+    SUMMARIZER_MODEL_MEMORY_MB      Expected size of a model not loaded before (default: 1600)
+"""
+
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .profiling import current_rss_mb
+
+logger = logging.getLogger(__name__)
+
+MAX_MODEL_MEMORY_MB = float(os.getenv("SUMMARIZER_MAX_MODEL_MEMORY_MB", "4096"))
+# About the size of bart-large-cnn in float32
+MODEL_MEMORY_MB = float(os.getenv("SUMMARIZER_MODEL_MEMORY_MB", "1600"))
+
+# A model that failed to load is not retried for this long
+RETRY_FAILED_SECONDS = 300
+
+
+def _tensor_bytes(value, seen):
+    """
+    Return the bytes held by a state_dict value (a tensor, or a tuple of them),
+    skipping tensors already counted in seen, such as tied embeddings.
+    """
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item, seen) for item in value)
+    try:
+        if value.data_ptr() in seen:
+            return 0
+        seen.add(value.data_ptr())
+        return value.numel() * value.element_size()
+    except Exception:
+        return 0
+
+
+def model_memory_mb(model, rss_delta_mb=None):
+    """
+    Estimate a model's memory from its state_dict, or from the RSS growth while
+    loading. Dynamically quantized Linear layers keep their int8 weights as
+    packed params in the state_dict, not in parameters(), so counting
+    parameters (or get_memory_footprint) misses most of such a model.
+    """
+    try:
+        seen = set()
+        total = sum(_tensor_bytes(value, seen) for value in model.state_dict().values())
+        if total:
+            return total / (1024 * 1024)
+    except Exception:
+        pass
+    return max(rss_delta_mb or 0.0, 0.0)
+
+
+class LoadedModel:
+    """A model loaded into the registry with its tokenizer and batching engine."""
+
+    __slots__ = ("name", "tokenizer", "model", "engine", "memory_mb", "last_used")
+
+    def __init__(self, name, tokenizer, model, engine, memory_mb):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.model = model
+        self.engine = engine
+        self.memory_mb = memory_mb
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    Load models on demand and keep the most recently used ones within a memory budget.
+
+    ``loader(name)`` returns ``(tokenizer, model)`` and ``engine_factory(name,
+    tokenizer, model)`` returns the BatchingEngine serving it.
+    """
+
+    def __init__(
+        self,
+        loader,
+        engine_factory,
+        max_memory_mb=MAX_MODEL_MEMORY_MB,
+        model_memory_mb=MODEL_MEMORY_MB,
+    ):
+        self.loader = loader
+        self.engine_factory = engine_factory
+        self.max_memory_mb = max_memory_mb
+        self.model_memory_mb = model_memory_mb
+
+        self._models = OrderedDict()  # least recently used first
+        self._sizes = {}  # name -> memory_mb measured when last loaded
+        self._reserved = {}  # name -> expected memory_mb of a load in progress
+        self._failed = {}  # name -> monotonic time of the failure
+        self._loading = set()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, name):
+        """Return the LoadedModel for name, loading it if needed, or None if it fails to load."""
+        entry = self.peek(name)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            if self._recently_failed(name):
+                return None
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # One load per model; loads of different models run in parallel
+        with load_lock:
+            entry = self.peek(name)
+            if entry is None and not self._recently_failed(name):
+                entry = self._load(name)
+        return entry
+
+    def peek(self, name):
+        """Return the LoadedModel for name if it is already loaded, without loading it."""
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                entry.last_used = time.monotonic()
+            return entry
+
+    def is_loaded(self, name):
+        with self._lock:
+            return name in self._models
+
+    def has_failed(self, name):
+        """Return True if the last load of name failed recently."""
+        with self._lock:
+            return self._recently_failed(name)
+
+    def load_async(self, name):
+        """Start loading name in a background thread unless it is loaded or loading."""
+        with self._lock:
+            if (
+                name in self._models
+                or name in self._loading
+                or self._recently_failed(name)
+            ):
+                return False
+            self._loading.add(name)
+
+        def load():
+            try:
+                self.get(name)
+            finally:
+                with self._lock:
+                    self._loading.discard(name)
+
+        threading.Thread(target=load, name=f"load-{name}", daemon=True).start()
+        return True
+
+    def evict(self, name):
+        """Unload a model. Its engine finishes queued requests before stopping."""
+        with self._lock:
+            entry = self._models.pop(name, None)
+        if entry is None:
+            return False
+        entry.engine.close()
+        logger.info(f"Evicted summarization model {name} ({entry.memory_mb:.0f} MB)")
+        return True
+
+    def engines(self):
+        """Return {model name: batching engine} for the loaded models."""
+        with self._lock:
+            return {name: entry.engine for name, entry in self._models.items()}
+
+    def stats(self):
+        """Return memory use and idle time for each loaded model."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "max_memory_mb": self.max_memory_mb,
+                "memory_mb": sum(entry.memory_mb for entry in self._models.values()),
+                "loading": sorted(self._loading),
+                "failed": sorted(self._failed),
+                "models": {
+                    name: {
+                        "memory_mb": entry.memory_mb,
+                        "idle_seconds": now - entry.last_used,
+                    }
+                    for name, entry in self._models.items()
+                },
+            }
+
+    def _recently_failed(self, name):
+        failed_at = self._failed.get(name)
+        return (
+            failed_at is not None
+            and time.monotonic() - failed_at < RETRY_FAILED_SECONDS
+        )
+
+    def _load(self, name):
+        """Make room for a model, load and register it, or return None if it cannot."""
+        if not self._make_room(name):
+            with self._lock:
+                self._failed[name] = time.monotonic()
+            return None
+        try:
+            entry = self._load_reserved(name)
+        finally:
+            with self._lock:
+                self._reserved.pop(name, None)
+        if entry is None:
+            return None
+
+        # The expected size may have been low
+        self._evict_over_budget(keep=name)
+        return entry
+
+    def _load_reserved(self, name):
+        """Load and register a model whose memory _make_room reserved."""
+        rss_before = current_rss_mb()
+        started = time.monotonic()
+        try:
+            tokenizer, model = self.loader(name)
+        except Exception as e:
+            logger.error(f"Failed to load model {name}: {e}", exc_info=True)
+            with self._lock:
+                self._failed[name] = time.monotonic()
+            return None
+
+        rss_after = current_rss_mb()
+        rss_delta = (
+            rss_after - rss_before if None not in (rss_before, rss_after) else None
+        )
+        entry = LoadedModel(
+            name,
+            tokenizer,
+            model,
+            self.engine_factory(name, tokenizer, model),
+            model_memory_mb(model, rss_delta),
+        )
+        with self._lock:
+            self._models[name] = entry
+            self._sizes[name] = entry.memory_mb
+            self._failed.pop(name, None)
+        logger.info(
+            f"Model {name} loaded in {time.monotonic() - started:.1f}s "
+            f"(~{entry.memory_mb:.0f} MB)"
+        )
+        return entry
+
+    def _make_room(self, name):
+        """
+        Evict least recently used models until name's expected size fits in the
+        budget, and reserve it. Returns False if it cannot fit even alone.
+        """
+        while True:
+            with self._lock:
+                expected = self._sizes.get(name, self.model_memory_mb)
+                total = sum(entry.memory_mb for entry in self._models.values())
+                total += sum(self._reserved.values())
+                if total + expected <= self.max_memory_mb:
+                    self._reserved[name] = expected
+                    return True
+                victim = next(iter(self._models), None)
+            if victim is None:
+                logger.error(
+                    f"Not loading model {name}: it needs ~{expected:.0f} MB and "
+                    f"{total:.0f} MB of the {self.max_memory_mb:.0f} MB budget "
+                    "is held by other loads"
+                )
+                return False
+            self.evict(victim)
+
+    def _evict_over_budget(self, keep):
+        """Evict least recently used models until the total fits, never evicting keep."""
+        while True:
+            with self._lock:
+                total = sum(entry.memory_mb for entry in self._models.values())
+                if total <= self.max_memory_mb:
+                    return
+                victim = next((name for name in self._models if name != keep), None)
+            if victim is None:
+                logger.warning(
+                    f"Model {keep} alone uses {total:.0f} MB, over the "
+                    f"{self.max_memory_mb:.0f} MB budget"
+                )
+                return
+            self.evict(victim)
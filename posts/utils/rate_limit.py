@@ -0,0 +1,62 @@
+"""
+Per-user sliding-window rate limiting for cheap, chatty endpoints.
+
+The editor's live preview posts the body after every typing pause. Each
+RateLimiter remembers the times of a user's recent requests in this process
+and refuses new ones once `limit` fall inside the window, reporting how long
+until the oldest one expires (the Retry-After).
+
+Configuration (environment variables):
+    MARKDOWN_PREVIEW_RATE_LIMIT           Previews per user per window (default: 30)
+    MARKDOWN_PREVIEW_RATE_WINDOW_SECONDS  Length of the window (default: 10)
+"""
+
+import os
+import math
+import threading
+import time
+from collections import deque
+
+PREVIEW_RATE_LIMIT = int(os.getenv("MARKDOWN_PREVIEW_RATE_LIMIT", "30"))
+PREVIEW_RATE_WINDOW_SECONDS = float(
+    os.getenv("MARKDOWN_PREVIEW_RATE_WINDOW_SECONDS", "10")
+)
+
+
+class RateLimiter:
+    """A thread-safe sliding-window limit of `limit` hits per key per window."""
+
+    def __init__(self, limit, window_seconds):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._hits = {}  # key -> deque of monotonic times, oldest first
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """
+        Record a request for key. Return 0 if it is allowed, otherwise the
+        whole seconds until the next one will be (nothing is recorded).
+        """
+        if self.limit <= 0:
+            return 0
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
+        with self._lock:
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= cutoff:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return max(1, math.ceil(hits[0] - cutoff))
+            hits.append(now)
+            self._forget_idle(cutoff)
+        return 0
+
+    def _forget_idle(self, cutoff):
+        # Keep memory bounded by users seen recently; called with the lock held
+        if len(self._hits) <= 1024:
+            return
+        for key in [key for key, hits in self._hits.items() if hits[-1] <= cutoff]:
+            del self._hits[key]
+
+
+preview_limiter = RateLimiter(PREVIEW_RATE_LIMIT, PREVIEW_RATE_WINDOW_SECONDS)
@@ -0,0 +1,94 @@
+"""
+Process-local LRU cache for rendered Markdown.
+
+Renders that are not persisted (previews, summaries, ad-hoc descriptions) go
+through the markdown filter on every page view. RenderCache keeps the most
+recently used results keyed by a hash of the source text, so the same text is
+parsed once per process while it stays popular.
+
+Configuration (environment variables):
+    MARKDOWN_RENDER_CACHE_SIZE       Entries kept per process (default: 512;
+                                     0 disables the cache)
+    MARKDOWN_RENDER_CACHE_MAX_CHARS  Longer texts are rendered but not cached
+                                     (default: 200000)
+    MARKDOWN_BLOCK_CACHE_SIZE        Top-level blocks kept per process for
+                                     incremental rendering (default: 4096)
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+RENDER_CACHE_SIZE = int(os.getenv("MARKDOWN_RENDER_CACHE_SIZE", "512"))
+RENDER_CACHE_MAX_CHARS = int(os.getenv("MARKDOWN_RENDER_CACHE_MAX_CHARS", "200000"))
+BLOCK_CACHE_SIZE = int(os.getenv("MARKDOWN_BLOCK_CACHE_SIZE", "4096"))
+
+
+def content_key(text, namespace=""):
+    """Return a hash of text (and a namespace such as a renderer version)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """A thread-safe, bounded LRU of rendered output with hit and miss counters."""
+
+    def __init__(
+        self, max_entries=RENDER_CACHE_SIZE, max_chars=RENDER_CACHE_MAX_CHARS
+    ):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_render(self, text, render, namespace=""):
+        """Return the cached output for text, calling render(text) on a miss."""
+        if self.max_entries <= 0 or len(text) > self.max_chars:
+            with self._lock:
+                self._misses += 1
+            return render(text)
+
+        key = content_key(text, namespace)
+        with self._lock:
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return output
+            self._misses += 1
+
+        # Render outside the lock; concurrent misses on one key both render
+        output = render(text)
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return output
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self):
+        """Return the entry count, hits, misses, evictions and hit rate."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
@@ -3,12 +3,50 @@ Text summarization utility using Hugging Face transformers.
 
 Using sshleifer/distilbart-cnn-12-6 - Good quality, faster, lower memory usage.
 Model is pre-downloaded during Docker build, so no runtime downloads needed.
+Requests are routed through a per-model BatchingEngine (see batching.py) so
+concurrent summarizations share a single generate call.
+
+The model is loaded with the backend selected by SUMMARIZER_BACKEND
+(fp32 PyTorch, int8-quantized PyTorch or ONNX Runtime; see backends.py).
+Loaded models live in a memory-bounded LRU registry (see model_registry.py),
+so clubs can use different models (Club.summarizer_model). Generate calls
+are throttled per process and per host by the CPU governor (see governor.py).
+
+When SUMMARIZER_SERVER_ADDRESS is set, this process does not load the model
+and forwards summarizations to the run_summarizer_server process instead
+(see inference_server.py).
+
+Long posts are summarized map-reduce style: the body is split into
+token-budgeted chunks (see chunking.py), the chunks are summarized a batch at
+a time and the concatenated partial summaries are summarized again.
+
+choose_tier picks between the abstractive model and the extractive TextRank
+summarizer (see extractive.py) from post length, model readiness and queue
+depth, so readers get a summary in milliseconds while the model is warming up
+or overloaded.
 """
 
 import os
+import hashlib
+import json
 import logging
 import threading
 
+from .backends import BACKEND, load_model
+from .batching import BATCH_SIZE, REQUEST_TIMEOUT, BatchingEngine
+from .chunking import split_into_chunks, token_budget
+from .extractive import extractive_summary
+from .governor import configure_torch_threads, inference_slot, lower_thread_priority
+from .inference_server import (
+    SERVER_ADDRESS,
+    SummarizerUnavailable,
+    is_server_available,
+    remote_load_model,
+    remote_stream_summary,
+    remote_summarize_many,
+)
+from .model_registry import ModelRegistry
+
 os.environ.setdefault("GIT_PYTHON_REFRESH", "quiet")
 
 # Set Hugging Face cache directory if not already set
@@ -19,42 +57,156 @@ logger = logging.getLogger(__name__)
 # Default model
 DEFAULT_MODEL = os.getenv("HF_SUMMARIZATION_MODEL", "sshleifer/distilbart-cnn-12-6")
 
-# Hugging Face summarizers (cached per model)
-_hf_summarizers = {}
-_hf_lock = threading.Lock()
+# Long-document mode: summarize the whole body in token-budgeted chunks
+# instead of truncating it to the first few paragraphs
+LONG_DOCUMENTS = os.getenv("SUMMARIZER_LONG_DOCUMENTS", "true").lower() == "true"
+CHUNK_TOKENS = int(os.getenv("SUMMARIZER_CHUNK_TOKENS", "512"))
+MAX_REDUCE_ROUNDS = 3
+
+# Stream summaries to the post page token by token instead of blocking
+STREAMING = os.getenv("SUMMARIZER_STREAMING", "true").lower() == "true"
+
+# Summary tiers, cheapest first
+TIER_ORIGINAL = "original"
+TIER_EXTRACTIVE = "extractive"
+TIER_ABSTRACTIVE = "abstractive"
+
+# Serve extractive summaries while the model is unavailable or its queue
+# (plus the chunks this post would add) is deeper than this
+EXTRACTIVE_TIER = os.getenv("SUMMARIZER_EXTRACTIVE_TIER", "true").lower() == "true"
+EXTRACTIVE_QUEUE_DEPTH = int(os.getenv("SUMMARIZER_EXTRACTIVE_QUEUE_DEPTH", "16"))
+
+# Posts shorter than this are their own summary
+MIN_SUMMARY_CHARS = 50
+
+
+def _load(model_name):
+    configure_torch_threads()
+    logger.info(f"Loading Hugging Face model: {model_name} ({BACKEND} backend)")
+    # Model should already be cached from Docker build
+    return load_model(model_name)
+
+
+def _create_engine(model_name, tokenizer, model):
+    return BatchingEngine(tokenizer, model, name=model_name, slot=inference_slot)
+
+
+# Loaded models and their batching engines, bounded by SUMMARIZER_MAX_MODEL_MEMORY_MB
+registry = ModelRegistry(_load, _create_engine)
 
 
 def get_hf_summarizer(model_name=None):
-    """Get or initialize the Hugging Face summarization pipeline."""
-    global _hf_summarizers
+    """Get or load a Hugging Face model. Returns {"tokenizer", "model"}, or False if it fails to load."""
     if model_name is None:
         model_name = DEFAULT_MODEL
 
-    if model_name not in _hf_summarizers:
-        with _hf_lock:
-            # Double-check pattern to avoid race conditions
-            if model_name not in _hf_summarizers:
-                try:
-                    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-
-                    logger.info(f"Loading Hugging Face model: {model_name}")
-
-                    # Model should already be cached from Docker build
-                    tokenizer = AutoTokenizer.from_pretrained(model_name)
-                    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-
-                    _hf_summarizers[model_name] = {
-                        "tokenizer": tokenizer,
-                        "model": model,
-                    }
-                    logger.info(f"Model {model_name} loaded successfully")
-                except Exception as e:
-                    logger.error(
-                        f"Failed to load model {model_name}: {e}", exc_info=True
-                    )
-                    _hf_summarizers[model_name] = False
+    entry = registry.get(model_name)
+    if entry is None:
+        return False
+    return {"tokenizer": entry.tokenizer, "model": entry.model}
+
+
+def get_batching_engine(model_name=None):
+    """Get the batching engine for a model, loading it if needed, or None if unavailable."""
+    if model_name is None:
+        model_name = DEFAULT_MODEL
+
+    entry = registry.get(model_name)
+    return entry.engine if entry is not None else None
+
+
+def get_batching_stats():
+    """Return batching statistics (wait times, batch sizes) for each loaded model."""
+    return {name: engine.stats() for name, engine in registry.engines().items()}
+
+
+def is_model_ready(model_name=None):
+    """
+    Return True if the model can summarize right now without loading first.
+    Starts a background load the first time an unloaded model is asked about.
+    """
+    if model_name is None:
+        model_name = DEFAULT_MODEL
+
+    if SERVER_ADDRESS:
+        return is_server_available()
+
+    if registry.is_loaded(model_name):
+        return True
+    registry.load_async(model_name)
+    return False
+
+
+def load_model_async(model_name):
+    """
+    Start loading a model in the background, here or on the summarizer server.
+    Returns False if the server could not be reached.
+    """
+    if SERVER_ADDRESS:
+        try:
+            remote_load_model(model_name, wait=False)
+        except SummarizerUnavailable as e:
+            logger.warning(f"{e}")
+            return False
+        return True
+    registry.load_async(model_name)
+    return True
+
+
+def _estimated_requests(text, batch_size=BATCH_SIZE):
+    """Estimate how many generate inputs a text has queued at once."""
+    if not LONG_DOCUMENTS:
+        return 1
+    # Roughly four characters per token; map-reduce adds one final pass
+    chunks = len(text) // (CHUNK_TOKENS * 4) + 1
+    requests = chunks + 1 if chunks > 1 else 1
+    # Chunks are submitted a batch at a time (see _submit)
+    return min(requests, batch_size)
+
+
+def choose_tier(text, model_name=None):
+    """
+    Pick the summary tier for text.
 
-    return _hf_summarizers.get(model_name)
+    Returns TIER_ORIGINAL for posts too short to summarize, TIER_EXTRACTIVE
+    while the model is loading, has failed or is too busy to take the post's
+    chunks, and TIER_ABSTRACTIVE otherwise.
+    """
+    if model_name is None:
+        model_name = DEFAULT_MODEL
+
+    if not text or len(text.strip()) < MIN_SUMMARY_CHARS:
+        return TIER_ORIGINAL
+    if not EXTRACTIVE_TIER:
+        return TIER_ABSTRACTIVE
+    if not is_model_ready(model_name):
+        return TIER_EXTRACTIVE
+
+    # The server's queue is not visible from here; it sheds load itself
+    entry = registry.peek(model_name)
+    if entry is None:
+        return TIER_ABSTRACTIVE
+    # An idle engine takes a post of any length; only a backlog sheds to extractive
+    queued = entry.engine.queue_depth()
+    if (
+        queued
+        and queued + _estimated_requests(text, entry.engine.batch_size)
+        > EXTRACTIVE_QUEUE_DEPTH
+    ):
+        return TIER_EXTRACTIVE
+    return TIER_ABSTRACTIVE
+
+
+def fallback_summary(text):
+    """Return an extractive summary of text, or its first 300 characters."""
+    try:
+        summary = extractive_summary(text)
+    except Exception as e:
+        logger.error(f"Extractive summarization failed: {e}", exc_info=True)
+        summary = None
+    if summary:
+        return summary
+    return text[:300] + "..." if len(text) > 300 else text
 
 
 def preload_summarizer():
@@ -70,7 +222,65 @@ def preload_summarizer():
         logger.error(f"Failed to preload summarization model: {e}", exc_info=True)
 
 
-def summarize_with_hf(text, max_length=300, min_length=50, model_name=None):
+def _generation_settings(model_name, max_length, min_length, num_beams=None):
+    """
+    Return (max_input_chars, generate kwargs) for a model.
+    num_beams=1 selects greedy decoding, e.g. when shedding load.
+    """
+    # BART models have restrictive limits
+    if "bart" in model_name.lower():
+        max_input_length = 1500
+        effective_max_length = min(max_length, 142)
+        effective_min_length = min(min_length, 56)
+    else:
+        max_input_length = 4000
+        effective_max_length = max_length
+        effective_min_length = min_length
+
+    if num_beams == 1:
+        return max_input_length, {
+            "max_length": effective_max_length,
+            "min_length": effective_min_length,
+            "num_beams": 1,
+        }
+    return max_input_length, {
+        "max_length": effective_max_length,
+        "min_length": effective_min_length,
+        "num_beams": num_beams or 4,
+        "length_penalty": 2.0,
+        "early_stopping": True,
+    }
+
+
+def summary_cache_key(
+    text, max_length=300, min_length=50, model_name=None, num_beams=None
+):
+    """
+    Return the cache key for a summary of text.
+
+    The key is a SHA-256 hash of the whitespace-normalized text, the model name
+    and the generation parameters, so any change that could alter the output
+    produces a new key while reformatting-only edits keep the old one. Pass
+    num_beams=1 for a greedy summary (streamed, or generated under load).
+    """
+    if model_name is None:
+        model_name = DEFAULT_MODEL
+
+    max_input_length, params = _generation_settings(
+        model_name, max_length, min_length, num_beams
+    )
+    if LONG_DOCUMENTS:
+        max_input_length = f"chunked:{CHUNK_TOKENS}"
+    normalized = " ".join((text or "").split())
+    payload = json.dumps(
+        [normalized, model_name, max_input_length, params], sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def summarize_with_hf(
+    text, max_length=300, min_length=50, model_name=None, metrics=None, num_beams=None
+):
     """
     Summarize text using Hugging Face transformers.
 
@@ -79,71 +289,365 @@ def summarize_with_hf(text, max_length=300, min_length=50, model_name=None):
         max_length: Maximum length of the summary in tokens (default: 300)
         min_length: Minimum length of the summary in tokens (default: 50)
         model_name: Model to use (default: DEFAULT_MODEL)
+        metrics: Optional list; a dict of token counts and timings is appended
+        num_beams: Beam count override; 1 for greedy decoding (default: 4)
 
     Returns:
         str: Summarized text, or None if summarization fails
     """
+    return summarize_many_with_hf(
+        [text], max_length, min_length, model_name, metrics=metrics, num_beams=num_beams
+    )[0]
+
+
+def summarize_many_with_hf(
+    texts, max_length=300, min_length=50, model_name=None, metrics=None, num_beams=None
+):
+    """
+    Summarize several texts together so they can share generate calls.
+
+    Args:
+        texts: The texts to summarize
+        max_length: Maximum length of each summary in tokens (default: 300)
+        min_length: Minimum length of each summary in tokens (default: 50)
+        model_name: Model to use (default: DEFAULT_MODEL)
+        metrics: Optional list; one dict of token counts and timings
+            (see new_metrics) is appended per text
+        num_beams: Beam count override; 1 for greedy decoding (default: 4)
+
+    Returns:
+        list: One summary per text, with None where summarization failed
+    """
+    if SERVER_ADDRESS:
+        try:
+            return remote_summarize_many(
+                texts,
+                max_length,
+                min_length,
+                model_name,
+                metrics=metrics,
+                num_beams=num_beams,
+            )
+        except SummarizerUnavailable as e:
+            logger.warning(f"{e}")
+            if metrics is not None:
+                metrics.extend(new_metrics() for _ in texts)
+            return [None] * len(texts)
+
+    return summarize_many_locally(
+        texts, max_length, min_length, model_name, metrics=metrics, num_beams=num_beams
+    )
+
+
+def summarize_many_by_model(
+    texts, model_names, max_length=300, min_length=50, metrics=None
+):
+    """
+    Summarize texts that may use different models (e.g. posts of several clubs).
+    Texts sharing a model are summarized together; results keep the input order.
+    """
+    results = [None] * len(texts)
+    text_metrics = [None] * len(texts)
+    groups = {}
+    for i, model_name in enumerate(model_names):
+        groups.setdefault(model_name or DEFAULT_MODEL, []).append(i)
+
+    for model_name, indexes in groups.items():
+        group_metrics = []
+        summaries = summarize_many_with_hf(
+            [texts[i] for i in indexes],
+            max_length,
+            min_length,
+            model_name,
+            metrics=group_metrics,
+        )
+        for i, summary, entry in zip(indexes, summaries, group_metrics):
+            results[i] = summary
+            text_metrics[i] = entry
+
+    if metrics is not None:
+        metrics.extend(text_metrics)
+    return results
+
+
+def summarize_with_metrics(texts, model_names, max_length=300, min_length=50):
+    """summarize_many_by_model returning (summaries, metrics), e.g. from another process."""
+    metrics = []
+    summaries = summarize_many_by_model(
+        texts, model_names, max_length, min_length, metrics=metrics
+    )
+    return summaries, metrics
+
+
+def new_metrics():
+    """Return an empty per-text metrics dict (token counts, milliseconds)."""
+    return {
+        "input_tokens": None,
+        "output_tokens": None,
+        "chunks": 0,
+        "queue_wait_ms": None,
+        "generate_ms": None,
+    }
+
+
+def _add_round(entry, request_metrics):
+    """
+    Add one engine submission for a text to its metrics.
+    Chunks of a round are batched together, so the round costs its slowest chunk.
+    """
+    waits = [
+        m["wait_seconds"] for m in request_metrics if m["wait_seconds"] is not None
+    ]
+    generates = [
+        m["generate_seconds"]
+        for m in request_metrics
+        if m["generate_seconds"] is not None
+    ]
+    if waits:
+        entry["queue_wait_ms"] = (entry["queue_wait_ms"] or 0.0) + max(waits) * 1000
+    if generates:
+        entry["generate_ms"] = (entry["generate_ms"] or 0.0) + max(generates) * 1000
+    if entry["chunks"] == 0:
+        tokens = [m["input_tokens"] for m in request_metrics]
+        entry["input_tokens"] = None if None in tokens else sum(tokens)
+    outputs = [m["output_tokens"] for m in request_metrics]
+    entry["output_tokens"] = None if None in outputs else sum(outputs)
+    entry["chunks"] += len(request_metrics)
+
+
+def summarize_many_locally(
+    texts, max_length=300, min_length=50, model_name=None, metrics=None, num_beams=None
+):
+    """Summarize texts with a model loaded in this process (see summarize_many_with_hf)."""
     if model_name is None:
         model_name = DEFAULT_MODEL
 
+    results = [None] * len(texts)
+    text_metrics = [new_metrics() for _ in texts]
+    if metrics is not None:
+        metrics.extend(text_metrics)
     try:
-        # BART models have restrictive limits
-        if "bart" in model_name.lower():
-            max_input_length = 1500
-            effective_max_length = min(max_length, 142)
-            effective_min_length = min(min_length, 56)
-        else:
-            max_input_length = 4000
-            effective_max_length = max_length
-            effective_min_length = min_length
-
-        # Truncate long inputs
-        if len(text) > max_input_length:
-            logger.debug(
-                f"Truncating input from {len(text)} to {max_input_length} characters"
-            )
-            text = text[:max_input_length]
+        max_input_length, params = _generation_settings(
+            model_name, max_length, min_length, num_beams
+        )
 
-        # Load model
-        summarizer = get_hf_summarizer(model_name)
-        if summarizer is False or summarizer is None:
+        # Load model and its batching engine
+        engine = get_batching_engine(model_name)
+        if engine is None:
             logger.warning(f"Summarizer for {model_name} is not available")
-            return None
-
-        tokenizer = summarizer["tokenizer"]
-        model = summarizer["model"]
-
-        # Tokenize input
-        inputs = tokenizer(text, return_tensors="pt", max_length=1024, truncation=True)
-
-        # Generate summary
-        summary_ids = model.generate(
-            inputs["input_ids"],
-            max_length=effective_max_length,
-            min_length=effective_min_length,
-            num_beams=4,
-            length_penalty=2.0,
-            early_stopping=True,
-        )
+            return results
 
-        # Decode summary
-        summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        if LONG_DOCUMENTS:
+            summaries = _map_reduce(engine, texts, params, text_metrics)
+        else:
+            # Truncate long inputs
+            inputs = []
+            for text in texts:
+                if len(text) > max_input_length:
+                    logger.debug(
+                        f"Truncating input from {len(text)} to {max_input_length} characters"
+                    )
+                    text = text[:max_input_length]
+                inputs.append(text)
 
-        if summary:
-            summary = summary.strip()
-            logger.debug(f"Summary generated, length: {len(summary)} characters")
-            return summary
+            # Queue for the next batch; concurrent requests share one generate call
+            request_metrics = []
+            summaries = _submit(engine, inputs, params, request_metrics)
+            for entry, request in zip(text_metrics, request_metrics):
+                _add_round(entry, [request])
+
+        for i, summary in enumerate(summaries):
+            if summary and summary.strip():
+                results[i] = summary.strip()
+                logger.debug(f"Summary generated, length: {len(results[i])} characters")
 
     except Exception as e:
         logger.error(f"Hugging Face summarization failed: {e}", exc_info=True)
         logger.debug(f"Error details: {type(e).__name__}: {e}")
 
-    return None
+    return results
+
+
+def _submit(engine, texts, params, metrics=None):
+    """
+    Summarize texts on the engine a batch at a time, so a post with more
+    chunks than the engine's queue holds is never rejected as a whole.
+    """
+    summaries = []
+    for start in range(0, len(texts), engine.batch_size):
+        summaries += engine.submit_many(
+            texts[start : start + engine.batch_size], metrics=metrics, **params
+        )
+    return summaries
+
+
+def _map_reduce(engine, texts, params, text_metrics=None):
+    """
+    Summarize texts of any length with bounded per-call input size.
+
+    Each round splits every unfinished text into token-budgeted chunks and
+    summarizes all chunks of all texts in batch-sized submissions. A text that
+    fit in a single chunk is done; otherwise its partial summaries are joined
+    and summarized again in the next round. Per-text metrics are added to
+    text_metrics if given.
+    """
+    tokenizer = engine.tokenizer
+    text_metrics = text_metrics or [new_metrics() for _ in texts]
+    budget = token_budget(tokenizer, CHUNK_TOKENS)
+
+    current = list(texts)
+    summaries = [None] * len(texts)
+    active = list(range(len(texts)))
+
+    for round_number in range(MAX_REDUCE_ROUNDS):
+        chunked = {i: split_into_chunks(tokenizer, current[i], budget) for i in active}
+        flat = [chunk for i in active for chunk in chunked[i]]
+        if round_number or len(flat) > len(active):
+            logger.debug(
+                f"Map-reduce round {round_number + 1}: "
+                f"{len(active)} texts in {len(flat)} chunks"
+            )
+        request_metrics = []
+        outputs = iter(_submit(engine, flat, params, request_metrics))
+        round_metrics = iter(request_metrics)
+
+        still_active = []
+        for i in active:
+            partials = [next(outputs).strip() for _ in chunked[i]]
+            _add_round(text_metrics[i], [next(round_metrics) for _ in chunked[i]])
+            if len(partials) == 1:
+                summaries[i] = partials[0]
+            else:
+                current[i] = "\n".join(partials)
+                still_active.append(i)
+        active = still_active
+        if not active:
+            return summaries
+
+    # Partial summaries still exceed the budget; the engine truncates by tokens
+    request_metrics = []
+    final = _submit(engine, [current[i] for i in active], params, request_metrics)
+    for i, summary, request in zip(active, final, request_metrics):
+        summaries[i] = summary
+        _add_round(text_metrics[i], [request])
+    return summaries
+
+
+def _condense(engine, text, params):
+    """Map-reduce text until it fits in a single chunk, returning that chunk."""
+    budget = token_budget(engine.tokenizer, CHUNK_TOKENS)
+    for _ in range(MAX_REDUCE_ROUNDS):
+        chunks = split_into_chunks(engine.tokenizer, text, budget)
+        if len(chunks) == 1:
+            return chunks[0]
+        partials = _submit(engine, chunks, params)
+        text = "\n".join(partial.strip() for partial in partials)
+    return text
+
+
+def stream_summary(text, max_length=300, min_length=50, model_name=None):
+    """
+    Yield pieces of the summary as they are generated.
+
+    Streaming needs greedy decoding, so the final pass uses num_beams=1; long
+    posts are first condensed with the regular batched map phase. Raises on
+    failure so the caller can fall back.
+    """
+    if SERVER_ADDRESS:
+        yield from remote_stream_summary(text, max_length, min_length, model_name)
+        return
+
+    yield from stream_summary_locally(text, max_length, min_length, model_name)
+
+
+def stream_summary_locally(text, max_length=300, min_length=50, model_name=None):
+    """
+    Stream a summary from a model loaded in this process (see stream_summary).
+    Closing the generator (e.g. the reader disconnected) stops generation.
+    """
+    from transformers import (
+        StoppingCriteria,
+        StoppingCriteriaList,
+        TextIteratorStreamer,
+    )
+
+    if model_name is None:
+        model_name = DEFAULT_MODEL
+
+    engine = get_batching_engine(model_name)
+    if engine is None:
+        raise SummarizerUnavailable(f"Summarizer for {model_name} is not available")
+
+    max_input_length, params = _generation_settings(model_name, max_length, min_length)
+    if LONG_DOCUMENTS:
+        text = _condense(engine, text, params)
+    else:
+        text = text[:max_input_length]
+
+    greedy_params = {
+        "max_length": params["max_length"],
+        "min_length": params["min_length"],
+        "num_beams": 1,
+    }
+
+    tokenizer = engine.tokenizer
+    inputs = tokenizer(
+        text,
+        return_tensors="pt",
+        truncation=True,
+        max_length=engine.max_input_tokens,
+    )
+    # Longer than inference_slot waits, so the first token can still come after
+    # a slot wait of up to REQUEST_TIMEOUT; a slot timeout ends the stream itself
+    streamer = TextIteratorStreamer(
+        tokenizer, skip_special_tokens=True, timeout=2 * REQUEST_TIMEOUT
+    )
+    errors = []
+    stop = threading.Event()
+
+    class StopWhenClosed(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return stop.is_set()
+
+    def generate():
+        lower_thread_priority()
+        try:
+            with inference_slot(REQUEST_TIMEOUT):
+                if stop.is_set():
+                    # Nobody is reading any more; give the slot back unused
+                    streamer.end()
+                    return
+                engine.model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([StopWhenClosed()]),
+                    **greedy_params,
+                )
+        except Exception as e:
+            errors.append(e)
+            # Unblock the consumer loop below
+            streamer.end()
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+    try:
+        for piece in streamer:
+            if piece:
+                yield piece
+    finally:
+        # Stops generate() at its next token (or before it starts) if the
+        # consumer went away or the streamer timed out
+        stop.set()
+    thread.join()
+
+    if errors:
+        raise errors[0]
 
 
 def summarize_text(text, max_length=300, min_length=50):
     """
-    Summarize text using Hugging Face transformers.
+    Summarize text with the tier chosen by choose_tier.
 
     Args:
         text: The text to summarize
@@ -151,17 +655,17 @@ def summarize_text(text, max_length=300, min_length=50):
         min_length: Minimum length of the summary in tokens (default: 50)
 
     Returns:
-        str: Summarized text, or truncated text if summarization fails
+        str: Summarized text, or an extractive summary if the model is
+        unavailable, busy or fails
     """
-    if not text or len(text.strip()) < 50:
+    tier = choose_tier(text)
+    if tier == TIER_ORIGINAL:
         return text
 
-    # Try Hugging Face summarizer
-    summary = summarize_with_hf(text, max_length, min_length)
-
-    if summary:
-        return summary
+    if tier == TIER_ABSTRACTIVE:
+        summary = summarize_with_hf(text, max_length, min_length)
+        if summary:
+            return summary
+        logger.warning("Summarization failed, returning extractive summary")
 
-    # Fallback: return truncated text
-    logger.warning("Summarization failed, returning truncated text")
-    return text[:300] + "..." if len(text) > 300 else text
+    return fallback_summary(text)
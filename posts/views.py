@@ -1,16 +1,84 @@
+import time
+from contextlib import closing
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.cache import cache_control
 
 from clubs.models import Club
 from memberships.decorators import club_member_required
 from memberships.helpers import get_membership, is_club_moderator
-from .models import Post, PostType, Like, Comment, Bookmark
+from .models import (
+    LIST_DEFERRED_FIELDS,
+    Post,
+    PostType,
+    Like,
+    Comment,
+    Bookmark,
+    SummaryOrigin,
+    SummarySource,
+)
 from .forms import BlogPostForm, NewsPostForm
-from .utils.summarizer import summarize_text
+from .digest import (
+    DIGEST_MIN_COMMENTS,
+    flag_digest,
+    forget_comment,
+    get_digest,
+    note_new_comment,
+    refresh_digest,
+)
+from .pagination import decode_cursor, keyset_page
+from .jobs import enqueue_summary_job, ensure_summary, refresh_summary_after_edit
+from .single_flight import begin_flight, is_in_flight, wait_for_flight
+from .telemetry import record_run
+from .summary_cache import (
+    get_cached_summary,
+    store_summary,
+    summary_key_for,
+    summary_model_for,
+)
+from .templatetags.markdown_extras import (
+    MARKDOWN_RENDERER_VERSION,
+    render_markdown_blocks,
+)
+from .utils.load_shedding import (
+    LEVEL_FALLBACK,
+    LEVEL_GREEDY,
+    LEVEL_SHED,
+    RETRY_AFTER_SECONDS,
+    shedder,
+)
+from .utils.rate_limit import preview_limiter
+from .utils.render_cache import content_key
+from .utils.summarizer import (
+    STREAMING,
+    TIER_ABSTRACTIVE,
+    TIER_EXTRACTIVE,
+    TIER_ORIGINAL,
+    choose_tier,
+    fallback_summary,
+    stream_summary,
+    summarize_with_hf,
+)
+
+
+# Comments rendered on the post page unless the reader asks for all of them;
+# longer threads are summarized by the discussion digest
+RECENT_COMMENTS = 50
+
+# Posts per page of the news and blog lists; later pages load as the reader scrolls
+POSTS_PER_PAGE = 20
+
+# The last editor preview is kept in the session so an unchanged body is not
+# rendered again; longer bodies are rendered each time (block cache still helps)
+PREVIEW_SESSION_KEY = "post_preview"
+PREVIEW_SESSION_MAX_CHARS = 50000
 
 
 def post_detail(request, slug, post_id):
@@ -26,7 +94,12 @@ def post_detail(request, slug, post_id):
     is_bookmarked = False
     if request.user.is_authenticated:
         is_bookmarked = Bookmark.objects.filter(post=post, user=request.user).exists()
+    comment_count = post.comment_count
+    digest = get_digest(post) if comment_count >= DIGEST_MIN_COMMENTS else None
     comments = post.comments.select_related("user").all()
+    show_all_comments = request.GET.get("comments") == "all"
+    if not show_all_comments and comment_count > RECENT_COMMENTS:
+        comments = list(reversed(comments.order_by("-created_at")[:RECENT_COMMENTS]))
 
     return render(
         request,
@@ -41,81 +114,80 @@ def post_detail(request, slug, post_id):
             "is_bookmarked": is_bookmarked,
             "like_count": post.like_count,
             "comments": comments,
-            "comment_count": post.comment_count,
+            "comment_count": comment_count,
+            "comments_truncated": len(comments) < comment_count,
+            "digest": digest,
+            "digest_min_comments": DIGEST_MIN_COMMENTS,
         },
     )
 
 
 @club_member_required
 def news_list(request, slug):
-    """List all news posts for a club - members only."""
-    club = get_object_or_404(Club, slug=slug)
-    membership = get_membership(request.user, club)
-    can_create_news = is_club_moderator(request.user, club)
-
-    news_posts = Post.objects.filter(
-        club=club,
-        post_type=PostType.NEWS,
-        is_published=True,
-    ).order_by("-created_at")
-
-    # Get user's liked post IDs for efficient template rendering
-    user_liked_post_ids = set()
-    if request.user.is_authenticated:
-        user_liked_post_ids = set(
-            Like.objects.filter(user=request.user, post__in=news_posts).values_list(
-                "post_id", flat=True
-            )
-        )
-
-    return render(
-        request,
-        "posts/post_list.html",
-        {
-            "club": club,
-            "posts": news_posts,
-            "list_type": "news",
-            "membership": membership,
-            "can_create_news": can_create_news,
-            "user_liked_post_ids": user_liked_post_ids,
-        },
-    )
+    """List news posts for a club, a page at a time - members only."""
+    return _post_list(request, slug, PostType.NEWS, "news")
 
 
 @club_member_required
 def blog_list(request, slug):
-    """List all blog posts for a club - members only."""
+    """List blog posts for a club, a page at a time - members only."""
+    return _post_list(request, slug, PostType.BLOG, "blog")
+
+
+def _post_list(request, slug, post_type, list_type):
+    """
+    Render one keyset page of a club's posts of post_type. HTMX "load more"
+    requests (with ?cursor=) get only the next page's cards to append.
+    """
     club = get_object_or_404(Club, slug=slug)
     membership = get_membership(request.user, club)
     can_create_news = is_club_moderator(request.user, club)
 
-    blog_posts = Post.objects.filter(
+    cursor = request.GET.get("cursor")
+    position = decode_cursor(cursor) if cursor else None
+    if cursor and position is None:
+        if request.headers.get("HX-Request"):
+            # Appending the first page again would repeat posts; end the list
+            return HttpResponse("")
+        # A full page load with a malformed cursor shows the first page
+        cursor = None
+
+    club_posts = Post.objects.filter(
         club=club,
-        post_type=PostType.BLOG,
+        post_type=post_type,
         is_published=True,
-    ).order_by("-created_at")
+    )
+    posts, next_cursor = keyset_page(
+        club_posts.defer(*LIST_DEFERRED_FIELDS)
+        .select_related("author")
+        .prefetch_related("author__socialaccount_set"),
+        position,
+        POSTS_PER_PAGE,
+    )
 
-    # Get user's liked post IDs for efficient template rendering
+    # Liked state for just the posts on this page
     user_liked_post_ids = set()
-    if request.user.is_authenticated:
+    if request.user.is_authenticated and posts:
         user_liked_post_ids = set(
-            Like.objects.filter(user=request.user, post__in=blog_posts).values_list(
-                "post_id", flat=True
-            )
+            Like.objects.filter(
+                user=request.user, post_id__in=[post.id for post in posts]
+            ).values_list("post_id", flat=True)
         )
 
-    return render(
-        request,
-        "posts/post_list.html",
-        {
-            "club": club,
-            "posts": blog_posts,
-            "list_type": "blog",
-            "membership": membership,
-            "can_create_news": can_create_news,
-            "user_liked_post_ids": user_liked_post_ids,
-        },
-    )
+    context = {
+        "club": club,
+        "posts": posts,
+        "next_cursor": next_cursor,
+        "list_type": list_type,
+        "membership": membership,
+        "can_create_news": can_create_news,
+        "user_liked_post_ids": user_liked_post_ids,
+    }
+    if cursor and request.headers.get("HX-Request"):
+        return render(request, "posts/partials/post_list_page.html", context)
+
+    context["post_count"] = club_posts.count()
+    return render(request, "posts/post_list.html", context)
 
 
 @club_member_required
@@ -189,52 +261,10 @@ def create_post(request, slug):
 
             post.save()
 
-            # Auto-summarize the post after creation (non-blocking - runs in background)
+            # Reuse a cached summary of the same body, or queue the post for
+            # auto-summarization by run_summarizer_worker
             # If user clicks "AI Summarize" before this completes, summarize_post view will handle it
-            try:
-                import logging
-                import threading
-
-                logger = logging.getLogger(__name__)
-
-                def generate_summary_async():
-                    """Generate summary in background thread."""
-                    try:
-                        # Refresh post from DB to ensure we have latest data
-                        post_refreshed = Post.objects.get(id=post.id)
-                        logger.info(
-                            f"Auto-summarizing post {post_refreshed.id} on creation (background)"
-                        )
-                        summary = summarize_text(post_refreshed.body)
-                        if summary:
-                            post_refreshed.summary = summary
-                            post_refreshed.save(update_fields=["summary"])
-                            logger.info(
-                                f"Summary generated and saved for post {post_refreshed.id}"
-                            )
-                        else:
-                            logger.warning(
-                                f"Summarization returned empty result for post {post_refreshed.id}"
-                            )
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to auto-summarize post {post.id} in background: {e}",
-                            exc_info=True,
-                        )
-
-                # Start summarization in background thread (non-blocking)
-                thread = threading.Thread(target=generate_summary_async, daemon=True)
-                thread.start()
-                logger.info(f"Started background summarization for post {post.id}")
-            except Exception as e:
-                import logging
-
-                logger = logging.getLogger(__name__)
-                logger.error(
-                    f"Failed to start background summarization for post {post.id}: {e}",
-                    exc_info=True,
-                )
-                # Continue even if background thread fails - post is already saved
+            ensure_summary(post)
 
             post_type_display = "News" if post.is_news else "Blog"
             messages.success(
@@ -274,6 +304,8 @@ def edit_post(request, slug, post_id):
 
     can_create_news = is_club_moderator(request.user, club)
     FormClass = NewsPostForm if can_create_news else BlogPostForm
+    # Binding the form updates the instance, so remember the body being edited
+    previous_body = post.body
 
     if request.method == "POST":
         can_create_news_now = is_club_moderator(request.user, club)
@@ -333,6 +365,9 @@ def edit_post(request, slug, post_id):
             updated_post.club = club
             updated_post.save()
 
+            # Only a change to the summarized content invalidates the summary
+            refresh_summary_after_edit(updated_post, previous_body)
+
             post_type_display = "News" if updated_post.is_news else "Blog"
             messages.success(
                 request,
@@ -355,6 +390,36 @@ def edit_post(request, slug, post_id):
     )
 
 
+@require_http_methods(["POST"])
+@club_member_required
+def preview_post(request, slug):
+    """Render the editor body exactly as it will be published - HTMX fragment."""
+    club = get_object_or_404(Club, slug=slug)
+    # Stripped like the form field, so the HTML matches the saved post's
+    body = request.POST.get("body", "").strip()
+
+    retry_after = preview_limiter.hit(request.user.pk)
+    if retry_after:
+        response = HttpResponse(status=429)
+        response["Retry-After"] = str(retry_after)
+        return response
+
+    key = content_key(body, f"preview:{MARKDOWN_RENDERER_VERSION}")
+    cached = request.session.get(PREVIEW_SESSION_KEY)
+    if cached and cached.get("key") == key:
+        body_html = cached["html"]
+    else:
+        body_html = render_markdown_blocks(body)
+        if len(body) <= PREVIEW_SESSION_MAX_CHARS:
+            request.session[PREVIEW_SESSION_KEY] = {"key": key, "html": body_html}
+
+    return render(
+        request,
+        "posts/partials/post_preview.html",
+        {"club": club, "body_html": mark_safe(body_html)},
+    )
+
+
 @club_member_required
 def delete_post(request, slug, post_id):
     """Delete a post - moderators and admins only."""
@@ -399,31 +464,117 @@ def summarize_post(request, slug, post_id):
             },
         )
 
-    # Check if summary exists in database (cached)
-    if post.summary:
+    # Check for a summary of the current body on the post or in the shared store
+    started = time.monotonic()
+    model_name = summary_model_for(post)
+    key = summary_key_for(post)
+    cached_summary = get_cached_summary(post, key, degraded=True)
+    if cached_summary:
         logger.info(f"Using cached summary for post {post_id}")
+        record_run(
+            post,
+            SummarySource.CACHE,
+            SummaryOrigin.VIEW,
+            started,
+            post.body,
+            model_name,
+        )
+        return render(
+            request,
+            "posts/partials/post_content.html",
+            {
+                "club": club,
+                "post": post,
+                "summary": cached_summary,
+                "is_summarized": True,
+            },
+        )
+
+    # Under load, step down from beam search to greedy decoding, then to the
+    # extractive summary, then to a fast "try again shortly" response
+    level = shedder.level()
+    if level == LEVEL_SHED:
+        logger.warning(f"Shedding summarization of post {post_id}")
+        record_run(post, SummarySource.SHED, SummaryOrigin.VIEW, started, post.body)
+        return _render_busy(request, club, post)
+
+    tier = choose_tier(post.body, model_name)
+    if tier == TIER_ABSTRACTIVE and level == LEVEL_FALLBACK:
+        tier = TIER_EXTRACTIVE
+
+    # Model warming up or busy: serve a quick extractive summary now and let
+    # run_summarizer_worker store the abstractive one for later readers
+    if tier == TIER_EXTRACTIVE:
+        logger.info(f"Serving extractive summary for post {post_id}")
+        enqueue_summary_job(post)
+        summary = fallback_summary(post.body)
+        record_run(
+            post, SummarySource.EXTRACTIVE, SummaryOrigin.VIEW, started, post.body
+        )
         return render(
             request,
             "posts/partials/post_content.html",
             {
                 "club": club,
                 "post": post,
-                "summary": post.summary,
+                "summary": summary,
                 "is_summarized": True,
+                "is_extractive": True,
             },
         )
 
+    # Stream the summary into the page instead of blocking this request
+    if STREAMING and tier == TIER_ABSTRACTIVE:
+        if is_in_flight(post, key):
+            return _render_in_flight(request, club, post, key)
+        return render(
+            request,
+            "posts/partials/summary_stream.html",
+            {"club": club, "post": post},
+        )
+
+    # Only one request generates each summary; the rest wait for its result
+    flight = begin_flight(post, key)
+    if flight is None:
+        return _render_in_flight(request, club, post, key)
+
     # Generate summary on-demand if not cached
     try:
         logger.info(f"Generating summary for post {post_id} (not cached)")
-        summary = summarize_text(post.body)
+        metrics = []
+        if tier == TIER_ORIGINAL:
+            # Short posts are their own summary
+            summary = post.body
+            source = SummarySource.ORIGINAL
+        else:
+            with shedder.track():
+                summary = summarize_with_hf(
+                    post.body,
+                    model_name=model_name,
+                    metrics=metrics,
+                    num_beams=1 if level == LEVEL_GREEDY else None,
+                )
+            source = SummarySource.MODEL
         if not summary:
             raise ValueError("Summarization returned empty result")
 
-        # Store the generated summary in the database for future use
-        post.summary = summary
-        post.save(update_fields=["summary"])
+        # Store the generated summary for this post and any post with the same body
+        if level == LEVEL_GREEDY and source == SummarySource.MODEL:
+            # Keyed as greedy; the worker replaces it with a beam-search summary
+            store_summary(post, summary_key_for(post, num_beams=1), summary, model_name)
+            enqueue_summary_job(post)
+        else:
+            store_summary(post, key, summary, model_name)
         logger.info(f"Summary generated and cached for post {post_id}")
+        record_run(
+            post,
+            source,
+            SummaryOrigin.VIEW,
+            started,
+            post.body,
+            model_name,
+            metrics[0] if metrics else None,
+        )
 
         return render(
             request,
@@ -437,7 +588,8 @@ def summarize_post(request, slug, post_id):
         )
     except ImportError as e:
         logger.error(f"Import error during summarization: {e}")
-        summary = post.body[:300] + "..." if len(post.body) > 300 else post.body
+        summary = fallback_summary(post.body)
+        record_run(post, SummarySource.FALLBACK, SummaryOrigin.VIEW, started, post.body)
         return render(
             request,
             "posts/partials/post_content.html",
@@ -452,7 +604,8 @@ def summarize_post(request, slug, post_id):
         )
     except OSError as e:
         logger.error(f"OS error during summarization: {e}")
-        summary = post.body[:300] + "..." if len(post.body) > 300 else post.body
+        summary = fallback_summary(post.body)
+        record_run(post, SummarySource.FALLBACK, SummaryOrigin.VIEW, started, post.body)
         return render(
             request,
             "posts/partials/post_content.html",
@@ -467,7 +620,8 @@ def summarize_post(request, slug, post_id):
         )
     except Exception as e:
         logger.error(f"Error during summarization: {e}", exc_info=True)
-        summary = post.body[:300] + "..." if len(post.body) > 300 else post.body
+        summary = fallback_summary(post.body)
+        record_run(post, SummarySource.FALLBACK, SummaryOrigin.VIEW, started, post.body)
         return render(
             request,
             "posts/partials/post_content.html",
@@ -480,6 +634,180 @@ def summarize_post(request, slug, post_id):
                 "error": f"Error during summarization: {str(e)}",
             },
         )
+    finally:
+        flight.release()
+
+
+def _render_in_flight(request, club, post, key):
+    """Wait for another request's summary of the post, or render a polling partial."""
+    summary = wait_for_flight(post, key)
+    if summary:
+        return render(
+            request,
+            "posts/partials/post_content.html",
+            {"club": club, "post": post, "summary": summary, "is_summarized": True},
+        )
+    return render(
+        request,
+        "posts/partials/summary_generating.html",
+        {"club": club, "post": post, "poll_seconds": 2},
+    )
+
+
+@require_http_methods(["POST"])
+def summarize_discussion(request, slug, post_id):
+    """Build the post's discussion digest on demand - returns HTML fragment for HTMX.
+    Under load, or while another request builds it, the worker is asked to build it
+    and the fragment polls until it is stored.
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+    club = get_object_or_404(Club, slug=slug)
+    post = get_object_or_404(Post, id=post_id, club=club, is_published=True)
+    context = {"club": club, "post": post, "digest_min_comments": DIGEST_MIN_COMMENTS}
+
+    digest = get_digest(post)
+    if digest is None and post.comment_count >= DIGEST_MIN_COMMENTS:
+        flight = None
+        if shedder.level() not in (LEVEL_FALLBACK, LEVEL_SHED):
+            flight = begin_flight(post, "digest")
+        if flight is None:
+            flag_digest(post)
+            context["digest_pending"] = True
+        else:
+            try:
+                logger.info(f"Building discussion digest for post {post_id}")
+                with shedder.track():
+                    digest = refresh_digest(post)
+            except Exception as e:
+                logger.error(f"Error building discussion digest: {e}", exc_info=True)
+            finally:
+                flight.release()
+            if digest is None:
+                context["error"] = "The discussion could not be summarized right now."
+
+    context["digest"] = digest
+    return render(request, "posts/partials/discussion_digest.html", context)
+
+
+def _render_busy(request, club, post):
+    """Render the "try again shortly" partial for a shed summarization."""
+    response = render(
+        request,
+        "posts/partials/summary_busy.html",
+        {"club": club, "post": post, "retry_seconds": RETRY_AFTER_SECONDS},
+    )
+    response["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
+def _sse_event(event, data):
+    """Format one Server-Sent Event; every line of data gets its own prefix."""
+    lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+    return f"event: {event}\n{lines}\n"
+
+
+@require_http_methods(["POST"])
+def summarize_post_stream(request, slug, post_id):
+    """Stream a post summary as Server-Sent Events to the summary_stream partial.
+    A POST like summarize_post, since it stores the summary.
+
+    Sends each generated piece as a "partial" event, then the rendered summary
+    as a "done" event once generation finishes and the summary is stored.
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+    club = get_object_or_404(Club, slug=slug)
+    post = get_object_or_404(Post, id=post_id, club=club, is_published=True)
+    model_name = summary_model_for(post)
+    key = summary_key_for(post)
+
+    def events():
+        started = time.monotonic()
+        context = {"club": club, "post": post, "is_summarized": True}
+        summary = get_cached_summary(post, key, degraded=True)
+        source = SummarySource.CACHE
+
+        if not summary:
+            flight = begin_flight(post, key)
+            if flight is None:
+                # Another request is generating it: wait, or hand over to polling
+                summary = wait_for_flight(post, key)
+                if not summary:
+                    html = render_to_string(
+                        "posts/partials/summary_generating.html",
+                        {"club": club, "post": post, "poll_seconds": 2},
+                        request=request,
+                    )
+                    yield _sse_event("done", html)
+                    return
+
+        if not summary and shedder.level() in (LEVEL_FALLBACK, LEVEL_SHED):
+            # Load rose since the page asked to stream; leave it to the worker
+            flight.release()
+            logger.info(f"Serving extractive summary for post {post_id} under load")
+            enqueue_summary_job(post)
+            summary = fallback_summary(post.body)
+            source = SummarySource.EXTRACTIVE
+            context["is_extractive"] = True
+
+        if not summary:
+            pieces = []
+            try:
+                logger.info(f"Streaming summary for post {post_id}")
+                stream = stream_summary(post.body, model_name=model_name)
+                # Latency is time to the first token; reading the rest is the client's.
+                # Closing stream (also when the reader disconnects) stops generation
+                with shedder.track() as record_latency, closing(stream):
+                    for piece in stream:
+                        record_latency()
+                        pieces.append(piece)
+                        yield _sse_event("partial", escape(piece))
+                summary = "".join(pieces).strip()
+                if not summary:
+                    raise ValueError("Summarization returned empty result")
+                # Streaming is greedy: key it so, and have the worker replace
+                # it with a beam-search summary
+                store_summary(
+                    post, summary_key_for(post, num_beams=1), summary, model_name
+                )
+                enqueue_summary_job(post)
+                logger.info(f"Streamed summary generated and cached for post {post_id}")
+                source = SummarySource.STREAM
+            except Exception as e:
+                logger.error(f"Error during streamed summarization: {e}", exc_info=True)
+                summary = fallback_summary(post.body)
+                source = SummarySource.FALLBACK
+                context["is_fallback"] = True
+                context["error"] = f"Error during summarization: {str(e)}"
+            finally:
+                flight.release()
+
+        record_run(
+            post,
+            source,
+            SummaryOrigin.STREAM,
+            started,
+            post.body,
+            model_name
+            if source not in (SummarySource.FALLBACK, SummarySource.EXTRACTIVE)
+            else "",
+        )
+        context["summary"] = summary
+        html = render_to_string(
+            "posts/partials/post_content.html", context, request=request
+        )
+        yield _sse_event("done", html)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 @require_http_methods(["POST"])
@@ -498,6 +826,8 @@ def toggle_like(request, slug, post_id):
     else:
         Like.objects.create(post=post, user=request.user)
         is_liked = True
+    # The counter was moved in the database by posts/signals.py
+    post.refresh_from_db(fields=["like_count"])
 
     # Return updated like button partial
     return render(
@@ -554,6 +884,7 @@ def add_comment(request, slug, post_id):
         )
 
     comment = Comment.objects.create(post=post, user=request.user, body=body)
+    note_new_comment(post)
 
     # Return the new comment and updated form
     return render(
@@ -595,6 +926,7 @@ def delete_comment(request, slug, post_id, comment_id):
             },
         )
 
+    forget_comment(comment)
     comment.delete()
 
     # Return empty response (comment will be removed from DOM)
@@ -613,6 +945,8 @@ def bookmark_list(request):
     bookmarks = (
         Bookmark.objects.filter(user=request.user)
         .select_related("post", "post__author", "post__club")
+        .prefetch_related("post__author__socialaccount_set")
+        .defer(*(f"post__{field}" for field in LIST_DEFERRED_FIELDS))
         .order_by("-created_at")
     )
 
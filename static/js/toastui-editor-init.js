@@ -5,6 +5,9 @@
 (function() {
   'use strict';
 
+  // Wait for a pause in typing before asking the server for a preview
+  var PREVIEW_DELAY_MS = 500;
+
   function normalizeUrls(markdown) {
     return markdown.replace(/\[([^\]]+)\]\(([^)]+)\)/g, function(match, text, url) {
       if (/^(https?|mailto|ftp|#|\/)/i.test(url)) {
@@ -65,10 +68,41 @@
     });
   }
 
+  function setupPreview(editor, textarea, preview) {
+    var timer = null;
+    var lastSent = textarea.value;
+
+    function requestPreview() {
+      timer = null;
+      var markdownContent = normalizeUrls(editor.getMarkdown());
+      if (markdownContent === lastSent) return;
+      lastSent = markdownContent;
+      // The preview is inside the form, so htmx posts the body with the CSRF token
+      textarea.value = markdownContent;
+      htmx.trigger(preview, 'body-changed');
+    }
+
+    editor.on('change', function() {
+      if (timer) clearTimeout(timer);
+      timer = setTimeout(requestPreview, PREVIEW_DELAY_MS);
+    });
+
+    // Rate limited: try again once the server says it will accept the request
+    preview.addEventListener('htmx:afterRequest', function(e) {
+      var xhr = e.detail.xhr;
+      if (!xhr || xhr.status !== 429) return;
+      var seconds = parseInt(xhr.getResponseHeader('Retry-After'), 10) || 1;
+      setTimeout(function() {
+        htmx.trigger(preview, 'body-changed');
+      }, seconds * 1000);
+    });
+  }
+
   function initToastUIEditor(options) {
     options = options || {};
     var textareaId = options.textareaId || 'id_body';
     var containerId = options.containerId || 'toastui-editor-container';
+    var previewId = options.previewId || 'post-preview';
     var placeholder = options.placeholder || 'Write your post here. Use the toolbar to format your content.';
     var height = options.height || '400px';
     
@@ -121,6 +155,11 @@
       return null;
     }
     
+    var preview = document.getElementById(previewId);
+    if (preview && window.htmx) {
+      setupPreview(editor, textarea, preview);
+    }
+
     // Setup form submission handler
     var form = textarea.closest('form');
     if (form) {